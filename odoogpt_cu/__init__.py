@@ -1 +1,7 @@
 from . import models
+
+
+def post_init_hook(env):
+    env["odoogpt.sale.demand"]._backfill()
+    env["odoogpt.receivable"]._backfill()
+    env["odoogpt.record.embedding"]._backfill()
@@ -6,11 +6,26 @@
     "author": "Osliani - Soluciones DTeam",
     "website": "https://www.dteam.cu",
     "license": "OPL-1",
-    "depends": ["base", "mail", "calendar", "survey"],
+    "depends": [
+        "base",
+        "mail",
+        "calendar",
+        "resource",
+        "survey",
+        "account",
+        "stock",
+        "sale",
+    ],
     "data": [
         "security/ir.model.access.csv",
         "data/res_partner.xml",
         "data/res_users.xml",
+        "data/snapshot_data.xml",
+        "data/record_index_data.xml",
+        "data/odoogpt_table_data.xml",
+        "views/product_views.xml",
+        "views/main_menu.xml",
+        "views/odoogpt_table.xml",
     ],
     "assets": {
         "web.assets_backend": [
@@ -19,6 +34,7 @@
             "odoogpt/static/src/css/odoo_gpt_messages.css",
         ],
     },
+    "post_init_hook": "post_init_hook",
     "installable": True,
     "auto_install": False,
 }
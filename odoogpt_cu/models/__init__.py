@@ -7,3 +7,16 @@ from . import completions
 from . import utils
 from . import ir_ui_view
 from . import calendar_event
+from . import account_move
+from . import product
+from . import name_search
+from . import category_tree
+from . import snapshot_mixin
+from . import sale_demand
+from . import sale_order
+from . import receivable_snapshot
+from . import embeddings
+from . import odoogpt_table
+from . import record_index
+from . import survey_analytics
+from . import calendar_service
@@ -0,0 +1,71 @@
+from odoo import api, models  # type: ignore
+from odoo.tools.sql import create_index  # type: ignore
+
+
+RECEIVABLE_KEY_FIELDS = {
+    "partner_id",
+    "commercial_partner_id",
+    "company_id",
+    "currency_id",
+    "invoice_date",
+    "move_type",
+    "state",
+}
+
+
+class AccountMove(models.Model):
+    _inherit = "account.move"
+
+    def init(self):
+        super().init()
+        # Customer invoice reports filter posted out_invoice moves by date and
+        # payment state, a partial index keeps those scans small
+        create_index(
+            self.env.cr,
+            "account_move_odoogpt_out_invoice_index",
+            self._table,
+            ["invoice_date", "payment_state"],
+            where="move_type = 'out_invoice' AND state = 'posted'",
+        )
+
+    def _odoogpt_receivable_keys(self):
+        """Receivable buckets (partner, company, currency, day) of the invoices."""
+        return {
+            (
+                move.commercial_partner_id.id,
+                move.company_id.id,
+                move.currency_id.id,
+                move.invoice_date,
+            )
+            for move in self
+            if move.id
+            and move.move_type == "out_invoice"
+            and move.invoice_date
+            and move.commercial_partner_id
+        }
+
+    def _compute_payment_state(self):
+        super()._compute_payment_state()
+        # Payment state and residual change in place, the bucket stays the same
+        self.env["odoogpt.receivable"]._mark_dirty(self._odoogpt_receivable_keys())
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        moves = super().create(vals_list)
+        self.env["odoogpt.receivable"]._mark_dirty(moves._odoogpt_receivable_keys())
+        return moves
+
+    def write(self, vals):
+        if not RECEIVABLE_KEY_FIELDS.intersection(vals):
+            return super().write(vals)
+        keys = self._odoogpt_receivable_keys()
+        res = super().write(vals)
+        keys |= self._odoogpt_receivable_keys()
+        self.env["odoogpt.receivable"]._mark_dirty(keys)
+        return res
+
+    def unlink(self):
+        keys = self._odoogpt_receivable_keys()
+        res = super().unlink()
+        self.env["odoogpt.receivable"]._mark_dirty(keys)
+        return res
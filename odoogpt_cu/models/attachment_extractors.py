@@ -0,0 +1,161 @@
+"""Incremental text extractors for chat attachments.
+
+Every extractor is a generator reading the file in fixed-size chunks (or
+XML events for zipped office documents) so callers can stop as soon as the
+character budget is reached without loading the whole file.
+"""
+
+import codecs
+import csv
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+from .spreadsheet_profile import profile_rows
+
+CHUNK_SIZE = 64 * 1024
+SNIFF_SIZE = 16 * 1024
+TRUNCATED = "\n...[contenido truncado]"
+
+_ODT_NS = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+_DRAWINGML_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+_SLIDE_RE = re.compile(r"^ppt/slides/slide(\d+)\.xml$")
+
+
+def iter_decoded(stream, chunk_size: int = CHUNK_SIZE):
+    """Yield decoded text chunks, guessing between UTF-8 and Latin-1."""
+    first = stream.read(chunk_size)
+    if not first:
+        return
+    encoding = "utf-8-sig"
+    try:
+        first.decode(encoding)
+    except UnicodeDecodeError as exc:
+        # A multibyte char may be cut at the chunk border, only fall back
+        # when the error is not at the very end of the chunk
+        if exc.start < len(first) - 3:
+            encoding = "latin-1"
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    chunk = first
+    while chunk:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+        chunk = stream.read(chunk_size)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_lines(chunks):
+    """Re-split decoded chunks into lines keeping the line endings."""
+    pending = ""
+    for chunk in chunks:
+        pending += chunk
+        lines = pending.splitlines(keepends=True)
+        # The last piece may be an incomplete line
+        pending = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        yield from lines
+    if pending:
+        yield pending
+
+
+def take(pieces, max_chars: int, separator: str = "\n") -> str:
+    """Join the pieces of a generator until the character budget is reached."""
+    out = []
+    size = 0
+    for piece in pieces:
+        if not piece:
+            continue
+        if size + len(piece) > max_chars:
+            out.append(piece[: max(max_chars - size, 0)] + TRUNCATED)
+            break
+        out.append(piece)
+        size += len(piece) + len(separator)
+    if hasattr(pieces, "close"):
+        # Stop the underlying generator so it releases its file handles
+        pieces.close()
+    return separator.join(out)
+
+
+def extract_txt(stream, max_chars: int) -> str:
+    return take(iter_decoded(stream), max_chars, separator="")
+
+
+def extract_csv(stream, max_chars: int, title: str = "CSV") -> str:
+    """Profile a CSV file with the same summary used for spreadsheets."""
+    chunks = iter_decoded(stream)
+    head = ""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= SNIFF_SIZE:
+            break
+
+    try:
+        dialect = csv.Sniffer().sniff(head[:SNIFF_SIZE], delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+
+    def replay():
+        yield head
+        yield from chunks
+
+    # Like take(), stop reading once the character budget is used up
+    cut = []
+
+    def budgeted(lines):
+        size = 0
+        for line in lines:
+            size += len(line)
+            if size > max_chars:
+                cut.append(True)
+                break
+            yield line
+
+    lines = iter_lines(replay())
+    reader = csv.reader(budgeted(lines), dialect)
+    profile = profile_rows(title, reader, coerce_strings=True)
+    lines.close()
+    if cut:
+        profile.truncated = True
+    return profile.render(max_chars=max_chars)
+
+
+def iter_odt_paragraphs(stream):
+    with zipfile.ZipFile(stream) as archive, archive.open("content.xml") as content:
+        for _event, elem in iterparse(content, events=("end",)):
+            if elem.tag in (f"{{{_ODT_NS}}}p", f"{{{_ODT_NS}}}h"):
+                text = "".join(elem.itertext()).strip()
+                if text:
+                    yield text
+                elem.clear()
+
+
+def iter_pptx_paragraphs(stream):
+    with zipfile.ZipFile(stream) as archive:
+        slides = sorted(
+            (int(match.group(1)), name)
+            for name in archive.namelist()
+            if (match := _SLIDE_RE.match(name))
+        )
+        for number, name in slides:
+            yield f"[Diapositiva {number}]"
+            with archive.open(name) as content:
+                for _event, elem in iterparse(content, events=("end",)):
+                    if elem.tag == f"{{{_DRAWINGML_NS}}}p":
+                        text = "".join(
+                            node.text or ""
+                            for node in elem.iter(f"{{{_DRAWINGML_NS}}}t")
+                        ).strip()
+                        if text:
+                            yield text
+                        elem.clear()
+
+
+def extract_odt(stream, max_chars: int) -> str:
+    return take(iter_odt_paragraphs(stream), max_chars)
+
+
+def extract_pptx(stream, max_chars: int) -> str:
+    return take(iter_pptx_paragraphs(stream), max_chars)
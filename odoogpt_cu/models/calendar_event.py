@@ -1,5 +1,5 @@
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 from odoo import api, models
 from dateutil import parser
 
@@ -12,7 +12,7 @@ class CalendarEvent(models.Model):
     @api.model
     def create_calendar_event(self, name, start_datetime, end_datetime=None, 
                              description=None, partner_ids=None, location=None,
-                             allday=False, duration=1.0):
+                             allday=False, duration=1.0, check_conflicts=False):
         """
         Crear un evento de calendario con los parámetros especificados.
         
@@ -25,6 +25,8 @@ class CalendarEvent(models.Model):
             location (str, optional): Ubicación del evento
             allday (bool, optional): Si es evento de todo el día
             duration (float, optional): Duración en horas (por defecto 1 hora)
+            check_conflicts (bool, optional): No crear el evento si algún
+                asistente ya está ocupado en ese horario
         
         Returns:
             dict: Información del evento creado
@@ -55,6 +57,16 @@ class CalendarEvent(models.Model):
             _logger.info(f"Fechas parseadas - Start: {start_dt}, End: {end_dt}")
             _logger.info("Fechas ajustadas con +4h para compensar zona horaria")
             
+            if check_conflicts and not allday:
+                attendee_ids = set(partner_ids or []) | {self.env.user.partner_id.id}
+                conflicts = self.env['odoogpt.calendar']._conflicts(attendee_ids, start_dt, end_dt)
+                if conflicts:
+                    return {
+                        'status': 'conflict',
+                        'conflicts': conflicts,
+                        'message': 'Algún asistente ya tiene eventos en ese horario'
+                    }
+            
             # Preparar valores del evento
             event_vals = {
                 'name': name,
@@ -113,7 +125,7 @@ class CalendarEvent(models.Model):
 
     @api.model
     def get_calendar_events(self, start_date=None, end_date=None, partner_id=None, 
-                           limit=20, search_term=None):
+                           limit=20, search_term=None, offset=0, compact=False):
         """
         Consultar eventos de calendario con filtros opcionales.
         
@@ -123,70 +135,22 @@ class CalendarEvent(models.Model):
             partner_id (int, optional): ID del contacto para filtrar eventos
             limit (int, optional): Límite de resultados (por defecto 20)
             search_term (str, optional): Término de búsqueda en nombre o descripción
+            offset (int, optional): Eventos a saltar para paginar
+            compact (bool, optional): Devolver solo los datos esenciales
         
         Returns:
             list: Lista de eventos encontrados
         """
         try:
-            domain = []
-            
-            _logger.info(f"Parámetros de búsqueda - start_date: {start_date}, end_date: {end_date}, partner_id: {partner_id}, search_term: {search_term}")
-            
-            # Filtro por rango de fechas
-            if start_date:
-                start_dt = parser.parse(start_date) if isinstance(start_date, str) else start_date
-                domain.append(('start', '>=', start_dt))
-                _logger.info(f"Filtro fecha inicio: start >= {start_dt}")
-            
-            if end_date:
-                end_dt = parser.parse(end_date) if isinstance(end_date, str) else end_date
-                # Para el filtro de fin de día, agregar 23:59:59
-                end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                domain.append(('stop', '<=', end_dt))
-                _logger.info(f"Filtro fecha fin: stop <= {end_dt}")
-            
-            # Filtro por contacto
-            if partner_id:
-                domain.append(('partner_ids', 'in', [partner_id]))
-            
-            # Filtro por término de búsqueda
-            if search_term:
-                domain.append('|')
-                domain.append(('name', 'ilike', search_term))
-                domain.append(('description', 'ilike', search_term))
-            
-            _logger.info(f"Dominio de búsqueda: {domain}")
-            
-            # Buscar eventos
-            events = self.env['calendar.event'].sudo().search(domain, limit=limit, order='start desc')
-            
-            # Para debugging: buscar todos los eventos y mostrar información
-            all_events = self.env['calendar.event'].sudo().search([], limit=10, order='start desc')
-            _logger.info(f"Todos los eventos recientes ({len(all_events)}):")
-            for evt in all_events:
-                attendees_names = [p.name for p in evt.partner_ids]
-                _logger.info(f"  - ID:{evt.id} '{evt.name}' Start:{evt.start} Attendees:{attendees_names}")
-            
-            # Formatear resultados
-            results = []
-            for event in events:
-                event_data = {
-                    'id': event.id,
-                    'name': event.name,
-                    'start': event.start.isoformat() if event.start else None,
-                    'stop': event.stop.isoformat() if event.stop else None,
-                    'description': event.description or '',
-                    'location': event.location or '',
-                    'allday': event.allday,
-                    'user_id': {'id': event.user_id.id, 'name': event.user_id.name} if event.user_id else None,
-                    'attendees': [{'id': p.id, 'name': p.name, 'email': p.email} for p in event.partner_ids],
-                    'state': event.state if hasattr(event, 'state') else 'confirmed'
-                }
-                results.append(event_data)
-            
-            _logger.info(f"Encontrados {len(results)} eventos de calendario")
-            return results
-            
+            return self.env['odoogpt.calendar']._search_events(
+                start_date=start_date,
+                end_date=end_date,
+                partner_id=partner_id,
+                search_term=search_term,
+                limit=limit,
+                offset=offset,
+                compact=compact,
+            )['events']
         except Exception as e:
             _logger.error(f"Error consultando eventos de calendario: {str(e)}")
             return []
@@ -204,48 +168,9 @@ class CalendarEvent(models.Model):
             list: Lista de eventos próximos
         """
         try:
-            now = datetime.now()
-            future_date = now + timedelta(days=days_ahead)
-            
-            domain = [
-                ('start', '>=', now),
-                ('start', '<=', future_date)
-            ]
-            
-            events = self.env['calendar.event'].sudo().search(
-                domain, limit=limit, order='start asc'
+            return self.env['odoogpt.calendar']._upcoming_events(
+                days_ahead=days_ahead, limit=limit
             )
-            
-            results = []
-            for event in events:
-                # Calcular tiempo restante
-                time_diff = event.start - datetime.now()
-                days_left = time_diff.days
-                hours_left = time_diff.seconds // 3600
-                
-                if days_left > 0:
-                    time_remaining = f"En {days_left} días"
-                elif hours_left > 0:
-                    time_remaining = f"En {hours_left} horas"
-                else:
-                    time_remaining = "Próximamente"
-                
-                event_data = {
-                    'id': event.id,
-                    'name': event.name,
-                    'start': event.start.isoformat() if event.start else None,
-                    'stop': event.stop.isoformat() if event.stop else None,
-                    'description': event.description or '',
-                    'location': event.location or '',
-                    'time_remaining': time_remaining,
-                    'attendees_count': len(event.partner_ids),
-                    'attendees': [p.name for p in event.partner_ids[:3]]  # Primeros 3 asistentes
-                }
-                results.append(event_data)
-            
-            _logger.info(f"Encontrados {len(results)} eventos próximos")
-            return results
-            
         except Exception as e:
             _logger.error(f"Error obteniendo eventos próximos: {str(e)}")
             return []
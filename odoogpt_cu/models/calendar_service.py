@@ -0,0 +1,391 @@
+import logging
+import math
+import threading
+from datetime import datetime, time, timedelta
+
+import pytz
+from dateutil import parser
+from odoo import api, models  # type: ignore
+
+_logger = logging.getLogger(__name__)
+
+EVENT_FIELDS = ["name", "start", "stop", "allday", "location", "user_id", "partner_ids"]
+DETAIL_FIELDS = ["description"]
+MAX_CACHED_WINDOWS = 256
+SLOT_STEP = timedelta(minutes=15)
+DEFAULT_SLOT_DAYS = 14
+MAX_SLOT_DAYS = 60
+DEFAULT_SLOT_COUNT = 5
+MAX_SLOT_COUNT = 20
+MAX_CONFLICTS = 5
+
+_upcoming_cache = {}
+_upcoming_lock = threading.Lock()
+
+
+def _parse(value):
+    return parser.parse(value) if isinstance(value, str) else value
+
+
+def _is_bare_date(value) -> bool:
+    return not isinstance(value, datetime) and len(str(value)) <= 10
+
+
+def _to_utc(moment, tz):
+    """Naive UTC datetime of a naive local (``tz``) or aware datetime."""
+    if moment.tzinfo is None:
+        moment = tz.localize(moment)
+    return moment.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def _from_utc(moment, tz):
+    return pytz.utc.localize(moment).astimezone(tz).replace(tzinfo=None)
+
+
+def merge_intervals(intervals):
+    """Sort ``(start, stop)`` pairs and merge the overlapping or touching ones."""
+    merged = []
+    for start, stop in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], stop)
+        else:
+            merged.append([start, stop])
+    return [(start, stop) for start, stop in merged]
+
+
+def _ceil(moment, step):
+    """Round ``moment`` up to a multiple of ``step`` since midnight."""
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight + math.ceil((moment - midnight) / step) * step
+
+
+def free_slots(windows, busy, duration, count, step=SLOT_STEP):
+    """Return the first ``count`` slots of ``duration`` in ``windows`` not ``busy``.
+
+    Both arguments are sorted lists of disjoint ``(start, stop)`` pairs, as
+    returned by :func:`merge_intervals`. They are swept once in parallel, so
+    the cost is linear in their length. Slots start on ``step`` boundaries and
+    follow each other inside a free gap.
+    """
+    slots = []
+    first = 0
+    for window_start, window_stop in windows:
+        # Busy intervals ending before this window cannot matter anymore
+        while first < len(busy) and busy[first][1] <= window_start:
+            first += 1
+        cursor, current = window_start, first
+        while len(slots) < count:
+            cursor = _ceil(cursor, step)
+            if current < len(busy) and busy[current][0] < window_stop:
+                gap_stop = busy[current][0]
+            else:
+                gap_stop = window_stop
+            if cursor + duration <= gap_stop:
+                slots.append((cursor, cursor + duration))
+                cursor += duration
+            elif gap_stop == window_stop:
+                break
+            else:
+                cursor = max(cursor, busy[current][1])
+                current += 1
+        if len(slots) >= count:
+            break
+    return slots
+
+
+class OdooGPTCalendar(models.AbstractModel):
+    """Calendar queries of the assistant.
+
+    Events are filtered on plain ``start``/``stop`` comparisons so PostgreSQL
+    can use their indexes, and read with their attendees in two queries
+    whatever the page size. Upcoming-event windows are cached per user until
+    an event enters, leaves or changes in the window.
+
+    Availability is computed in one pass: the busy intervals of all the
+    attendees come from a single query and are merged, then swept against
+    the working intervals of the company calendar to find free slots.
+    """
+
+    _name = "odoogpt.calendar"
+    _description = "OdooGPT calendar queries"
+
+    @api.model
+    def _window_domain(self, start=None, end=None):
+        """Events overlapping ``[start, end]``."""
+        domain = []
+        if start:
+            domain.append(("stop", ">=", start))
+        if end:
+            domain.append(("start", "<=", end))
+        return domain
+
+    @api.model
+    def _read_events(self, domain, limit=None, offset=0, order="start", compact=False):
+        """Return ``(total, events)`` with their attendees, in two batched reads."""
+        Event = self.env["calendar.event"].sudo()
+        fields = EVENT_FIELDS if compact else EVENT_FIELDS + DETAIL_FIELDS
+        rows = Event.search_read(
+            domain, fields, limit=limit, offset=offset, order=order
+        )
+        # A short page tells the total without counting
+        if limit is None or (len(rows) < limit and (rows or not offset)):
+            total = offset + len(rows)
+        else:
+            total = Event.search_count(domain)
+        partner_ids = {pid for row in rows for pid in row["partner_ids"]}
+        partners = {
+            partner["id"]: partner
+            for partner in self.env["res.partner"]
+            .sudo()
+            .with_context(active_test=False)
+            .search_read([("id", "in", list(partner_ids))], ["name", "email"])
+        }
+
+        events = []
+        for row in rows:
+            attendees = [partners[pid] for pid in row["partner_ids"] if pid in partners]
+            event = {
+                "id": row["id"],
+                "name": row["name"],
+                "start": row["start"].isoformat() if row["start"] else None,
+                "stop": row["stop"].isoformat() if row["stop"] else None,
+            }
+            if compact:
+                event["attendees_count"] = len(attendees)
+                event["attendees"] = [partner["name"] for partner in attendees[:3]]
+                if row["location"]:
+                    event["location"] = row["location"]
+            else:
+                event.update(
+                    description=row["description"] or "",
+                    location=row["location"] or "",
+                    allday=row["allday"],
+                    user_id=(
+                        {"id": row["user_id"][0], "name": row["user_id"][1]}
+                        if row["user_id"]
+                        else None
+                    ),
+                    attendees=[
+                        {"id": p["id"], "name": p["name"], "email": p["email"]}
+                        for p in attendees
+                    ],
+                )
+            events.append(event)
+        return total, events
+
+    @api.model
+    def _search_events(
+        self,
+        start_date=None,
+        end_date=None,
+        partner_id=None,
+        search_term=None,
+        limit=20,
+        offset=0,
+        compact=False,
+    ):
+        """Return ``{"total", "offset", "events"}`` of the matching events."""
+        start = _parse(start_date) if start_date else None
+        end = _parse(end_date) if end_date else None
+        if end and _is_bare_date(end_date):
+            # A bare date includes the whole day
+            end = end.replace(hour=23, minute=59, second=59)
+
+        domain = self._window_domain(start, end)
+        if partner_id:
+            domain.append(("partner_ids", "in", [partner_id]))
+        if search_term:
+            domain += [
+                "|",
+                ("name", "ilike", search_term),
+                ("description", "ilike", search_term),
+            ]
+        total, events = self._read_events(
+            domain, limit=limit, offset=offset, order="start desc", compact=compact
+        )
+        return {"total": total, "offset": offset, "events": events}
+
+    def _window_stamp(self, start, end):
+        # Any event entering, leaving or changing in the window moves the stamp
+        self.env.cr.execute(
+            """
+            SELECT COUNT(*), MAX(write_date)
+            FROM calendar_event
+            WHERE active AND start >= %s AND start <= %s
+            """,
+            [start, end],
+        )
+        return self.env.cr.fetchone()
+
+    @api.model
+    def _upcoming_events(self, days_ahead=7, limit=10):
+        """Events starting in the next ``days_ahead`` days, cached per user."""
+        now = datetime.now().replace(second=0, microsecond=0)
+        end = now + timedelta(days=days_ahead)
+        self.env.flush_model("calendar.event")
+        stamp = self._window_stamp(now, end)
+        key = (self.env.cr.dbname, self.env.uid, days_ahead, limit)
+        cached = _upcoming_cache.get(key)
+        if cached and cached[0] == stamp:
+            events = cached[1]
+        else:
+            __, events = self._read_events(
+                [("start", ">=", now), ("start", "<=", end)],
+                limit=limit,
+                order="start asc",
+                compact=True,
+            )
+            with _upcoming_lock:
+                if len(_upcoming_cache) >= MAX_CACHED_WINDOWS:
+                    _upcoming_cache.pop(next(iter(_upcoming_cache)))
+                _upcoming_cache[key] = (stamp, events)
+
+        results = []
+        for event in events:
+            time_diff = datetime.fromisoformat(event["start"]) - datetime.now()
+            if time_diff.days > 0:
+                time_remaining = f"En {time_diff.days} días"
+            elif time_diff.seconds // 3600 > 0:
+                time_remaining = f"En {time_diff.seconds // 3600} horas"
+            else:
+                time_remaining = "Próximamente"
+            results.append(dict(event, time_remaining=time_remaining))
+        return results
+
+    def _tz(self):
+        calendar = self.env.company.resource_calendar_id
+        return pytz.timezone(self.env.user.tz or calendar.tz or "UTC")
+
+    @api.model
+    def _busy_intervals(self, partner_ids, start, end, tz=pytz.utc):
+        """Merged UTC intervals in ``[start, end]`` where a partner is busy.
+
+        Events shown as free and invitations the partner declined are ignored,
+        all-day events block the whole day in ``tz``.
+        """
+        self.env.flush_model("calendar.event")
+        self.env.flush_model("calendar.attendee")
+        self.env.cr.execute(
+            """
+            SELECT event.start, event.stop, event.allday,
+                   event.start_date, event.stop_date
+            FROM calendar_event event
+            WHERE event.active AND event.show_as = 'busy'
+              AND (
+                  (event.stop > %s AND event.start < %s)
+                  OR (event.allday AND event.stop_date >= %s AND event.start_date <= %s)
+              )
+              AND EXISTS (
+                  SELECT 1 FROM calendar_attendee attendee
+                  WHERE attendee.event_id = event.id
+                    AND attendee.partner_id = ANY(%s)
+                    AND attendee.state != 'declined'
+              )
+            """,
+            [
+                start,
+                end,
+                _from_utc(start, tz).date(),
+                _from_utc(end, tz).date(),
+                list(partner_ids),
+            ],
+        )
+        intervals = []
+        for (
+            event_start,
+            event_stop,
+            allday,
+            start_day,
+            stop_day,
+        ) in self.env.cr.fetchall():
+            if allday and start_day:
+                event_start = _to_utc(datetime.combine(start_day, time.min), tz)
+                last_day = (stop_day or start_day) + timedelta(days=1)
+                event_stop = _to_utc(datetime.combine(last_day, time.min), tz)
+            intervals.append((event_start, event_stop))
+        return merge_intervals(intervals)
+
+    @api.model
+    def _working_intervals(self, start, end, tz=pytz.utc):
+        """UTC working intervals of the company calendar, public leaves removed."""
+        calendar = self.env.company.resource_calendar_id.sudo()
+        if not calendar:
+            return [(start, end)]
+        intervals = calendar._work_intervals_batch(
+            pytz.utc.localize(start), pytz.utc.localize(end), tz=tz
+        )[False]
+        return merge_intervals(
+            (
+                interval_start.astimezone(pytz.utc).replace(tzinfo=None),
+                interval_stop.astimezone(pytz.utc).replace(tzinfo=None),
+            )
+            for interval_start, interval_stop, __ in intervals
+        )
+
+    @api.model
+    def _find_slots(
+        self,
+        partner_ids,
+        duration=1.0,
+        start_date=None,
+        end_date=None,
+        count=DEFAULT_SLOT_COUNT,
+        working_hours=True,
+    ):
+        """Return the first ``count`` slots of ``duration`` hours free for all.
+
+        Dates are read and returned in the user's timezone, the search never
+        starts in the past and covers at most ``MAX_SLOT_DAYS`` days.
+
+        :return: ``{"tz", "busy", "slots"}``, ``slots`` being ``(start, stop)``
+            pairs and ``busy`` the number of merged busy intervals
+        """
+        tz = self._tz()
+        now = _from_utc(datetime.utcnow(), tz)
+        start = max(_parse(start_date).replace(tzinfo=None), now) if start_date else now
+        if end_date:
+            end = _parse(end_date).replace(tzinfo=None)
+            if _is_bare_date(end_date):
+                # A bare date includes the whole day
+                end += timedelta(days=1)
+        else:
+            end = start + timedelta(days=DEFAULT_SLOT_DAYS)
+        end = min(end, start + timedelta(days=MAX_SLOT_DAYS))
+        if end <= start:
+            return {"tz": tz.zone, "busy": 0, "slots": []}
+
+        start_utc, end_utc = _to_utc(start, tz), _to_utc(end, tz)
+        busy = self._busy_intervals(partner_ids, start_utc, end_utc, tz)
+        if working_hours:
+            windows = self._working_intervals(start_utc, end_utc, tz)
+        else:
+            windows = [(start_utc, end_utc)]
+        slots = free_slots(windows, busy, timedelta(hours=duration), count)
+        return {
+            "tz": tz.zone,
+            "busy": len(busy),
+            "slots": [
+                (_from_utc(slot_start, tz), _from_utc(slot_stop, tz))
+                for slot_start, slot_stop in slots
+            ],
+        }
+
+    @api.model
+    def _conflicts(self, partner_ids, start, stop, exclude_ids=()):
+        """Busy events of the partners overlapping the UTC range ``[start, stop)``."""
+        domain = [
+            ("start", "<", stop),
+            ("stop", ">", start),
+            ("show_as", "=", "busy"),
+            (
+                "attendee_ids",
+                "any",
+                [("partner_id", "in", list(partner_ids)), ("state", "!=", "declined")],
+            ),
+        ]
+        if exclude_ids:
+            domain.append(("id", "not in", list(exclude_ids)))
+        __, events = self._read_events(
+            domain, limit=MAX_CONFLICTS, order="start", compact=True
+        )
+        return events
@@ -0,0 +1,109 @@
+import logging
+from collections import defaultdict
+
+from odoo import api, models, tools  # type: ignore
+
+_logger = logging.getLogger(__name__)
+
+PRODUCT_FIELDS = ["id", "name", "list_price", "qty_available", "categ_id"]
+
+
+class OdooGPTCategoryTree(models.AbstractModel):
+    """Product category hierarchy queries.
+
+    The tree is cached per registry, keyed on a stamp of the categories that
+    changes whenever one is created, renamed, moved or deleted. Products of
+    whole subtrees are fetched with a single ``child_of`` search, which Odoo
+    resolves with ``parent_path``.
+    """
+
+    _name = "odoogpt.category.tree"
+    _description = "OdooGPT product category tree"
+
+    @api.model
+    def _category_tree(self):
+        """Return ``({id: (name, complete_name, parent_id)}, {id: child ids})``."""
+        self.env["product.category"].flush_model()
+        # Not the write dates, they do not change between writes of a transaction
+        self.env.cr.execute(
+            """
+            SELECT md5(string_agg(
+                id || ':' || COALESCE(parent_id, 0) || ':' || COALESCE(complete_name, name),
+                ',' ORDER BY id
+            ))
+            FROM product_category
+            """
+        )
+        return self._category_tree_at(self.env.cr.fetchone()[0])
+
+    @api.model
+    @tools.ormcache("stamp")
+    def _category_tree_at(self, stamp):
+        # Edits do not clear the cache, stale stamps are simply not hit again
+        self.env.cr.execute(
+            "SELECT id, name, complete_name, parent_id FROM product_category ORDER BY parent_path"
+        )
+        nodes = {}
+        children = defaultdict(list)
+        for category_id, name, complete_name, parent_id in self.env.cr.fetchall():
+            nodes[category_id] = (name, complete_name or name, parent_id)
+            if parent_id:
+                children[parent_id].append(category_id)
+        return nodes, dict(children)
+
+    @api.model
+    def _subtree_ids(self, category_ids):
+        """Ids of the categories and all their descendants."""
+        nodes, children = self._category_tree()
+        result = []
+        stack = [category_id for category_id in category_ids if category_id in nodes]
+        seen = set()
+        while stack:
+            category_id = stack.pop()
+            if category_id in seen:
+                continue
+            seen.add(category_id)
+            result.append(category_id)
+            stack.extend(children.get(category_id, ()))
+        return result
+
+    @api.model
+    def _products_by_category(self, category_ids, limit=None, offset=0):
+        """Products of the category subtrees, grouped by category.
+
+        Returns the total product count, the product count of every category
+        of the subtrees and one page of products grouped by category.
+        """
+        nodes, _children = self._category_tree()
+        category_ids = [category_id for category_id in category_ids if category_id in nodes]
+        if not category_ids:
+            return {"total": 0, "categories": []}
+
+        Product = self.env["product.product"].sudo()
+        domain = [("categ_id", "child_of", category_ids), ("active", "=", True)]
+        counts = dict(Product._read_group(domain, ["categ_id"], ["__count"]))
+        total = sum(counts.values())
+        products = Product.search_read(
+            domain,
+            PRODUCT_FIELDS,
+            limit=limit,
+            offset=offset,
+            order="categ_id, name, id",
+        )
+
+        page = defaultdict(list)
+        for product in products:
+            category_id = product.pop("categ_id")[0]
+            page[category_id].append(product)
+
+        categories = []
+        for category, count in sorted(counts.items(), key=lambda item: nodes[item[0].id][1]):
+            categories.append(
+                {
+                    "id": category.id,
+                    "name": nodes[category.id][1],
+                    "product_count": count,
+                    "products": page.get(category.id, []),
+                }
+            )
+        return {"total": total, "offset": offset, "categories": categories}
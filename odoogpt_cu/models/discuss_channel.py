@@ -1,5 +1,38 @@
+import hashlib
+import json
+
 from odoo import api, fields, models  # type: ignore
 
+MAX_CONTEXT_IDS = 50
+MAX_CONTEXT_DOMAIN_CHARS = 2000
+
+
+def view_descriptor(params) -> dict:
+    """Compact description of the view the assistant chat was opened from.
+
+    Accepts the descriptor sent by the list button as well as the former
+    ``rootParams`` payload. Only the first ``MAX_CONTEXT_IDS`` selected ids are
+    kept, the records themselves are read by the bot when a question needs
+    them.
+    """
+    params = params if isinstance(params, dict) else {}
+    ids = params.get("active_ids") or params.get("resIds") or []
+    ids = [record_id for record_id in ids if isinstance(record_id, int)]
+    domain = params.get("domain") or []
+    domain_json = json.dumps(domain, sort_keys=True, default=str)
+    descriptor = {
+        "model": params.get("model") or params.get("resModel"),
+        "view_type": params.get("view_type") or params.get("viewType") or "list",
+        "active_ids": ids[:MAX_CONTEXT_IDS],
+        "active_count": params.get("active_count") or len(ids),
+        "domain_hash": hashlib.sha1(domain_json.encode()).hexdigest()[:16],
+        # Long domains are left out, the hash still tells when they change
+        "domain": domain if len(domain_json) <= MAX_CONTEXT_DOMAIN_CHARS else None,
+    }
+    # Same shape as what the Json field gives back (lists, no tuples), so an
+    # unchanged descriptor compares equal to the stored one
+    return json.loads(json.dumps(descriptor, default=str))
+
 
 class DiscussChannel(models.Model):
     _inherit = "discuss.channel"
@@ -14,3 +47,19 @@ class DiscussChannel(models.Model):
             channel.is_odoogpt_chat = bool(
                 channel.is_chat and odoogpt.id in channel.channel_partner_ids.ids
             )
+
+    def _set_view_context(self, descriptor):
+        """Store the view descriptor, skipping the write when it is unchanged."""
+        self.ensure_one()
+        if self.view_data != descriptor:
+            self.write({"view_data": descriptor})
+
+    def _view_context_hint(self) -> str:
+        """One line telling the bot which view the chat was opened from."""
+        context = self.view_data or {}
+        if not context.get("model"):
+            return ""
+        hint = f"Vista abierta: {context['model']} ({context.get('view_type')})"
+        if context.get("active_count"):
+            hint += f", {context['active_count']} registros seleccionados"
+        return hint + ". Usa get_view_context si la pregunta se refiere a ellos"
@@ -0,0 +1,230 @@
+"""Embedding service shared by the assistant retrievers.
+
+Texts are deduplicated by content hash and looked up in
+``odoogpt.embedding.cache`` first, only the missing ones reach the embedder.
+Provider calls are split in batches within the provider limits, sent with
+bounded concurrency and retried with exponential backoff on transient errors.
+
+``ODOOGPT_EMBEDDER`` picks the embedder: ``openai`` (the default when an API key
+is configured) or ``hashing``, a local feature hashing model that needs no
+network and always gives the same vectors, used offline and in tests.
+"""
+
+import hashlib
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import openai
+import psycopg2
+from dotenv import load_dotenv
+from odoo import api, fields, models  # type: ignore
+from psycopg2 import errors
+
+from .name_search import _normalize, trigrams
+from .vector_index import normalize
+
+_logger = logging.getLogger(__name__)
+
+load_dotenv()
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_EMBEDDING_MODEL = os.getenv("ODOOGPT_EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDER = os.getenv("ODOOGPT_EMBEDDER", "openai" if OPENAI_API_KEY else "hashing")
+
+# OpenAI accepts up to 2048 inputs and 300k tokens per request, 8191 per input
+MAX_BATCH_SIZE = 512
+MAX_BATCH_CHARS = 400_000
+MAX_INPUT_CHARS = 24_000
+MAX_CONCURRENCY = 4
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+class OpenAIEmbedder:
+    retryable = RETRYABLE_ERRORS
+
+    def __init__(self, model=OPENAI_EMBEDDING_MODEL):
+        self.name = model
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = openai.OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
+        return self._client
+
+    def embed(self, texts):
+        response = self.client.embeddings.create(input=texts, model=self.name)
+        return np.array(
+            [data.embedding for data in sorted(response.data, key=lambda d: d.index)],
+            dtype=np.float32,
+        )
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words and word trigrams, no model to download."""
+
+    retryable = ()
+
+    def __init__(self, dimension=512):
+        self.dimension = dimension
+        self.name = f"hashing-{dimension}"
+
+    def _features(self, text):
+        words = "".join(c if c.isalnum() else " " for c in _normalize(text)).split()
+        return words + sorted(trigrams(text))
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                matrix[row, value % self.dimension] += 1 if value >> 63 else -1
+        return normalize(matrix)
+
+
+EMBEDDERS = {
+    "openai": OpenAIEmbedder,
+    "hashing": HashingEmbedder,
+}
+_embedders = {}
+
+
+def get_embedder(name=None):
+    """Return the shared embedder instance, configured by ``ODOOGPT_EMBEDDER``."""
+    name = name or EMBEDDER
+    if name not in _embedders:
+        _embedders[name] = EMBEDDERS[name]()
+    return _embedders[name]
+
+
+def content_hash(text) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def prepare(text) -> str:
+    return " ".join(str(text or "").split())[:MAX_INPUT_CHARS]
+
+
+def batches(texts):
+    """Split ``texts`` in requests within the provider size limits."""
+    batch, size = [], 0
+    for text in texts:
+        if batch and (
+            len(batch) >= MAX_BATCH_SIZE or size + len(text) > MAX_BATCH_CHARS
+        ):
+            yield batch
+            batch, size = [], 0
+        batch.append(text)
+        size += len(text)
+    if batch:
+        yield batch
+
+
+def embed_with_retry(embedder, texts):
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return embedder.embed(texts)
+        except embedder.retryable as exc:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt)
+            delay *= random.uniform(0.5, 1)
+            _logger.info(f"Embeddings: {exc}, reintento en {delay:.1f}s")
+            time.sleep(delay)
+
+
+class OdooGPTEmbeddingCache(models.Model):
+    _name = "odoogpt.embedding.cache"
+    _description = "Cached text embedding"
+    _log_access = False
+
+    content_hash = fields.Char(required=True)
+    embedding_model = fields.Char(required=True)
+    # Raw float32 bytes, read and written in SQL
+    vector = fields.Binary(attachment=False, required=True)
+
+    _sql_constraints = [
+        (
+            "content_model_unique",
+            "unique(content_hash, embedding_model)",
+            "Only one cached embedding per text and embedding model is allowed.",
+        )
+    ]
+
+    @api.model
+    def _embed(self, texts, embedder=None):
+        """Return the embeddings of ``texts`` as a float32 matrix, in order."""
+        embedder = embedder or get_embedder()
+        texts = [prepare(text) for text in texts]
+        hashes = [content_hash(text) for text in texts]
+        vectors = self._cached(set(hashes), embedder.name)
+
+        missing = {}
+        for text, text_hash in zip(texts, hashes):
+            if text_hash not in vectors:
+                missing.setdefault(text_hash, text)
+        if missing:
+            to_embed = list(missing.values())
+            # Only the provider calls run in threads, the cursor stays here
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as executor:
+                results = list(
+                    executor.map(
+                        lambda batch: embed_with_retry(embedder, batch),
+                        batches(to_embed),
+                    )
+                )
+            computed = dict(zip(missing, np.vstack(results)))
+            try:
+                with self.env.cr.savepoint():
+                    self._store(computed, embedder.name)
+            except errors.ReadOnlySqlTransaction:
+                # Read-only tools run on the replica, skip caching there
+                pass
+            vectors.update(computed)
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([vectors[text_hash] for text_hash in hashes])
+
+    def _cached(self, hashes, model):
+        if not hashes:
+            return {}
+        self.env.cr.execute(
+            """
+            SELECT content_hash, vector
+            FROM odoogpt_embedding_cache
+            WHERE embedding_model = %s AND content_hash = ANY(%s)
+            """,
+            [model, list(hashes)],
+        )
+        return {
+            text_hash: np.frombuffer(bytes(vector), dtype=np.float32)
+            for text_hash, vector in self.env.cr.fetchall()
+        }
+
+    def _store(self, vectors, model):
+        for text_hash, vector in vectors.items():
+            self.env.cr.execute(
+                """
+                INSERT INTO odoogpt_embedding_cache (content_hash, embedding_model, vector)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (content_hash, embedding_model) DO NOTHING
+                """,
+                [
+                    text_hash,
+                    model,
+                    psycopg2.Binary(np.asarray(vector, dtype=np.float32).tobytes()),
+                ],
+            )
@@ -1,12 +1,69 @@
+"""Last view model of each user, tracked without writing on view loads.
+
+Every view load used to write ``res.users.last_view_model``, a row lock and a
+cache invalidation on the hottest UI path that also made parallel tabs of the
+same user fail to serialize. The model is now only remembered in this worker's
+memory, and the pending changes are persisted in one query when the assistant
+needs them, that is when its chat is opened.
+"""
+
+import threading
+
 from odoo import models  # type: ignore
 
+# (dbname, uid) -> model last seen by this worker, and the ones not persisted
+_seen = {}
+_pending = {}
+_lock = threading.Lock()
+
+
+def remember_view_model(dbname, uid, model):
+    key = (dbname, uid)
+    # Plain read first, the lock is only taken when the user changes of model
+    if _seen.get(key) == model:
+        return
+    with _lock:
+        _seen[key] = model
+        _pending[key] = model
+
+
+def flush_view_models(env):
+    """Persist the view models seen by this worker for ``env``'s database."""
+    dbname = env.cr.dbname
+    with _lock:
+        pending = {uid: model for (db, uid), model in _pending.items() if db == dbname}
+    if not pending:
+        return
+    env.cr.execute(
+        """
+        UPDATE res_users SET last_view_model = seen.model
+        FROM (
+            SELECT unnest(%s::int[]) AS id, unnest(%s::varchar[]) AS model
+        ) seen
+        WHERE res_users.id = seen.id
+          AND res_users.last_view_model IS DISTINCT FROM seen.model
+        """,
+        [list(pending), list(pending.values())],
+    )
+    env["res.users"].invalidate_model(["last_view_model"])
+
+    # Only forget them once persisted, a rolled back transaction flushes them
+    # again the next time
+    @env.cr.postcommit.add
+    def forget():
+        with _lock:
+            for uid, model in pending.items():
+                # The user may have changed of model since the flush
+                if _pending.get((dbname, uid)) == model:
+                    del _pending[(dbname, uid)]
+
 
 class IrUiView(models.Model):
     _inherit = "ir.ui.view"
 
     def _get_combined_arch(self):
-        """Save the last view model requested"""
+        """Remember the last view model requested"""
         res = super(IrUiView, self)._get_combined_arch()
-        if self.model and self.env.user.last_view_model != self.model:
-            self.env.user.sudo().last_view_model = self.model
+        if self.model:
+            remember_view_model(self.env.cr.dbname, self.env.uid, self.model)
         return res
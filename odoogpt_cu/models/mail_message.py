@@ -1,7 +1,7 @@
-import base64
 import logging
 import os
 import secrets
+from contextlib import contextmanager
 from datetime import datetime
 from io import BytesIO
 
@@ -10,17 +10,69 @@ import openpyxl
 from docx import Document
 from markupsafe import Markup
 from odoo import _, api, exceptions, models  # type: ignore
+from odoo.tools import html2plaintext  # type: ignore
 from PyPDF2 import PdfReader
 
+from .attachment_extractors import extract_csv, extract_odt, extract_pptx, extract_txt
 from .completions import agent
 from .enumerations import MessageType
 from .prompt import JSON_TOOLS, SYSTEM_PROMPT
-from .tools import send_odoo_msg, tools_func
+from .spreadsheet_profile import profile_rows
+from .tool_budget import cancel_channel_tools, is_stop_request
+from .tools import _stock_by_product, send_odoo_msg, tools_func
 from .utils import UserPhone, format_phone_number
 
 _logger = logging.getLogger(__name__)
 ENV = os.getenv("ENV", "prod")
 
+ATTACHMENT_MIMETYPES = {
+    "application/pdf": "pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": "pptx",
+    "application/vnd.oasis.opendocument.text": "odt",
+    "text/csv": "csv",
+    "text/plain": "txt",
+}
+ATTACHMENT_EXTENSIONS = {
+    ".pdf": "pdf",
+    ".docx": "docx",
+    ".xlsx": "xlsx",
+    ".pptx": "pptx",
+    ".odt": "odt",
+    ".csv": "csv",
+    ".txt": "txt",
+}
+
+TABLE_EXPORT_TYPES = {
+    "boolean",
+    "char",
+    "date",
+    "datetime",
+    "float",
+    "integer",
+    "many2one",
+    "monetary",
+    "selection",
+    "text",
+}
+TABLE_EXPORT_PAGE = 500
+TABLE_EXPORT_MAX_ROWS = 2000
+TABLE_EXPORT_MAX_BYTES = 64 * 1024
+TABLE_CELL_CHARS = 80
+
+
+def _table_cell(value) -> str:
+    if value is False or value is None:
+        return ""
+    if isinstance(value, tuple):
+        # many2one as (id, display_name)
+        value = value[1]
+    text = str(value).replace("\n", " ").replace("|", "/").strip()
+    if len(text) > TABLE_CELL_CHARS:
+        text = text[: TABLE_CELL_CHARS - 1] + "…"
+    return text
+
 
 class MailMessage(models.Model):
     _inherit = "mail.message"
@@ -40,6 +92,13 @@ class MailMessage(models.Model):
         for chat in chats:
             channel_id = mail_channel_obj.browse(chat.res_id).exists()
             if channel_id.is_odoogpt_chat:
+                if is_stop_request(html2plaintext(chat.body or "")):
+                    # "stop" cancels the running tool queries instead of asking the bot
+                    cancelled = cancel_channel_tools(self.env.cr, channel_id)
+                    _logger.info(
+                        f"Stop en {channel_id.id}: {cancelled} consultas canceladas"
+                    )
+                    continue
                 if ENV == "dev":
                     chat._send_message_to_odoogpt(odoogpt, channel_id)
                 else:
@@ -61,7 +120,65 @@ class MailMessage(models.Model):
                 email_from=odoogpt.email,
             )
 
-    def _get_table_data(self, table_name):
+    def _table_export_fields(self, model, fields=None):
+        """Stored scalar fields of the model, or the valid ones of ``fields``."""
+        if fields:
+            return [
+                name
+                for name in fields
+                if name in model._fields
+                and model._fields[name].type in TABLE_EXPORT_TYPES
+            ]
+        return [
+            name
+            for name, field in model._fields.items()
+            if field.store and field.type in TABLE_EXPORT_TYPES
+        ]
+
+    def _iter_table_data(
+        self,
+        table_name,
+        fields=None,
+        domain=None,
+        max_rows=TABLE_EXPORT_MAX_ROWS,
+        max_bytes=TABLE_EXPORT_MAX_BYTES,
+    ):
+        """Yield the records of a model as compact ``a | b | c`` lines.
+
+        The first line is the header. Records are read by pages following the
+        id (keyset pagination, so deep pages cost the same as the first one)
+        and the export stops with a marker line once a budget is reached.
+        """
+        model = self.env[table_name].sudo()
+        fnames = self._table_export_fields(model, fields)
+        if "id" not in fnames:
+            fnames.insert(0, "id")
+
+        header = " | ".join(fnames)
+        yield header
+        size = len(header.encode())
+        rows = 0
+        last_id = 0
+        while True:
+            records = model.search_read(
+                (domain or []) + [("id", ">", last_id)],
+                fnames,
+                limit=TABLE_EXPORT_PAGE,
+                order="id",
+            )
+            for record in records:
+                if rows >= max_rows or size >= max_bytes:
+                    yield f"...[exportación truncada: {rows} filas, límite alcanzado]"
+                    return
+                line = " | ".join(_table_cell(record[fname]) for fname in fnames)
+                size += len(line.encode()) + 1
+                rows += 1
+                yield line
+            if len(records) < TABLE_EXPORT_PAGE:
+                return
+            last_id = records[-1]["id"]
+
+    def _get_table_data(self, table_name, fields=None, domain=None):
         try:
             self.ensure_one()
             if "_" in table_name:
@@ -70,18 +187,12 @@ class MailMessage(models.Model):
             if table_name not in self.env:
                 raise ValueError(f"No table named {table_name} exists.")
 
-            table_records = self.env[table_name].sudo().search([])
-            if not table_records:
+            lines = list(
+                self._iter_table_data(table_name, fields=fields, domain=domain)
+            )
+            if len(lines) == 1:
                 raise ValueError(f"No value in {table_name} table.")
-
-            table_info = {
-                record.id: {
-                    field: getattr(record, field)
-                    for field in self.env[table_name]._fields.keys()
-                }
-                for record in table_records
-            }
-            return str(table_info)
+            return "\n".join(lines)
 
         except Exception:
             raise ValueError(f"Problem with the {table_name} table.")
@@ -98,6 +209,9 @@ class MailMessage(models.Model):
         # Prepare current date context
         today = datetime.now().strftime("%Y-%m-%d")
         date_context = f"Fecha actual: {today}"
+        view_hint = channel_id._view_context_hint()
+        if view_hint:
+            date_context += f"\n{view_hint}"
 
         # Get only the current user message (no conversation history)
         human_input = str(self.body).replace("<p>", "").replace("</p>", "")
@@ -168,34 +282,27 @@ class MailMessage(models.Model):
         return memory
 
     # ------- Attachments extraction helpers -------
+    def _get_attachment_kind(self, attachment) -> str | None:
+        if attachment.mimetype in ATTACHMENT_MIMETYPES:
+            return ATTACHMENT_MIMETYPES[attachment.mimetype]
+        ext = os.path.splitext((attachment.name or "").lower())[1]
+        return ATTACHMENT_EXTENSIONS.get(ext)
+
     def _build_attachments_context(self, max_total_chars: int = 6000) -> str:
         """Build a textual context from the supported attachments in this message.
         Limits total aggregated size to avoid overloading the model.
         """
-        supported_mimes = {
-            "application/pdf": "pdf",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
-            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
-        }
         context_parts = []
         total = 0
+        # Truncate per attachment to be safe
+        per_limit = 3000
         for att in self.attachment_ids:
-            ext = (att.name or "").lower()
-            kind = None
-            if att.mimetype in supported_mimes:
-                kind = supported_mimes[att.mimetype]
-            elif ext.endswith(".pdf"):
-                kind = "pdf"
-            elif ext.endswith(".docx"):
-                kind = "docx"
-            elif ext.endswith(".xlsx"):
-                kind = "xlsx"
-
+            kind = self._get_attachment_kind(att)
             if not kind:
                 continue
 
             try:
-                text = self._extract_attachment_text(att, kind)
+                text = self._extract_attachment_text(att, kind, max_chars=per_limit)
             except Exception as e:
                 _logger.warning(f"No se pudo extraer texto de {att.name}: {e}")
                 continue
@@ -203,12 +310,10 @@ class MailMessage(models.Model):
             if not text:
                 continue
 
-            # Truncate per attachment to be safe
-            per_limit = 3000
             text = text.strip()
             if len(text) > per_limit:
                 text = text[:per_limit] + "\n...[contenido truncado]"
-                print(
+                _logger.info(
                     f"Contenido del archivo truncado por exceder los {per_limit} caracteres"
                 )
 
@@ -227,18 +332,37 @@ class MailMessage(models.Model):
 
         return "".join(context_parts).strip()
 
-    def _extract_attachment_text(self, attachment, kind: str) -> str:
-        data = attachment.datas or False
-        if not data:
-            return ""
-        raw = base64.b64decode(data)
-        bio = BytesIO(raw)
-        if kind == "pdf":
-            return self._extract_pdf(bio)
-        if kind == "docx":
-            return self._extract_docx(bio)
-        if kind == "xlsx":
-            return self._extract_xlsx(bio)
+    @contextmanager
+    def _open_attachment(self, attachment):
+        """Open the attachment content as a binary stream.
+
+        Files stored in the filestore are read from disk in chunks instead of
+        decoding the whole ``datas`` payload in memory.
+        """
+        if attachment.store_fname:
+            with open(attachment._full_path(attachment.store_fname), "rb") as stream:
+                yield stream
+        else:
+            yield BytesIO(attachment.raw or b"")
+
+    def _extract_attachment_text(
+        self, attachment, kind: str, max_chars: int = 3000
+    ) -> str:
+        with self._open_attachment(attachment) as stream:
+            if kind == "pdf":
+                return self._extract_pdf(stream)
+            if kind == "docx":
+                return self._extract_docx(stream)
+            if kind == "xlsx":
+                return self._extract_xlsx(stream, max_chars=max_chars)
+            if kind == "csv":
+                return extract_csv(stream, max_chars, title=attachment.name or "CSV")
+            if kind == "txt":
+                return extract_txt(stream, max_chars)
+            if kind == "odt":
+                return extract_odt(stream, max_chars)
+            if kind == "pptx":
+                return extract_pptx(stream, max_chars)
         return ""
 
     def _extract_pdf(self, bio: BytesIO, max_pages: int = 20) -> str:
@@ -265,28 +389,26 @@ class MailMessage(models.Model):
         )
         return "\n".join(paras)
 
-    def _extract_xlsx(self, bio: BytesIO, max_cells: int = 5000) -> str:
+    def _extract_xlsx(self, bio: BytesIO, max_chars: int = 3000) -> str:
+        """Profile every sheet instead of dumping its cells.
+
+        The workbook is streamed in read-only mode and each sheet is reduced to
+        its header, column types, aggregates and a small sample of rows.
+        """
         wb = openpyxl.load_workbook(bio, data_only=True, read_only=True)
         out = []
-        cells_count = 0
-        for ws in wb.worksheets:
-            out.append(f"[Hoja] {ws.title}")
-            for row in ws.iter_rows(values_only=True):
-                # Build a CSV-like line
-                vals = []
-                for v in row:
-                    vals.append("" if v is None else str(v))
-                line = ", ".join(vals).strip()
-                if line:
-                    out.append(line)
-                    cells_count += len(vals)
-                    if cells_count >= max_cells:
-                        out.append("...[contenido de hoja truncado]")
-                        break
-            if cells_count >= max_cells:
-                break
+        try:
+            for ws in wb.worksheets:
+                remain = max_chars - sum(len(part) + 1 for part in out)
+                if remain <= 0:
+                    out.append("...[hojas restantes omitidas]")
+                    break
+                profile = profile_rows(ws.title, ws.iter_rows(values_only=True))
+                out.append(profile.render(max_chars=remain))
+        finally:
+            wb.close()
 
-        _logger.info(f"Contenido del xlsx de {enumerate(wb.worksheets)} hojas extraido")
+        _logger.info(f"Perfil del xlsx de {len(out)} hojas calculado")
         return "\n".join(out)
 
     def _get_memory2(self, odoogpt, channel_id, limit=20):
@@ -331,6 +453,7 @@ class MailMessage(models.Model):
     def get_partner(
         self, phone=None, email=None, partner_id=None, name=None, phone_domain=[]
     ):
+        ranked_ids = None
         if phone:
             domain = [("phone", "=", phone)]
         elif phone_domain:
@@ -340,7 +463,10 @@ class MailMessage(models.Model):
         elif partner_id:
             domain = [("id", "=", partner_id)]
         elif name:
-            domain = [("name", "ilike", name)]
+            ranked_ids = self.env["odoogpt.name.search"]._search_ids(
+                "res.partner", name
+            )
+            domain = [("id", "in", ranked_ids)]
         else:
             domain = [("name", "!=", ""), ("email", "!=", ""), ("phone", "!=", "")]
 
@@ -361,6 +487,9 @@ class MailMessage(models.Model):
         ]
 
         partner = self.fetch_odoo_records("res.partner", domain, fields=fields)
+        if partner and ranked_ids is not None:
+            # Best matches first
+            partner.sort(key=lambda p: ranked_ids.index(p["id"]))
         if partner:
             _logger.info(f"Partners encontrados: {partner}")
             return partner  # pueden ser mas de 1
@@ -397,7 +526,10 @@ class MailMessage(models.Model):
         if sku:
             domain.append(("default_code", "=", sku))
         elif name:
-            domain.append(("name", "ilike", name))
+            ranked_ids = self.env["odoogpt.name.search"]._search_ids(
+                "product.product", name, limit=1
+            )
+            domain.append(("id", "in", ranked_ids))
         elif id:
             domain.append(("id", "=", id))
 
@@ -498,7 +630,8 @@ class MailMessage(models.Model):
         if name:
             domain.append(("name", "ilike", name))
         elif id:
-            domain.append(("id", "=", id))
+            # Looked up by id, free orders (zero total) are returned too
+            domain = [("id", "=", id)]
 
         fields = [
             "id",
@@ -614,22 +747,19 @@ class MailMessage(models.Model):
 
     @api.model
     def get_products_by_category(self, category_name):
-        categories = (
-            self.env["product.category"]
-            .sudo()
-            .search([("name", "ilike", category_name)])
+        category_ids = self.env["odoogpt.name.search"]._search_ids(
+            "product.category", category_name
         )
-        product_data = []
-        for category in categories:
-            products = (
-                self.env["product.product"]
-                .sudo()
-                .search([("categ_id", "=", category.id), ("active", "=", True)])
-            )
-            product_data.extend(
-                products.read(["id", "name", "list_price", "qty_available"])
+        if not category_ids:
+            return []
+        return (
+            self.env["product.product"]
+            .sudo()
+            .search_read(
+                [("categ_id", "child_of", category_ids), ("active", "=", True)],
+                ["id", "name", "list_price", "qty_available"],
             )
-        return product_data
+        )
 
     @api.model
     def get_category(self, id=None, name=None, parent_id=None):
@@ -694,76 +824,94 @@ class MailMessage(models.Model):
 
         return order_list
 
-    # Crear línea de producto para un pedido
+    # Crear líneas de pedido para varios productos a la vez
     @api.model
     def create_order_line(self, products):
+        """Resolve the requested products and check their stock in bulk.
+
+        ``products`` is a list of dicts with ``default_code`` or ``product_id``
+        and ``uom_qty``. Returns the order line values (priced later by the
+        order pricelist) and the list of problems found, one per skipped line.
+        """
+        codes = [p["default_code"] for p in products if p.get("default_code")]
+        ids = [int(p["product_id"]) for p in products if p.get("product_id")]
+        found = (
+            self.env["product.product"]
+            .sudo()
+            .search_read(
+                [
+                    "|",
+                    ("default_code", "in", codes),
+                    ("id", "in", ids),
+                    ("sale_ok", "=", True),
+                ],
+                ["id", "name", "default_code", "detailed_type"],
+            )
+        )
+        by_code = {product["default_code"]: product for product in found}
+        by_id = {product["id"]: product for product in found}
+        stock = _stock_by_product(
+            self, [p["id"] for p in found if p["detailed_type"] == "product"]
+        )
+
         order_lines = []
+        issues = []
         for product_info in products:
             product = (
-                self.env["product.product"]
-                .sudo()
-                .search([("default_code", "=", product_info["default_code"])], limit=1)
+                by_code.get(product_info.get("default_code"))
+                if product_info.get("default_code")
+                else by_id.get(int(product_info.get("product_id") or 0))
+            )
+            reference = product_info.get("default_code") or product_info.get(
+                "product_id"
             )
             if not product:
-                _logger.warning(
-                    _("Producto con SKU %s no existe"), product_info["default_code"]
-                )
+                _logger.warning(_("Producto con SKU %s no existe"), reference)
+                issues.append(f"No existe el producto {reference}")
                 continue
 
-            if product.qty_available < product_info["uom_qty"]:
+            qty = float(product_info["uom_qty"])
+            if (
+                product["detailed_type"] == "product"
+                and stock.get(product["id"], 0.0) < qty
+            ):
                 _logger.warning(
                     _("Producto %s con SKU %s está agotado"),
-                    product.name,
-                    product.default_code,
+                    product["name"],
+                    product["default_code"],
+                )
+                issues.append(
+                    f"Stock insuficiente de {product['name']}: "
+                    f"{stock.get(product['id'], 0.0)} disponibles, {qty} solicitados"
                 )
                 continue
 
-            order_line_data = {
-                "product_id": product.id,
-                "product_uom_qty": product_info["uom_qty"],
-                "price_unit": product.list_price * product_info["uom_qty"],
-            }
-            order_lines.append(order_line_data)
-        return order_lines
+            order_lines.append({"product_id": product["id"], "product_uom_qty": qty})
+        return order_lines, issues
 
-    # Obtener IDs de categorías hijas para una categoría dada
+    # Obtener IDs de la categoría y todas sus descendientes
     @api.model
     def get_children_ids(self, category_id):
-        category = self.env["product.category"].sudo().browse(category_id)
-        if not category.exists():
+        tree = self.env["odoogpt.category.tree"]
+        ids = tree._subtree_ids([category_id])
+        if not ids:
             _logger.warning(_("Categoría con ID %s no existe"), category_id)
-            return []
-        all_children = category.child_id
-        return all_children.mapped("id")
+        return ids
 
     @api.model
-    def get_products_by_category_id(self, category_id):
-        category = self.env["product.category"].sudo().browse(category_id)
-        if not category.exists():
-            _logger.warning("Categoría con ID %s no existe", category_id)
-            return []
-
-        child_categories = category.child_id
-        all_categories = child_categories + category
-
-        domain = [("categ_id", "in", all_categories.ids), ("active", "=", True)]
-        products = self.env["product.product"].sudo().search(domain)
-        return products.read(["id", "name", "list_price", "qty_available"])
+    def get_products_by_category_id(self, category_id, limit=None, offset=0):
+        return self.env["odoogpt.category.tree"]._products_by_category(
+            [category_id], limit=limit, offset=offset
+        )
 
     @api.model
-    def get_products_by_category_name(self, category_name):
-        categories = (
-            self.env["product.category"]
-            .sudo()
-            .search([("name", "ilike", category_name)])
+    def get_products_by_category_name(self, category_name, limit=None, offset=0):
+        category_ids = self.env["odoogpt.name.search"]._search_ids(
+            "product.category", category_name
+        )
+        return self.env["odoogpt.category.tree"]._products_by_category(
+            category_ids, limit=limit, offset=offset
         )
-        products_by_category = {}
-
-        for category in categories:
-            products = self.get_products_by_category_id(category.id)
-            products_by_category[category.name] = products
-
-        return products_by_category
 
     # ======= CALENDAR EVENT METHODS =======
 
@@ -812,6 +960,7 @@ class MailMessage(models.Model):
         partner_id=None,
         limit=20,
         search_term=None,
+        offset=0,
     ):
         """
         Consultar eventos de calendario.
@@ -822,6 +971,7 @@ class MailMessage(models.Model):
             partner_id (int, optional): ID del contacto
             limit (int, optional): Límite de resultados
             search_term (str, optional): Término de búsqueda
+            offset (int, optional): Eventos a saltar para paginar
         """
         calendar_model = self.env["calendar.event"]
         return calendar_model.get_calendar_events(
@@ -830,6 +980,7 @@ class MailMessage(models.Model):
             partner_id=partner_id,
             limit=limit,
             search_term=search_term,
+            offset=offset,
         )
 
     @api.model
@@ -0,0 +1,220 @@
+"""Typo tolerant name lookups for the assistant tools.
+
+Names extracted by the model often carry typos or partial words, so plain
+``ilike '%x%'`` scans both miss them and cannot use an index. When the
+``pg_trgm`` extension is available, candidates are filtered with the word
+similarity operator (backed by GIN trigram indexes) and ranked by score. Without
+it, a trigram index is built in memory per table and refreshed when the table
+changes.
+"""
+
+import logging
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+import psycopg2
+from odoo import api, models, tools  # type: ignore
+from odoo.tools.sql import create_index  # type: ignore
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.4
+DEFAULT_LIMIT = 10
+
+# Searchable models: FROM clause, filter, translated name, extra code column,
+# change stamp for the memory index and the trigram indexes to create as
+# (index name, table, indexed expression)
+SEARCH_TARGETS = {
+    "product.product": {
+        "from": """
+            product_product rec
+            JOIN product_template tmpl ON tmpl.id = rec.product_tmpl_id
+        """,
+        "where": "rec.active AND tmpl.active",
+        "name": "COALESCE(tmpl.name->>%(lang)s, tmpl.name->>'en_US')",
+        "indexed_name": "(jsonb_path_query_array(tmpl.name, '$.*')::text)",
+        "code": "rec.default_code",
+        "stamp": "MAX(GREATEST(rec.write_date, tmpl.write_date))",
+        "indexes": [
+            (
+                "product_template_odoogpt_name_trgm_index",
+                "product_template",
+                "(jsonb_path_query_array(name, '$.*')::text) gin_trgm_ops",
+            ),
+            (
+                "product_product_odoogpt_default_code_trgm_index",
+                "product_product",
+                "default_code gin_trgm_ops",
+            ),
+        ],
+    },
+    "res.partner": {
+        "from": "res_partner rec",
+        "where": "rec.active",
+        "name": "rec.name",
+        "indexed_name": "rec.name",
+        "code": None,
+        "indexes": [
+            ("res_partner_odoogpt_name_trgm_index", "res_partner", "name gin_trgm_ops"),
+        ],
+    },
+    "product.category": {
+        "from": "product_category rec",
+        "where": "TRUE",
+        "name": "rec.name",
+        "indexed_name": "rec.name",
+        "code": None,
+        "indexes": [
+            (
+                "product_category_odoogpt_name_trgm_index",
+                "product_category",
+                "name gin_trgm_ops",
+            ),
+        ],
+    },
+}
+
+
+def _normalize(text) -> str:
+    text = unicodedata.normalize("NFKD", str(text or "").lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def trigrams(text) -> set:
+    """Trigrams of every word, padded like pg_trgm does."""
+    grams = set()
+    for word in "".join(c if c.isalnum() else " " for c in _normalize(text)).split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NgramIndex:
+    """In-memory inverted trigram index used when pg_trgm is not available."""
+
+    def __init__(self, rows, stamp=None):
+        self.stamp = stamp
+        self.names = {}
+        self.postings = defaultdict(list)
+        for record_id, *texts in rows:
+            self.names[record_id] = texts[0]
+            for gram in set().union(*(trigrams(text) for text in texts if text)):
+                self.postings[gram].append(record_id)
+
+    def search(self, term, limit=DEFAULT_LIMIT, threshold=DEFAULT_THRESHOLD):
+        query = trigrams(term)
+        if not query:
+            return []
+        hits = Counter()
+        for gram in query:
+            hits.update(self.postings.get(gram, ()))
+        # Share of the query trigrams found in the record, like word_similarity
+        scored = [
+            (record_id, self.names[record_id], count / len(query))
+            for record_id, count in hits.items()
+            if count / len(query) >= threshold
+        ]
+        scored.sort(key=lambda row: (-row[2], row[0]))
+        return scored[:limit]
+
+
+_memory_indexes = {}
+_memory_lock = threading.Lock()
+
+
+class OdooGPTNameSearch(models.AbstractModel):
+    _name = "odoogpt.name.search"
+    _description = "OdooGPT typo tolerant name search"
+
+    def init(self):
+        cr = self.env.cr
+        try:
+            with cr.savepoint(flush=False):
+                cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except psycopg2.Error:
+            _logger.info("pg_trgm no disponible, se usará el índice de trigramas en memoria")
+            return
+        for target in SEARCH_TARGETS.values():
+            for index_name, table, expression in target["indexes"]:
+                create_index(cr, index_name, table, [expression], method="gin")
+
+    @api.model
+    @tools.ormcache()
+    def _has_trigram(self):
+        self.env.cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return bool(self.env.cr.fetchone())
+
+    @api.model
+    def _search_ranked(
+        self, model_name, term, limit=DEFAULT_LIMIT, threshold=DEFAULT_THRESHOLD
+    ):
+        """Return ``[(id, name, score)]`` of the records best matching ``term``."""
+        term = (term or "").strip()
+        if not term:
+            return []
+        target = SEARCH_TARGETS[model_name]
+        self.env.flush_all()
+        if self._has_trigram():
+            return self._search_trigram(target, term, limit, threshold)
+        return self._memory_index(model_name, target).search(term, limit, threshold)
+
+    @api.model
+    def _search_ids(self, model_name, term, limit=DEFAULT_LIMIT, threshold=DEFAULT_THRESHOLD):
+        return [row[0] for row in self._search_ranked(model_name, term, limit, threshold)]
+
+    def _search_trigram(self, target, term, limit, threshold):
+        name_score = f"word_similarity(%(term)s, {target['name']})"
+        match = f"%(term)s <%% {target['indexed_name']}"
+        if target["code"]:
+            name_score = (
+                f"GREATEST({name_score}, "
+                f"COALESCE(word_similarity(%(term)s, {target['code']}), 0))"
+            )
+            match = f"({match} OR %(term)s <%% {target['code']})"
+
+        cr = self.env.cr
+        # The operator threshold drives the index scan, the score does the ranking
+        cr.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+            [str(threshold)],
+        )
+        cr.execute(
+            f"""
+            SELECT rec.id, {target['name']} AS name, {name_score} AS score
+            FROM {target['from']}
+            WHERE {target['where']} AND {match}
+            ORDER BY score DESC, rec.id
+            LIMIT %(limit)s
+            """,
+            {"term": term, "lang": self.env.lang or "en_US", "limit": limit},
+        )
+        return [row for row in cr.fetchall() if row[2] >= threshold]
+
+    def _memory_index(self, model_name, target):
+        cr = self.env.cr
+        # Any create, write or delete changes the count or the last write date
+        cr.execute(
+            f"""
+            SELECT COUNT(*), {target.get('stamp', 'MAX(rec.write_date)')}
+            FROM {target['from']}
+            WHERE {target['where']}
+            """
+        )
+        stamp = cr.fetchone()
+        key = (cr.dbname, model_name, self.env.lang)
+        index = _memory_indexes.get(key)
+        if index is None or index.stamp != stamp:
+            code = target["code"] or "NULL"
+            cr.execute(
+                f"""
+                SELECT rec.id, {target['name']}, {code}
+                FROM {target['from']}
+                WHERE {target['where']}
+                """,
+                {"lang": self.env.lang or "en_US"},
+            )
+            index = NgramIndex(cr.fetchall(), stamp=stamp)
+            with _memory_lock:
+                _memory_indexes[key] = index
+        return index
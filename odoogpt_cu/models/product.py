@@ -0,0 +1,71 @@
+from odoo import api, fields, models  # type: ignore
+
+from .record_index import RECORD_SOURCES
+
+LOW_STOCK_HELP = (
+    "Cantidad mínima por debajo de la cual OdooGPT considera el stock bajo. "
+    "0 hereda el valor de la categoría o el parámetro odoogpt.low_stock_threshold"
+)
+
+
+class ProductTemplate(models.Model):
+    _inherit = "product.template"
+
+    odoogpt_low_stock_threshold = fields.Float(
+        string="Stock mínimo (OdooGPT)", help=LOW_STOCK_HELP
+    )
+
+    def write(self, vals):
+        res = super().write(vals)
+        if RECORD_SOURCES["product.product"]["depends"].intersection(vals):
+            self.env["odoogpt.record.embedding"]._mark_stale(
+                "product.product",
+                self.with_context(active_test=False).product_variant_ids.ids,
+            )
+        return res
+
+
+class ProductProduct(models.Model):
+    _inherit = "product.product"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        products = super().create(vals_list)
+        self.env["odoogpt.record.embedding"]._mark_stale(
+            "product.product", products.ids
+        )
+        return products
+
+    def write(self, vals):
+        res = super().write(vals)
+        if RECORD_SOURCES["product.product"]["depends"].intersection(vals):
+            self.env["odoogpt.record.embedding"]._mark_stale(
+                "product.product", self.ids
+            )
+        return res
+
+    def unlink(self):
+        ids = self.ids
+        res = super().unlink()
+        self.env["odoogpt.record.embedding"]._forget("product.product", ids)
+        return res
+
+
+class ProductCategory(models.Model):
+    _inherit = "product.category"
+
+    odoogpt_low_stock_threshold = fields.Float(
+        string="Stock mínimo (OdooGPT)", help=LOW_STOCK_HELP
+    )
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"name", "parent_id"}.intersection(vals):
+            # The category path is part of the product embeddings
+            products = self.env["product.product"].search(
+                [("categ_id", "child_of", self.ids)]
+            )
+            self.env["odoogpt.record.embedding"]._mark_stale(
+                "product.product", products.ids
+            )
+        return res
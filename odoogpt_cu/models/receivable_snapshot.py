@@ -0,0 +1,220 @@
+import logging
+
+from odoo import api, fields, models  # type: ignore
+
+_logger = logging.getLogger(__name__)
+
+# Aggregates posted customer invoices per (partner, company, currency, day).
+# The caller fills the join restricting the invoices to aggregate.
+RECEIVABLE_SELECT = """
+    SELECT am.commercial_partner_id,
+           am.company_id,
+           am.currency_id,
+           am.invoice_date,
+           COUNT(*) AS invoice_count,
+           SUM(am.amount_total) AS amount_total,
+           COUNT(*) FILTER (WHERE am.payment_state = 'paid') AS paid_count,
+           COALESCE(SUM(am.amount_total) FILTER (WHERE am.payment_state = 'paid'), 0) AS paid_amount,
+           SUM(am.amount_residual) AS amount_residual,
+           COALESCE(SUM(am.amount_total_signed) FILTER (WHERE am.payment_state = 'paid'), 0) AS paid_amount_company,
+           SUM(am.amount_residual_signed) AS amount_residual_company
+    FROM account_move am
+    {join}
+    WHERE am.move_type = 'out_invoice'
+      AND am.state = 'posted'
+      AND am.invoice_date IS NOT NULL
+      AND am.commercial_partner_id IS NOT NULL
+      {where}
+    GROUP BY am.commercial_partner_id, am.company_id, am.currency_id, am.invoice_date
+"""
+
+INSERT_COLUMNS = """
+    (partner_id, company_id, currency_id, day,
+     invoice_count, amount_total, paid_count, paid_amount, amount_residual,
+     paid_amount_company, amount_residual_company)
+"""
+
+MEASURES = ("invoice_count", "paid_count", "paid_amount", "amount_residual")
+# Amounts are ranked in company currency, invoice currencies are not comparable
+COMPANY_MEASURES = {
+    "paid_amount": "paid_amount_company",
+    "amount_residual": "amount_residual_company",
+}
+
+
+class OdooGPTReceivable(models.Model):
+    _name = "odoogpt.receivable"
+    _inherit = "odoogpt.snapshot.mixin"
+    _description = "Daily customer invoices and payments per partner"
+    _order = "day desc, partner_id"
+    _log_access = False
+
+    partner_id = fields.Many2one(
+        "res.partner",
+        required=True,
+        ondelete="cascade",
+        help="Commercial partner of the invoices",
+    )
+    company_id = fields.Many2one("res.company", required=True, ondelete="cascade")
+    currency_id = fields.Many2one("res.currency", required=True, ondelete="cascade")
+    day = fields.Date(required=True, help="Invoice date")
+    invoice_count = fields.Integer()
+    amount_total = fields.Monetary()
+    paid_count = fields.Integer()
+    paid_amount = fields.Monetary()
+    amount_residual = fields.Monetary()
+    company_currency_id = fields.Many2one(related="company_id.currency_id")
+    paid_amount_company = fields.Monetary(currency_field="company_currency_id")
+    amount_residual_company = fields.Monetary(currency_field="company_currency_id")
+
+    _sql_constraints = [
+        (
+            "bucket_unique",
+            "unique(day, company_id, partner_id, currency_id)",
+            "Only one receivable row per partner, company, currency and day is allowed.",
+        )
+    ]
+
+    def _refresh_buckets(self, keys):
+        partner_ids, company_ids, currency_ids, days = zip(*keys)
+        params = {
+            "partner_ids": list(partner_ids),
+            "company_ids": list(company_ids),
+            "currency_ids": list(currency_ids),
+            "days": list(days),
+        }
+        buckets = """
+            SELECT * FROM unnest(
+                %(partner_ids)s::int[], %(company_ids)s::int[],
+                %(currency_ids)s::int[], %(days)s::date[]
+            ) AS bucket(partner_id, company_id, currency_id, day)
+        """
+        fresh = RECEIVABLE_SELECT.format(
+            join="""
+            JOIN bucket
+              ON bucket.partner_id = am.commercial_partner_id
+             AND bucket.company_id = am.company_id
+             AND bucket.currency_id = am.currency_id
+             AND bucket.day = am.invoice_date
+            """,
+            where="",
+        )
+        # Upserted like the sales demand, concurrent postings creating the same
+        # bucket end in a retried serialization failure
+        self.env.cr.execute(
+            f"""
+            WITH bucket AS ({buckets}),
+            fresh AS ({fresh}),
+            upserted AS (
+                INSERT INTO {self._table} {INSERT_COLUMNS}
+                SELECT * FROM fresh
+                ON CONFLICT (partner_id, company_id, currency_id, day) DO UPDATE
+                SET invoice_count = EXCLUDED.invoice_count,
+                    amount_total = EXCLUDED.amount_total,
+                    paid_count = EXCLUDED.paid_count,
+                    paid_amount = EXCLUDED.paid_amount,
+                    amount_residual = EXCLUDED.amount_residual,
+                    paid_amount_company = EXCLUDED.paid_amount_company,
+                    amount_residual_company = EXCLUDED.amount_residual_company
+            )
+            DELETE FROM {self._table} receivable
+            USING bucket
+            WHERE receivable.partner_id = bucket.partner_id
+              AND receivable.company_id = bucket.company_id
+              AND receivable.currency_id = bucket.currency_id
+              AND receivable.day = bucket.day
+              AND NOT EXISTS (
+                  SELECT FROM fresh
+                  WHERE fresh.commercial_partner_id = bucket.partner_id
+                    AND fresh.company_id = bucket.company_id
+                    AND fresh.currency_id = bucket.currency_id
+                    AND fresh.invoice_date = bucket.day
+              )
+            """,
+            params,
+        )
+        self.env.invalidate_all()
+
+    @api.model
+    def _backfill(self, date_from=None):
+        """Rebuild the receivables table from the posted customer invoices."""
+        self.env.flush_all()
+        params = {"date_from": date_from}
+        self.env.cr.execute(
+            f"DELETE FROM {self._table}"
+            + (" WHERE day >= %(date_from)s" if date_from else ""),
+            params,
+        )
+        self.env.cr.execute(
+            f"INSERT INTO {self._table} {INSERT_COLUMNS}"
+            + RECEIVABLE_SELECT.format(
+                join="",
+                where="AND am.invoice_date >= %(date_from)s" if date_from else "",
+            ),
+            params,
+        )
+        _logger.info(f"Resumen de cobros reconstruido: {self.env.cr.rowcount} filas")
+        self.env.invalidate_all()
+        return True
+
+    @api.model
+    def _partner_ranking(
+        self, measure, start_date, end_date=None, limit=None, by_currency=False
+    ):
+        """Rank partners by the sum of ``measure`` over an invoice date range.
+
+        Amounts are ranked, totaled (``grand_total``) and reported in company
+        currency, given in ``currency``. With ``by_currency`` each row also gets
+        ``amounts``, its ``[{currency, amount}]`` split in invoice currencies,
+        for display only.
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown measure {measure}")
+        self._refresh_dirty()
+        rank_measure = COMPANY_MEASURES.get(measure, measure)
+        self.env.cr.execute(
+            f"""
+            WITH per_currency AS (
+                SELECT receivable.partner_id,
+                       receivable.currency_id,
+                       SUM(receivable.{measure}) AS amount,
+                       SUM(receivable.{rank_measure}) AS value,
+                       SUM(receivable.paid_count) AS paid_count
+                FROM {self._table} receivable
+                WHERE receivable.day >= %(start_date)s
+                  AND (%(end_date)s::date IS NULL OR receivable.day <= %(end_date)s::date)
+                  AND receivable.company_id IN %(company_ids)s
+                GROUP BY receivable.partner_id, receivable.currency_id
+            )
+            SELECT per_currency.partner_id,
+                   partner.name,
+                   SUM(per_currency.value) AS value,
+                   SUM(per_currency.paid_count) AS paid_count,
+                   json_agg(
+                       json_build_object('currency', currency.name, 'amount', per_currency.amount)
+                       ORDER BY per_currency.amount DESC
+                   ) AS amounts,
+                   SUM(SUM(per_currency.value)) OVER () AS grand_total,
+                   COUNT(*) OVER () AS total
+            FROM per_currency
+            JOIN res_partner partner ON partner.id = per_currency.partner_id
+            JOIN res_currency currency ON currency.id = per_currency.currency_id
+            GROUP BY per_currency.partner_id, partner.name
+            HAVING SUM(per_currency.value) > 0
+            ORDER BY value DESC, per_currency.partner_id
+            LIMIT %(limit)s
+            """,
+            {
+                "start_date": start_date,
+                "end_date": end_date,
+                "company_ids": tuple(self.env.companies.ids),
+                "limit": limit,
+            },
+        )
+        rows = self.env.cr.dictfetchall()
+        currency = self.env.company.currency_id.name
+        for row in rows:
+            row["currency"] = currency
+            if not by_currency:
+                del row["amounts"]
+        return rows
@@ -0,0 +1,310 @@
+"""Semantic search over products and partners.
+
+Each record gets one embedded text built from the fields people describe it
+with ("the blue ergonomic chair", "the client from the Valencia bakery").
+Writes on those fields only flag the row as stale, in the same transaction; a
+queued job (or the cron when queue_job is not installed) re-embeds the stale
+rows in batches through the embedding cache, and a search embeds the few rows
+still pending for its model first. Vectors are served from a
+:class:`~.vector_index.VectorIndex` rebuilt when the embedded rows change.
+"""
+
+import hashlib
+import logging
+import threading
+
+import numpy as np
+import psycopg2
+from odoo import api, fields, models  # type: ignore
+from odoo.tools import split_every  # type: ignore
+
+from .embeddings import get_embedder
+from .vector_index import VectorIndex, index_path
+
+_logger = logging.getLogger(__name__)
+
+EMBED_BATCH = 500
+MAX_EMBED_PER_RUN = 5000
+# Pending rows a search embeds itself before ranking
+MAX_INLINE_EMBED = 200
+DEFAULT_SEARCH_LIMIT = 5
+MAX_SEARCH_LIMIT = 20
+
+
+def _product_text(row) -> str:
+    return " | ".join(
+        filter(
+            None,
+            [
+                row["name"],
+                row["default_code"],
+                row["categ_id"] and row["categ_id"][1],
+                row["description_sale"],
+            ],
+        )
+    )
+
+
+def _partner_text(row) -> str:
+    email = row["email"] or ""
+    return " | ".join(
+        filter(
+            None,
+            [
+                row["name"],
+                row["commercial_company_name"],
+                row["city"],
+                email.rpartition("@")[2] if "@" in email else "",
+            ],
+        )
+    )
+
+
+# Indexed models: fields read to build the text, the fields whose change
+# makes the text stale and the fields returned with each hit
+RECORD_SOURCES = {
+    "product.product": {
+        "read": ["name", "default_code", "categ_id", "description_sale"],
+        "depends": {"name", "default_code", "categ_id", "description_sale", "active"},
+        "text": _product_text,
+        "result": ["display_name", "default_code", "list_price"],
+    },
+    "res.partner": {
+        "read": ["name", "commercial_company_name", "city", "email"],
+        "depends": {"name", "parent_id", "city", "email", "active"},
+        "text": _partner_text,
+        "result": ["display_name", "city", "email", "phone"],
+    },
+}
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def content_hash(text) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class OdooGPTRecordEmbedding(models.Model):
+    _name = "odoogpt.record.embedding"
+    _description = "Embedding of a product or partner for semantic search"
+    _log_access = False
+
+    res_model = fields.Char(required=True)
+    res_id = fields.Integer(required=True)
+    content_hash = fields.Char()
+    embedding_model = fields.Char()
+    # Raw float32 bytes, read and written in SQL
+    vector = fields.Binary(attachment=False)
+    stale = fields.Boolean(default=True, index=True)
+    embedded_at = fields.Datetime()
+
+    _sql_constraints = [
+        (
+            "record_unique",
+            "unique(res_model, res_id)",
+            "Only one embedding per record is allowed.",
+        )
+    ]
+
+    @api.model
+    def _mark_stale(self, res_model, ids):
+        """Flag the records as needing a new embedding and queue the batcher."""
+        if not ids:
+            return
+        self.env.cr.execute(
+            """
+            INSERT INTO odoogpt_record_embedding (res_model, res_id, stale)
+            SELECT %s, unnest(%s::int[]), TRUE
+            ON CONFLICT (res_model, res_id) DO UPDATE SET stale = TRUE
+            """,
+            [res_model, list(ids)],
+        )
+        self._schedule()
+
+    @api.model
+    def _forget(self, res_model, ids):
+        if ids:
+            self.env.cr.execute(
+                """
+                DELETE FROM odoogpt_record_embedding
+                WHERE res_model = %s AND res_id = ANY(%s)
+                """,
+                [res_model, list(ids)],
+            )
+
+    @api.model
+    def _schedule(self):
+        if hasattr(self, "with_delay"):
+            # One pending job embeds every row flagged until it runs
+            self.with_delay(identity_key="odoogpt_record_embedding")._embed_pending()
+        else:
+            self.env.ref("odoogpt.cron_embed_records")._trigger()
+
+    @api.model
+    def _backfill(self):
+        """Flag every product and partner without an embedding."""
+        for res_model in RECORD_SOURCES:
+            table = self.env[res_model]._table
+            self.env.cr.execute(
+                f"""
+                INSERT INTO odoogpt_record_embedding (res_model, res_id, stale)
+                SELECT %s, id, TRUE FROM {table} WHERE active
+                ON CONFLICT (res_model, res_id) DO NOTHING
+                """,
+                [res_model],
+            )
+        self._schedule()
+
+    def _pending_ids(self, res_model, model, limit):
+        self.env.cr.execute(
+            """
+            SELECT res_id
+            FROM odoogpt_record_embedding
+            WHERE res_model = %s
+              AND (stale OR embedding_model IS DISTINCT FROM %s)
+            ORDER BY res_id
+            LIMIT %s
+            """,
+            [res_model, model, limit],
+        )
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def _embed_pending(self, res_models=None, limit=MAX_EMBED_PER_RUN):
+        """Embed up to ``limit`` stale rows, reschedule when some are left.
+
+        :return: the number of rows processed
+        """
+        embedder = get_embedder()
+        done = 0
+        for res_model in res_models or RECORD_SOURCES:
+            ids = self._pending_ids(res_model, embedder.name, limit - done)
+            for batch in split_every(EMBED_BATCH, ids):
+                self._embed_records(res_model, list(batch), embedder)
+            done += len(ids)
+        if res_models is None and done >= limit:
+            self._schedule()
+        return done
+
+    def _embed_records(self, res_model, ids, embedder):
+        source = RECORD_SOURCES[res_model]
+        records = self.env[res_model].sudo().with_context(active_test=False)
+        rows = records.search_read(
+            [("id", "in", ids), ("active", "=", True)], source["read"]
+        )
+        self._forget(res_model, set(ids) - {row["id"] for row in rows})
+        if not rows:
+            return
+
+        texts = {row["id"]: source["text"](row) for row in rows}
+        self.env.cr.execute(
+            """
+            SELECT res_id, content_hash
+            FROM odoogpt_record_embedding
+            WHERE res_model = %s AND res_id = ANY(%s) AND embedding_model = %s
+              AND vector IS NOT NULL
+            """,
+            [res_model, list(texts), embedder.name],
+        )
+        unchanged = {
+            res_id
+            for res_id, text_hash in self.env.cr.fetchall()
+            if text_hash == content_hash(texts[res_id])
+        }
+        if unchanged:
+            self.env.cr.execute(
+                """
+                UPDATE odoogpt_record_embedding SET stale = FALSE
+                WHERE res_model = %s AND res_id = ANY(%s)
+                """,
+                [res_model, list(unchanged)],
+            )
+
+        changed = [res_id for res_id in texts if res_id not in unchanged]
+        if not changed:
+            return
+        vectors = self.env["odoogpt.embedding.cache"]._embed(
+            [texts[res_id] for res_id in changed], embedder
+        )
+        for res_id, vector in zip(changed, vectors):
+            self.env.cr.execute(
+                """
+                UPDATE odoogpt_record_embedding
+                SET content_hash = %s, embedding_model = %s, vector = %s,
+                    stale = FALSE, embedded_at = now() AT TIME ZONE 'UTC'
+                WHERE res_model = %s AND res_id = %s
+                """,
+                [
+                    content_hash(texts[res_id]),
+                    embedder.name,
+                    psycopg2.Binary(vector.tobytes()),
+                    res_model,
+                    res_id,
+                ],
+            )
+
+    def _index(self, res_model, model):
+        cr = self.env.cr
+        # Fingerprint of the embedded contents: unlike a timestamp it moves
+        # with re-embeddings in the same transaction and out-of-order commits
+        cr.execute(
+            """
+            SELECT md5(string_agg(res_id || ':' || content_hash, ',' ORDER BY res_id))
+            FROM odoogpt_record_embedding
+            WHERE res_model = %s AND embedding_model = %s AND vector IS NOT NULL
+            """,
+            [res_model, model],
+        )
+        stamp = cr.fetchone()[0] or ""
+        key = (cr.dbname, res_model, model)
+        index = _indexes.get(key)
+        if index is not None and index.stamp == stamp:
+            return index
+
+        path = index_path(cr.dbname, f"records-{res_model}-{model}")
+        index = VectorIndex.load(path, stamp=stamp)
+        if index is None:
+            cr.execute(
+                """
+                SELECT res_id, vector
+                FROM odoogpt_record_embedding
+                WHERE res_model = %s AND embedding_model = %s AND vector IS NOT NULL
+                ORDER BY res_id
+                """,
+                [res_model, model],
+            )
+            rows = cr.fetchall()
+            matrix = (
+                np.vstack([np.frombuffer(bytes(v), dtype=np.float32) for __, v in rows])
+                if rows
+                else np.zeros((0, 0), dtype=np.float32)
+            )
+            index = VectorIndex([row[0] for row in rows], matrix, stamp=stamp)
+            try:
+                index.save(path)
+            except OSError as exc:
+                _logger.warning(f"No se pudo guardar el índice de {res_model}: {exc}")
+        with _indexes_lock:
+            _indexes[key] = index
+        return index
+
+    @api.model
+    def _semantic_search(self, res_model, query, limit=DEFAULT_SEARCH_LIMIT):
+        """Return the ``[{id, score, ...}]`` of the records closest to ``query``.
+
+        Only records the current user can read are returned.
+        """
+        embedder = get_embedder()
+        self._embed_pending([res_model], limit=MAX_INLINE_EMBED)
+        index = self._index(res_model, embedder.name)
+        if not len(index):
+            return []
+        query_vector = self.env["odoogpt.embedding.cache"]._embed([query], embedder)[0]
+        # Ask for more hits than needed, some may be archived or not readable
+        hits = dict(index.search(query_vector, k=limit * 3))
+        records = self.env[res_model].search_read(
+            [("id", "in", list(hits))], RECORD_SOURCES[res_model]["result"]
+        )
+        records.sort(key=lambda row: -hits[row["id"]])
+        return [dict(row, score=round(hits[row["id"]], 4)) for row in records[:limit]]
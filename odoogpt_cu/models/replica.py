@@ -0,0 +1,125 @@
+"""Route read-only assistant tools to a PostgreSQL read replica.
+
+Set ``ODOOGPT_REPLICA_DSN`` (a ``postgresql://`` URI or a libpq ``key=value``
+DSN pointing to a hot standby of the same database) to enable it. Each read-only tool call
+borrows a pooled cursor on the replica, runs in a read-only transaction and
+falls back to the primary when the replica is unreachable, serves another
+database or lags more than ``ODOOGPT_REPLICA_MAX_LAG`` seconds behind.
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+from urllib.parse import quote, urlencode
+
+from odoo import api, sql_db  # type: ignore
+from psycopg2.extensions import parse_dsn
+
+_logger = logging.getLogger(__name__)
+
+REPLICA_DSN = os.getenv("ODOOGPT_REPLICA_DSN")
+REPLICA_MAX_LAG = float(os.getenv("ODOOGPT_REPLICA_MAX_LAG", "30"))
+LAG_CHECK_INTERVAL = 5
+
+_state = {"checked_at": 0.0, "healthy": False}
+_state_lock = threading.Lock()
+
+
+def replica_uri(dsn) -> str:
+    """Return ``dsn`` as a ``postgresql://`` URI.
+
+    Odoo takes anything else as a database name, so ``key=value`` DSNs are
+    rewritten with every parameter but the database in the query string.
+    Values are percent-encoded (libpq does not decode ``+``), unix socket
+    hosts included.
+    """
+    if dsn.startswith(("postgresql://", "postgres://")):
+        return dsn
+    params = parse_dsn(dsn)
+    dbname = params.pop("dbname", "")
+    return (
+        f"postgresql:///{quote(dbname, safe='')}?{urlencode(params, quote_via=quote)}"
+    )
+
+
+def _replica_lag(cr) -> float:
+    """Replay lag in seconds, 0 when the standby has replayed all it received."""
+    cr.execute("""
+        SELECT CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END
+        """)
+    return float(cr.fetchone()[0])
+
+
+def _replica_cursor(dbname):
+    """Open a read-only cursor on the replica, or None to stay on the primary."""
+    if not REPLICA_DSN:
+        return None
+
+    now = time.monotonic()
+    with _state_lock:
+        recently_checked = now - _state["checked_at"] < LAG_CHECK_INTERVAL
+        if recently_checked and not _state["healthy"]:
+            return None
+
+    cr = None
+    try:
+        cr = sql_db.db_connect(replica_uri(REPLICA_DSN), allow_uri=True).cursor()
+        if cr.dbname != dbname:
+            _logger.warning(
+                f"La réplica sirve la base {cr.dbname} y no {dbname}, se usa la primaria"
+            )
+            cr.close()
+            return None
+        if not recently_checked:
+            lag = _replica_lag(cr)
+            healthy = lag <= REPLICA_MAX_LAG
+            with _state_lock:
+                _state.update(checked_at=now, healthy=healthy)
+            if not healthy:
+                _logger.warning(
+                    f"Réplica con {lag:.0f}s de retraso, se usa la primaria"
+                )
+                cr.close()
+                return None
+            # The access mode must be set before any query of the transaction
+            cr.rollback()
+        cr.execute("SET TRANSACTION READ ONLY")
+        return cr
+    except Exception as exc:
+        _logger.warning(f"Réplica no disponible ({exc}), se usa la primaria")
+        with _state_lock:
+            _state.update(checked_at=now, healthy=False)
+        if cr is not None:
+            cr.close()
+        return None
+
+
+def on_replica(func):
+    """Run a tool with ``odoo_manager`` bound to a replica cursor when possible.
+
+    Only the records of ``odoo_manager`` move to the replica, the chat channel
+    (used to post progress messages) stays on the primary transaction.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, odoo_manager, **kwargs):
+        env = odoo_manager.env
+        cr = _replica_cursor(env.cr.dbname)
+        if cr is None:
+            return func(*args, odoo_manager=odoo_manager, **kwargs)
+        try:
+            replica_env = api.Environment(cr, env.uid, env.context, su=env.su)
+            return func(
+                *args, odoo_manager=odoo_manager.with_env(replica_env), **kwargs
+            )
+        finally:
+            cr.rollback()
+            cr.close()
+
+    return wrapper
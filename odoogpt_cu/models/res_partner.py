@@ -1,27 +1,174 @@
-from odoo import fields, models  # type: ignore
+import logging
+
+from odoo import api, fields, models, tools  # type: ignore
+from odoo.tools import split_every  # type: ignore
+from odoo.tools.sql import column_exists, create_column  # type: ignore
+
+from .discuss_channel import view_descriptor
+from .ir_ui_view import flush_view_models, remember_view_model
+from .record_index import RECORD_SOURCES
+from .utils import normalize_phone
+
+_logger = logging.getLogger(__name__)
+
+PHONE_BACKFILL_BATCH = 2000
+MAX_PHONES_PER_RUN = 20000
+# Last partner id normalized by the backfill cron, unset when there is no backfill
+PHONE_BACKFILL_PARAM = "odoogpt.phone_backfill_last_id"
+
 
 class ResPartner(models.Model):
     _inherit = "res.partner"
 
     odoogpt_channel_id = fields.Many2one("discuss.channel")
+    phone_e164 = fields.Char(
+        string="Phone (E.164)",
+        compute="_compute_phone_e164",
+        store=True,
+        index=True,
+    )
+    mobile_e164 = fields.Char(
+        string="Mobile (E.164)",
+        compute="_compute_phone_e164",
+        store=True,
+        index=True,
+    )
+
+    @api.depends("phone", "mobile")
+    def _compute_phone_e164(self):
+        for partner in self:
+            partner.phone_e164 = normalize_phone(partner.phone)
+            partner.mobile_e164 = normalize_phone(partner.mobile)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partners = super().create(vals_list)
+        self.env["odoogpt.record.embedding"]._mark_stale("res.partner", partners.ids)
+        return partners
+
+    def write(self, vals):
+        res = super().write(vals)
+        if RECORD_SOURCES["res.partner"]["depends"].intersection(vals):
+            # Contacts embed the name of their company too
+            partners = (
+                self.with_context(active_test=False).search(
+                    [("commercial_partner_id", "in", self.commercial_partner_id.ids)]
+                )
+                | self
+            )
+            self.env["odoogpt.record.embedding"]._mark_stale(
+                "res.partner", partners.ids
+            )
+        return res
+
+    def unlink(self):
+        ids = self.ids
+        res = super().unlink()
+        self.env["odoogpt.record.embedding"]._forget("res.partner", ids)
+        return res
+
+    def _auto_init(self):
+        # Create the columns by hand so the ORM does not normalize every
+        # partner in the install transaction, the backfill jobs or cron fill them
+        created = False
+        for column in ("phone_e164", "mobile_e164"):
+            if not column_exists(self.env.cr, self._table, column):
+                create_column(self.env.cr, self._table, column, "varchar")
+                created = True
+        if created:
+            self.pool.post_init(self._backfill_phone_e164)
+        return super()._auto_init()
+
+    def _pending_phone_ids(self, after_id=0, limit=None):
+        self.env.cr.execute(
+            f"""
+            SELECT id FROM {self._table}
+            WHERE id > %s
+              AND ((phone IS NOT NULL AND phone_e164 IS NULL)
+                OR (mobile IS NOT NULL AND mobile_e164 IS NULL))
+            ORDER BY id
+            LIMIT %s
+            """,
+            [after_id, limit],
+        )
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def _backfill_phone_e164(self, batch_size=PHONE_BACKFILL_BATCH):
+        """Normalize the phones of existing partners in background batches."""
+        if not hasattr(self, "with_delay"):
+            # queue_job not available, the cron normalizes a few batches per
+            # run and triggers itself until none is left. On install it does
+            # not exist yet and runs at its first call, right after install
+            self.env["ir.config_parameter"].sudo().set_param(PHONE_BACKFILL_PARAM, "0")
+            cron = self.env.ref("odoogpt.cron_normalize_phones", False)
+            if cron:
+                cron._trigger()
+            return
+        ids = self._pending_phone_ids()
+        _logger.info(f"Normalizando teléfonos de {len(ids)} contactos")
+        for batch in split_every(batch_size, ids):
+            self.browse(batch).with_delay()._normalize_phones()
+
+    @api.model
+    def _normalize_pending_phones(
+        self, limit=MAX_PHONES_PER_RUN, batch_size=PHONE_BACKFILL_BATCH
+    ):
+        """Normalize up to ``limit`` partners of the backfill, reschedule when
+        some are left.
+
+        :return: the number of partners normalized
+        """
+        params = self.env["ir.config_parameter"].sudo()
+        after_id = params.get_param(PHONE_BACKFILL_PARAM)
+        if not after_id:
+            return 0
+        # Walk the ids, invalid numbers stay empty and must not be picked again
+        ids = self._pending_phone_ids(int(after_id), limit)
+        for batch in split_every(batch_size, ids):
+            self.browse(batch)._normalize_phones()
+        if len(ids) >= limit:
+            params.set_param(PHONE_BACKFILL_PARAM, str(ids[-1]))
+            self.env.ref("odoogpt.cron_normalize_phones")._trigger()
+        else:
+            params.set_param(PHONE_BACKFILL_PARAM, False)
+            _logger.info("Teléfonos de contactos normalizados")
+        return len(ids)
+
+    def _normalize_phones(self):
+        for fname in ("phone_e164", "mobile_e164"):
+            self.env.add_to_compute(self._fields[fname], self)
+        self.flush_recordset(["phone_e164", "mobile_e164"])
+
+    @api.model
+    @tools.ormcache()
+    def _odoogpt_user_ids(self):
+        """Return the ``(user id, partner id)`` of the assistant."""
+        odoogpt = self.env.ref("odoogpt.odoogpt_user")
+        return odoogpt.id, odoogpt.partner_id.id
 
     def open_odoogpt(self, params):
         partner = self.env.user.partner_id
-        odoogpt = self.env.ref("odoogpt.odoogpt_user")
+        odoogpt_id, odoogpt_partner_id = self._odoogpt_user_ids()
+        descriptor = view_descriptor(params)
+        # The client knows the current model even if another worker served its views
+        if descriptor["model"]:
+            remember_view_model(self.env.cr.dbname, self.env.uid, descriptor["model"])
+        flush_view_models(self.env)
         
         if not partner.odoogpt_channel_id:
             channel_id = (
                 self.env["discuss.channel"]
                 .sudo()
                 .create({
-                    "name": odoogpt.partner_id.name,
+                    "name": self.browse(odoogpt_partner_id).name,
                     "channel_type": "chat",  # 🔥 Chat 1:1
-                    "channel_partner_ids": [(4, odoogpt.partner_id.id), (4, partner.id)],  # 🔥 Asignar ambos al crear
-                    "view_data": params,
+                    "channel_partner_ids": [(4, odoogpt_partner_id), (4, partner.id)],  # 🔥 Asignar ambos al crear
+                    "view_data": descriptor,
                 })
             )
             partner.odoogpt_channel_id = channel_id
         else:
-            partner.odoogpt_channel_id.write({"view_data": params})
+            partner.odoogpt_channel_id._set_view_context(descriptor)
 
-        return odoogpt.id  # (Sigues devolviendo el userId como tú quieres)
+        return odoogpt_id  # (Sigues devolviendo el userId como tú quieres)
@@ -0,0 +1,164 @@
+import logging
+
+from odoo import api, fields, models  # type: ignore
+
+_logger = logging.getLogger(__name__)
+
+CONFIRMED_STATES = ("sale", "done")
+
+# Aggregates confirmed order lines per (product, company, day). The caller
+# appends the filter restricting the lines to aggregate.
+DEMAND_SELECT = """
+    SELECT line.product_id,
+           so.company_id,
+           so.date_order::date AS day,
+           SUM(line.product_uom_qty) AS product_uom_qty,
+           SUM(line.price_subtotal / COALESCE(NULLIF(so.currency_rate, 0), 1)) AS price_subtotal,
+           COUNT(DISTINCT so.id) AS order_count
+    FROM sale_order_line line
+    JOIN sale_order so ON so.id = line.order_id
+    {join}
+    WHERE so.state IN %(states)s
+      AND line.product_id IS NOT NULL
+      AND line.display_type IS NULL
+      {where}
+    GROUP BY line.product_id, so.company_id, so.date_order::date
+"""
+
+
+class OdooGPTSaleDemand(models.Model):
+    _name = "odoogpt.sale.demand"
+    _inherit = "odoogpt.snapshot.mixin"
+    _description = "Daily sales demand per product"
+    _order = "day desc, product_id"
+    _log_access = False
+
+    product_id = fields.Many2one("product.product", required=True, ondelete="cascade")
+    company_id = fields.Many2one("res.company", required=True, ondelete="cascade")
+    day = fields.Date(required=True)
+    product_uom_qty = fields.Float(string="Quantity")
+    price_subtotal = fields.Float(
+        string="Subtotal", help="Untaxed amount in the company currency"
+    )
+    order_count = fields.Integer()
+
+    _sql_constraints = [
+        (
+            "bucket_unique",
+            "unique(day, company_id, product_id)",
+            "Only one demand row per product, company and day is allowed.",
+        )
+    ]
+
+    def _refresh_buckets(self, keys):
+        product_ids, company_ids, days = zip(*keys)
+        params = {
+            "states": CONFIRMED_STATES,
+            "product_ids": list(product_ids),
+            "company_ids": list(company_ids),
+            "days": list(days),
+        }
+        buckets = """
+            SELECT * FROM unnest(%(product_ids)s::int[], %(company_ids)s::int[], %(days)s::date[])
+                AS bucket(product_id, company_id, day)
+        """
+        fresh = DEMAND_SELECT.format(
+            join="""
+            JOIN bucket
+              ON bucket.product_id = line.product_id
+             AND bucket.company_id = so.company_id
+             AND so.date_order >= bucket.day
+             AND so.date_order < bucket.day + 1
+            """,
+            where="",
+        )
+        # Upsert instead of delete and insert: a bucket created by a concurrent
+        # transaction then fails with a retried serialization error instead of
+        # a unique violation
+        self.env.cr.execute(
+            f"""
+            WITH bucket AS ({buckets}),
+            fresh AS ({fresh}),
+            upserted AS (
+                INSERT INTO {self._table}
+                    (product_id, company_id, day, product_uom_qty, price_subtotal, order_count)
+                SELECT * FROM fresh
+                ON CONFLICT (product_id, company_id, day) DO UPDATE
+                SET product_uom_qty = EXCLUDED.product_uom_qty,
+                    price_subtotal = EXCLUDED.price_subtotal,
+                    order_count = EXCLUDED.order_count
+            )
+            DELETE FROM {self._table} demand
+            USING bucket
+            WHERE demand.product_id = bucket.product_id
+              AND demand.company_id = bucket.company_id
+              AND demand.day = bucket.day
+              AND NOT EXISTS (
+                  SELECT FROM fresh
+                  WHERE fresh.product_id = bucket.product_id
+                    AND fresh.company_id = bucket.company_id
+                    AND fresh.day = bucket.day
+              )
+            """,
+            params,
+        )
+        self.env.invalidate_all()
+
+    @api.model
+    def _backfill(self, date_from=None):
+        """Rebuild the demand table from the confirmed order history.
+
+        Can be run from the "OdooGPT: Backfill sales demand" scheduled action
+        or from a shell: ``env["odoogpt.sale.demand"]._backfill()``.
+        """
+        self.env.flush_all()
+        params = {"states": CONFIRMED_STATES, "date_from": date_from}
+        where = "AND so.date_order >= %(date_from)s" if date_from else ""
+        self.env.cr.execute(
+            f"DELETE FROM {self._table}"
+            + (" WHERE day >= %(date_from)s" if date_from else ""),
+            params,
+        )
+        self.env.cr.execute(
+            f"""
+            INSERT INTO {self._table}
+                (product_id, company_id, day, product_uom_qty, price_subtotal, order_count)
+            """
+            + DEMAND_SELECT.format(join="", where=where),
+            params,
+        )
+        _logger.info(f"Demanda de ventas reconstruida: {self.env.cr.rowcount} filas")
+        self.env.invalidate_all()
+        return True
+
+    @api.model
+    def _demand_by_product(self, start_date, end_date, limit=None):
+        """Quantity and subtotal per product between two dates (inclusive)."""
+        self._refresh_dirty()
+        self.env.cr.execute(
+            f"""
+            SELECT demand.product_id,
+                   COALESCE(tmpl.name->>%(lang)s, tmpl.name->>'en_US') AS name,
+                   SUM(demand.product_uom_qty) AS product_uom_qty,
+                   SUM(demand.price_subtotal) AS price_subtotal,
+                   SUM(demand.order_count) AS order_count,
+                   SUM(SUM(demand.price_subtotal)) OVER () AS grand_subtotal,
+                   COUNT(*) OVER () AS total
+            FROM {self._table} demand
+            JOIN product_product product ON product.id = demand.product_id
+            JOIN product_template tmpl ON tmpl.id = product.product_tmpl_id
+            WHERE demand.day BETWEEN %(start_date)s AND %(end_date)s
+              AND demand.company_id IN %(company_ids)s
+            GROUP BY demand.product_id, tmpl.name
+            ORDER BY SUM(demand.product_uom_qty) DESC, demand.product_id
+            LIMIT %(limit)s
+            """,
+            {
+                "lang": self.env.lang or "en_US",
+                "start_date": start_date,
+                "end_date": end_date,
+                "company_ids": tuple(self.env.companies.ids),
+                "limit": limit,
+            },
+        )
+        return self.env.cr.dictfetchall()
@@ -0,0 +1,75 @@
+from odoo import api, models  # type: ignore
+
+from .sale_demand import CONFIRMED_STATES
+
+ORDER_DEMAND_FIELDS = {"state", "date_order", "company_id", "currency_rate"}
+LINE_DEMAND_FIELDS = {
+    "product_id",
+    "product_uom_qty",
+    "price_unit",
+    "discount",
+    "tax_id",
+    "order_id",
+    "display_type",
+}
+
+
+class SaleOrder(models.Model):
+    _inherit = "sale.order"
+
+    def _odoogpt_demand_keys(self):
+        """Demand buckets (product, company, day) fed by the confirmed orders."""
+        if not self.ids:
+            return set()
+        self.env.flush_all()
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT line.product_id, so.company_id, so.date_order::date
+            FROM sale_order so
+            JOIN sale_order_line line ON line.order_id = so.id
+            WHERE so.id IN %s
+              AND so.state IN %s
+              AND line.product_id IS NOT NULL
+              AND line.display_type IS NULL
+            """,
+            [tuple(self.ids), CONFIRMED_STATES],
+        )
+        return set(self.env.cr.fetchall())
+
+    def write(self, vals):
+        if not ORDER_DEMAND_FIELDS.intersection(vals):
+            return super().write(vals)
+        # A bucket changes when a confirmed order enters or leaves it, so both
+        # the buckets before and after the write are refreshed
+        keys = self._odoogpt_demand_keys()
+        res = super().write(vals)
+        keys |= self._odoogpt_demand_keys()
+        self.env["odoogpt.sale.demand"]._mark_dirty(keys)
+        return res
+
+
+class SaleOrderLine(models.Model):
+    _inherit = "sale.order.line"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env["odoogpt.sale.demand"]._mark_dirty(
+            lines.order_id._odoogpt_demand_keys()
+        )
+        return lines
+
+    def write(self, vals):
+        if not LINE_DEMAND_FIELDS.intersection(vals):
+            return super().write(vals)
+        keys = self.order_id._odoogpt_demand_keys()
+        res = super().write(vals)
+        keys |= self.order_id._odoogpt_demand_keys()
+        self.env["odoogpt.sale.demand"]._mark_dirty(keys)
+        return res
+
+    def unlink(self):
+        keys = self.order_id._odoogpt_demand_keys()
+        res = super().unlink()
+        self.env["odoogpt.sale.demand"]._mark_dirty(keys)
+        return res
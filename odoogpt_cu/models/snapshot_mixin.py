@@ -0,0 +1,51 @@
+from odoo import models  # type: ignore
+
+
+class OdooGPTSnapshotMixin(models.AbstractModel):
+    """Pre-aggregated table refreshed bucket by bucket.
+
+    Source models report the buckets they touch with ``_mark_dirty``. The
+    buckets are recomputed from the source tables right before the
+    transaction commits (or earlier, when a report needs fresh data), so the
+    snapshot never drifts even when the same bucket is touched many times.
+
+    Concrete snapshots must implement two hooks:
+
+    * ``_refresh_buckets(keys)``: recompute the rows of the given bucket keys,
+      the tuples passed to ``_mark_dirty``, from the source tables. Rows are
+      upserted (``INSERT ... ON CONFLICT DO UPDATE``) and the buckets left
+      without source rows deleted, so that two transactions creating the same
+      bucket end in a retried serialization failure, not a unique violation
+    * ``_backfill(date_from=None)``: rebuild the whole table, or the rows from
+      ``date_from`` on, after an install, an upgrade or a bulk import
+    """
+
+    _name = "odoogpt.snapshot.mixin"
+    _description = "OdooGPT incremental snapshot"
+
+    def _dirty_key(self):
+        return f"{self._name}.dirty"
+
+    def _mark_dirty(self, keys):
+        if not keys:
+            return
+        data = self.env.cr.precommit.data
+        if self._dirty_key() not in data:
+            data[self._dirty_key()] = set()
+            self.env.cr.precommit.add(self._refresh_dirty)
+        data[self._dirty_key()].update(keys)
+
+    def _refresh_dirty(self):
+        """Recompute the buckets marked dirty in the current transaction."""
+        keys = self.env.cr.precommit.data.pop(self._dirty_key(), None)
+        if keys:
+            self.env.flush_all()
+            self._refresh_buckets(keys)
+
+    def _refresh_buckets(self, keys):
+        """Recompute the rows of the bucket ``keys`` from the source tables."""
+        raise NotImplementedError(f"{self._name} must implement _refresh_buckets")
+
+    def _backfill(self, date_from=None):
+        """Rebuild the snapshot, from ``date_from`` on when given."""
+        raise NotImplementedError(f"{self._name} must implement _backfill")
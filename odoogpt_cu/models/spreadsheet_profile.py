@@ -0,0 +1,373 @@
+"""Bounded-memory profiling of tabular attachments.
+
+Rows are consumed one at a time (openpyxl ``read_only`` iterators, csv
+readers...). Numeric values are buffered into fixed-size NumPy arrays that are
+folded into running aggregates, categorical values are tracked with a capped
+counter and the sample keeps a fixed number of rows spread over the whole
+sheet, so memory does not grow with the number of rows.
+"""
+
+import re
+from collections import Counter
+from datetime import date, datetime, time
+
+import numpy as np
+
+CHUNK_ROWS = 4096
+MAX_COLUMNS = 40
+MAX_TRACKED_VALUES = 2000
+MAX_VALUE_CHARS = 60
+TOP_VALUES = 5
+SAMPLE_ROWS = 5
+
+NUMERIC = "numérico"
+TEXT = "texto"
+DATE = "fecha"
+BOOLEAN = "booleano"
+
+_NUMERIC_RE = re.compile(r"^[-+]?\d{1,3}(?:[ .,]?\d{3})*(?:[.,]\d+)?$|^[-+]?\d*[.,]?\d+$")
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2})?)?$")
+
+
+def _short(value, limit: int = MAX_VALUE_CHARS) -> str:
+    text = str(value).replace("\n", " ").strip()
+    if len(text) > limit:
+        return text[: limit - 1] + "…"
+    return text
+
+
+def _parse_number(text: str):
+    """Parse numbers written as text ("1.234,5", "1,234.5", "12") or None."""
+    text = text.strip()
+    if not text or not _NUMERIC_RE.match(text):
+        return None
+    if "," in text and "." in text:
+        # The last separator is the decimal one
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        text = text.replace(",", ".")
+    text = text.replace(" ", "")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _parse_date(text: str):
+    """Parse ISO dates written as text ("2024-01-31", "2024-01-31 10:00") or None."""
+    text = text.strip()
+    if not _DATE_RE.match(text):
+        return None
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def _format_number(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return f"{value:.2f}"
+
+
+class ColumnProfile:
+    """Running statistics of a single column."""
+
+    def __init__(self, name: str, coerce_strings: bool = False):
+        self.name = name
+        self.coerce_strings = coerce_strings
+        self.types = Counter()
+        self.values = 0
+        self.empty = 0
+
+        # Numeric aggregates, folded chunk by chunk from the buffer
+        self._buffer = np.empty(CHUNK_ROWS, dtype=np.float64)
+        self._buffered = 0
+        self.num_count = 0
+        self.num_sum = 0.0
+        self.num_min = None
+        self.num_max = None
+
+        self.date_min = None
+        self.date_max = None
+
+        # Capped counter of categorical values (approximate once pruned)
+        self.top = Counter()
+        self.top_pruned = False
+
+    def add(self, value) -> None:
+        if value is None or (isinstance(value, str) and not value.strip()):
+            self.empty += 1
+            return
+
+        self.values += 1
+        if isinstance(value, bool):
+            self.types[BOOLEAN] += 1
+            self._count(value)
+        elif isinstance(value, (int, float)):
+            self.types[NUMERIC] += 1
+            self._push_number(float(value))
+        elif isinstance(value, (datetime, date, time)):
+            self.types[DATE] += 1
+            self._push_date(value)
+        else:
+            number = _parse_number(value) if self.coerce_strings else None
+            parsed_date = _parse_date(value) if self.coerce_strings else None
+            if number is not None:
+                self.types[NUMERIC] += 1
+                self._push_number(number)
+            elif parsed_date is not None:
+                self.types[DATE] += 1
+                self._push_date(parsed_date)
+            else:
+                self.types[TEXT] += 1
+                self._count(_short(value))
+
+    def _push_number(self, number: float) -> None:
+        self._buffer[self._buffered] = number
+        self._buffered += 1
+        if self._buffered == CHUNK_ROWS:
+            self.flush()
+
+    def _push_date(self, value) -> None:
+        if isinstance(value, time):
+            return
+        if not isinstance(value, datetime):
+            value = datetime.combine(value, time())
+        if self.date_min is None or value < self.date_min:
+            self.date_min = value
+        if self.date_max is None or value > self.date_max:
+            self.date_max = value
+
+    def _count(self, value) -> None:
+        self.top[value] += 1
+        if len(self.top) > MAX_TRACKED_VALUES:
+            # Keep the heavy hitters only, the tail counts become approximate
+            self.top = Counter(dict(self.top.most_common(MAX_TRACKED_VALUES // 2)))
+            self.top_pruned = True
+
+    def flush(self) -> None:
+        if not self._buffered:
+            return
+        chunk = self._buffer[: self._buffered]
+        chunk = chunk[np.isfinite(chunk)]
+        if chunk.size:
+            chunk_min = float(chunk.min())
+            chunk_max = float(chunk.max())
+            self.num_min = chunk_min if self.num_min is None else min(self.num_min, chunk_min)
+            self.num_max = chunk_max if self.num_max is None else max(self.num_max, chunk_max)
+            self.num_sum += float(chunk.sum())
+            self.num_count += int(chunk.size)
+        self._buffered = 0
+
+    @property
+    def kind(self) -> str:
+        if not self.types:
+            return "vacío"
+        return self.types.most_common(1)[0][0]
+
+    def render(self) -> str:
+        self.flush()
+        line = f"- {self.name} ({self.kind}): {self.values} valores"
+        if self.empty:
+            line += f", {self.empty} vacíos"
+
+        if self.num_count:
+            mean = self.num_sum / self.num_count
+            line += (
+                f"; min {_format_number(self.num_min)}, max {_format_number(self.num_max)}, "
+                f"media {_format_number(mean)}, suma {_format_number(self.num_sum)}"
+            )
+        if self.date_min is not None:
+            line += f"; rango {self.date_min} … {self.date_max}"
+        if self.top and self.kind in (TEXT, BOOLEAN):
+            distinct = f"≥{len(self.top)}" if self.top_pruned else str(len(self.top))
+            common = ", ".join(
+                f"{value} ({count})" for value, count in self.top.most_common(TOP_VALUES)
+            )
+            line += f"; {distinct} distintos; más frecuentes: {common}"
+        return line
+
+
+class RowSample:
+    """Fixed-size sample of rows evenly spread over a stream of unknown length.
+
+    Every ``stride``-th row is kept; when the buffer fills up, every other kept
+    row is dropped and the stride doubles, so the sample always covers the
+    whole sheet from top to bottom.
+    """
+
+    def __init__(self, size: int = SAMPLE_ROWS):
+        self.size = size
+        self.stride = 1
+        self.rows = []
+
+    def add(self, index: int, row, number: int = None) -> None:
+        """Offer the ``index``-th data row, ``number`` is its row in the sheet."""
+        if index % self.stride:
+            return
+        number = index + 1 if number is None else number
+        self.rows.append((number, tuple(_short(v, 30) if v is not None else "" for v in row)))
+        if len(self.rows) >= self.size * 2:
+            self.rows = self.rows[::2]
+            self.stride *= 2
+
+    def picked(self):
+        if len(self.rows) <= self.size:
+            return self.rows
+        step = len(self.rows) / self.size
+        return [self.rows[int(i * step)] for i in range(self.size)]
+
+
+class SheetProfile:
+    """Streaming profile of one sheet: header, column types and aggregates."""
+
+    def __init__(self, title: str, coerce_strings: bool = False, max_rows: int = 1_000_000):
+        self.title = title
+        self.coerce_strings = coerce_strings
+        self.max_rows = max_rows
+        self.header = None
+        self.columns = []
+        self.total_columns = 0
+        self.rows = 0
+        # Rows read so far, empty ones and the header included
+        self.lines = 0
+        self.truncated = False
+        self.sample = RowSample()
+        self._pending = None
+
+    @staticmethod
+    def _is_empty(row) -> bool:
+        return all(v is None or (isinstance(v, str) and not v.strip()) for v in row)
+
+    def _looks_like_header(self, first, second) -> bool:
+        cells = [v for v in first if v is not None and str(v).strip()]
+        if not cells or not all(isinstance(v, str) for v in cells):
+            return False
+        if any(_parse_number(v) is not None for v in cells):
+            return False
+        if len(set(cells)) != len(cells):
+            return False
+        if second is None:
+            return True
+        # A header is followed by a row that is not purely textual, or by
+        # values that differ from the header labels
+        others = [v for v in second if v is not None and str(v).strip()]
+        if any(not isinstance(v, str) or _parse_number(v) is not None for v in others):
+            return True
+        return len(cells) >= len(others)
+
+    def _start(self, names) -> None:
+        self.total_columns = len(names)
+        self.columns = [
+            ColumnProfile(name, coerce_strings=self.coerce_strings)
+            for name in names[:MAX_COLUMNS]
+        ]
+
+    def feed(self, row) -> bool:
+        """Consume one row. Returns False once the row budget is exhausted."""
+        row = tuple(row)
+        self.lines += 1
+        if self._is_empty(row):
+            return True
+
+        if not self.columns and self._pending is None:
+            # Keep the first row until the second arrives to detect the header
+            self._pending = (row, self.lines)
+            return True
+
+        if self._pending is not None:
+            (first, number), self._pending = self._pending, None
+            self._begin(first, row)
+            if self.header is None:
+                self._consume(first, number)
+
+        return self._consume(row, self.lines)
+
+    def _begin(self, first, second) -> None:
+        width = max(len(first), len(second) if second else 0)
+        if self._looks_like_header(first, second):
+            self.header = [
+                _short(v, 40) if v is not None and str(v).strip() else f"col{i + 1}"
+                for i, v in enumerate(first)
+            ]
+            self.header += [f"col{i + 1}" for i in range(len(self.header), width)]
+        self._start(self.header or [f"col{i + 1}" for i in range(width)])
+
+    def _consume(self, row, number=None) -> bool:
+        if self.rows >= self.max_rows:
+            self.truncated = True
+            return False
+
+        if len(row) > self.total_columns:
+            for i in range(self.total_columns, len(row)):
+                if len(self.columns) < MAX_COLUMNS:
+                    col = ColumnProfile(f"col{i + 1}", coerce_strings=self.coerce_strings)
+                    col.empty = self.rows
+                    self.columns.append(col)
+            self.total_columns = len(row)
+
+        for col, value in zip(self.columns, row):
+            col.add(value)
+        for col in self.columns[len(row):]:
+            col.add(None)
+
+        self.sample.add(self.rows, row[: len(self.columns)], number)
+        self.rows += 1
+        return True
+
+    def finish(self) -> "SheetProfile":
+        if self._pending is not None:
+            (first, number), self._pending = self._pending, None
+            self._begin(first, None)
+            if self.header is None:
+                self._consume(first, number)
+        return self
+
+    def render(self, max_chars: int = 3000) -> str:
+        self.finish()
+        header_info = "cabecera detectada" if self.header else "sin cabecera"
+        lines = [
+            f"[Hoja] {self.title}: {self.rows} filas de datos, "
+            f"{self.total_columns} columnas ({header_info})"
+        ]
+        if self.truncated:
+            lines.append(f"...[perfil calculado sobre las primeras {self.rows} filas]")
+        if not self.rows:
+            return lines[0]
+
+        lines.append("Columnas:")
+        size = sum(len(line) + 1 for line in lines)
+        for idx, col in enumerate(self.columns):
+            line = col.render()
+            if size + len(line) > max_chars:
+                lines.append(f"...[{len(self.columns) - idx} columnas omitidas]")
+                break
+            lines.append(line)
+            size += len(line) + 1
+        if self.total_columns > len(self.columns):
+            lines.append(f"...[{self.total_columns - len(self.columns)} columnas no perfiladas]")
+
+        sample = self.sample.picked()
+        if sample:
+            sample_lines = [f"Muestra ({len(sample)} filas repartidas por la hoja):"]
+            sample_lines += [
+                f"fila {number}: " + " | ".join(values) for number, values in sample
+            ]
+            if size + sum(len(line) + 1 for line in sample_lines) <= max_chars:
+                lines.extend(sample_lines)
+
+        return "\n".join(lines)
+
+
+def profile_rows(title: str, rows, coerce_strings: bool = False, max_rows: int = 1_000_000):
+    """Profile an iterable of rows (tuples of cell values) in bounded memory."""
+    profile = SheetProfile(title, coerce_strings=coerce_strings, max_rows=max_rows)
+    for row in rows:
+        if not profile.feed(row):
+            break
+    return profile.finish()
@@ -0,0 +1,230 @@
+import logging
+import threading
+from collections import Counter, defaultdict
+
+import numpy as np
+from odoo import api, models  # type: ignore
+
+_logger = logging.getLogger(__name__)
+
+LINE_FIELDS = [
+    "user_input_id",
+    "question_id",
+    "answer_type",
+    "value_char_box",
+    "value_text_box",
+    "value_numerical_box",
+    "value_date",
+    "value_datetime",
+    "suggested_answer_id",
+    "matrix_row_id",
+]
+NUMERIC_TYPES = {"numerical_box", "scale"}
+TEXT_TYPES = {"char_box", "text_box"}
+DATE_TYPES = {"date", "datetime"}
+TEXT_SAMPLES = 5
+TEXT_SAMPLE_LENGTH = 120
+HISTOGRAM_BINS = 10
+MAX_CACHED_SURVEYS = 64
+
+_stats_cache = {}
+_stats_lock = threading.Lock()
+
+
+def _answer_value(line):
+    """Display value of an answer line, None when it is empty."""
+    answer_type = line["answer_type"]
+    if answer_type == "suggestion":
+        value = line["suggested_answer_id"] and line["suggested_answer_id"][1]
+        if value and line["matrix_row_id"]:
+            value = f"{line['matrix_row_id'][1]}: {value}"
+        return value or None
+    if answer_type == "scale":
+        return line.get("value_scale")
+    value = line.get(f"value_{answer_type}")
+    if answer_type in NUMERIC_TYPES:
+        # 0 is a valid answer, and 0 == False
+        return value
+    return None if value is None or value is False or value == "" else value
+
+
+def _numeric_stats(values) -> dict:
+    values = np.asarray(values, dtype=float)
+    bins = min(HISTOGRAM_BINS, len(np.unique(values)))
+    counts, edges = np.histogram(values, bins=bins)
+    return {
+        "count": int(values.size),
+        "mean": float(values.mean()),
+        "median": float(np.median(values)),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "histogram": [
+            (float(edges[i]), float(edges[i + 1]), int(count))
+            for i, count in enumerate(counts)
+        ],
+    }
+
+
+class OdooGPTSurveyAnalytics(models.AbstractModel):
+    """Per-question statistics of a survey for the assistant.
+
+    All the answer lines of a survey are read in one ``search_read`` and
+    accumulated per question: choice counts, numeric summaries with a
+    histogram, date ranges and a few text samples. Results are cached per
+    survey until an answer is added or changed.
+    """
+
+    _name = "odoogpt.survey.analytics"
+    _description = "OdooGPT survey analytics"
+
+    def _line_fields(self):
+        fields = list(LINE_FIELDS)
+        # Scale questions only exist in recent versions of the survey module
+        if "value_scale" in self.env["survey.user_input.line"]._fields:
+            fields.append("value_scale")
+        return fields
+
+    @api.model
+    def _summary(self, survey_id):
+        """Return the number of participations per state."""
+        groups = (
+            self.env["survey.user_input"]
+            .sudo()
+            ._read_group([("survey_id", "=", survey_id)], ["state"], ["__count"])
+        )
+        return {state: count for state, count in groups}
+
+    def _stamp(self, survey_id):
+        # Any new, edited or deleted answer changes the count or the last write
+        self.env.cr.execute(
+            """
+            SELECT COUNT(*), MAX(line.write_date), MAX(answer.write_date)
+            FROM survey_user_input answer
+            LEFT JOIN survey_user_input_line line ON line.user_input_id = answer.id
+            WHERE answer.survey_id = %s
+            """,
+            [survey_id],
+        )
+        return self.env.cr.fetchone()
+
+    @api.model
+    def _question_stats(self, survey_id):
+        """Return the answer distribution of every question of the survey.
+
+        :return: list of ``{id, title, type, answered, ...}`` in survey order,
+            with ``choices`` (value, count), ``numeric`` statistics, ``dates``
+            range or ``samples`` of text answers depending on the answers
+        """
+        key = (self.env.cr.dbname, survey_id, self.env.lang)
+        stamp = self._stamp(survey_id)
+        cached = _stats_cache.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        questions = (
+            self.env["survey.question"]
+            .sudo()
+            .search_read(
+                [("survey_id", "=", survey_id), ("is_page", "=", False)],
+                ["title", "question_type"],
+                order="sequence, id",
+            )
+        )
+        lines = (
+            self.env["survey.user_input.line"]
+            .sudo()
+            .search_read(
+                [
+                    ("survey_id", "=", survey_id),
+                    ("user_input_id.state", "=", "done"),
+                    ("skipped", "=", False),
+                ],
+                self._line_fields(),
+            )
+        )
+
+        answered = defaultdict(set)
+        choices = defaultdict(Counter)
+        numbers = defaultdict(list)
+        dates = defaultdict(list)
+        texts = defaultdict(list)
+        for line in lines:
+            value = _answer_value(line)
+            if value is None or not line["question_id"]:
+                continue
+            question_id = line["question_id"][0]
+            answered[question_id].add(line["user_input_id"][0])
+            answer_type = line["answer_type"]
+            if answer_type == "suggestion":
+                choices[question_id][value] += 1
+            elif answer_type in NUMERIC_TYPES:
+                numbers[question_id].append(value)
+            elif answer_type in DATE_TYPES:
+                dates[question_id].append(value)
+            elif answer_type in TEXT_TYPES:
+                texts[question_id].append(value)
+
+        stats = []
+        for question in questions:
+            question_id = question["id"]
+            entry = {
+                "id": question_id,
+                "title": question["title"],
+                "type": question["question_type"],
+                "answered": len(answered[question_id]),
+            }
+            if choices[question_id]:
+                entry["choices"] = choices[question_id].most_common()
+            if numbers[question_id]:
+                entry["numeric"] = _numeric_stats(numbers[question_id])
+            if dates[question_id]:
+                entry["dates"] = (min(dates[question_id]), max(dates[question_id]))
+            if texts[question_id]:
+                entry["text_count"] = len(texts[question_id])
+                entry["samples"] = [
+                    text[:TEXT_SAMPLE_LENGTH]
+                    for text in texts[question_id][:TEXT_SAMPLES]
+                ]
+            stats.append(entry)
+
+        with _stats_lock:
+            if len(_stats_cache) >= MAX_CACHED_SURVEYS:
+                _stats_cache.pop(next(iter(_stats_cache)))
+            _stats_cache[key] = (stamp, stats)
+        return stats
+
+    @api.model
+    def _respondents(self, survey_id, limit, offset=0):
+        """Return one page of completed participations with their answers."""
+        UserInput = self.env["survey.user_input"].sudo()
+        domain = [("survey_id", "=", survey_id), ("state", "=", "done")]
+        total = UserInput.search_count(domain)
+        inputs = UserInput.search_read(
+            domain,
+            ["partner_id", "email", "end_datetime", "scoring_percentage"],
+            order="end_datetime desc, id desc",
+            limit=limit,
+            offset=offset,
+        )
+        lines = (
+            self.env["survey.user_input.line"]
+            .sudo()
+            .search_read(
+                [
+                    ("user_input_id", "in", [row["id"] for row in inputs]),
+                    ("skipped", "=", False),
+                ],
+                self._line_fields(),
+                order="question_sequence, id",
+            )
+        )
+        answers = defaultdict(list)
+        for line in lines:
+            value = _answer_value(line)
+            if value is not None and line["question_id"]:
+                answers[line["user_input_id"][0]].append(
+                    (line["question_id"][1], value)
+                )
+        for row in inputs:
+            row["answers"] = answers[row["id"]]
+        return {"total": total, "offset": offset, "respondents": inputs}
@@ -0,0 +1,174 @@
+"""Time budgets for the assistant tools.
+
+Every tool call runs inside a savepoint with its own ``statement_timeout`` and a
+wall-clock budget. When a statement times out, the budget runs out or the user
+asks to stop, the running query is cancelled, the savepoint is rolled back and
+the model receives a structured "too expensive" answer instead of a worker
+being pinned for minutes.
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import weakref
+
+from psycopg2 import errors
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR
+
+from . import replica
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_TOOL_TIMEOUT = float(os.getenv("ODOOGPT_TOOL_TIMEOUT", "15"))
+# Wall-clock budget of a whole tool call, relative to its statement timeout
+WALL_BUDGET_FACTOR = 2
+# Tools scanning large date ranges or arbitrary models get more room
+TOOL_TIMEOUTS = {
+    "aggregate": 30,
+    "orders_by_dates": 20,
+    "paid_invoices_by_dates": 20,
+    "pending_invoices_to_pay_by_dates": 20,
+    "partners_with_pending_invoices_to_pay": 20,
+    "products_highest_margin": 20,
+}
+STOP_WORDS = {"stop", "/stop", "para", "detente", "cancela", "cancelar"}
+APPLICATION_PREFIX = "odoogpt:channel:"
+
+_cursor_locks = weakref.WeakKeyDictionary()
+_cursor_locks_guard = threading.Lock()
+
+
+class ToolBudgetExceeded(Exception):
+    pass
+
+
+def _cursor_lock(cr):
+    # Tools run in threads and may share the job cursor, the savepoint and the
+    # session settings of one call must not interleave with another
+    with _cursor_locks_guard:
+        return _cursor_locks.setdefault(cr, threading.Lock())
+
+
+def _application_name(channel) -> str:
+    return f"{APPLICATION_PREFIX}{channel.id}" if channel else "odoogpt"
+
+
+def too_expensive(name, timeout, reason="timeout") -> str:
+    return json.dumps(
+        {
+            "error": "too_expensive",
+            "tool": name,
+            "reason": reason,
+            "timeout_seconds": timeout,
+            "message": (
+                "La consulta es demasiado costosa y se ha cancelado. "
+                "Acota el rango de fechas, añade filtros o reduce el límite."
+            ),
+        },
+        ensure_ascii=False,
+    )
+
+
+def with_budget(name, func):
+    """Run a tool with a statement timeout and a wall-clock budget."""
+    timeout = TOOL_TIMEOUTS.get(name, DEFAULT_TOOL_TIMEOUT)
+
+    @functools.wraps(func)
+    def wrapper(*args, odoo_manager, **kwargs):
+        cr = odoo_manager.env.cr
+        expired = threading.Event()
+
+        def cancel():
+            expired.set()
+            cr._cnx.cancel()
+
+        with _cursor_lock(cr):
+            try:
+                with cr.savepoint():
+                    cr.execute("""
+                        SELECT current_setting('statement_timeout'),
+                               current_setting('application_name')
+                        """)
+                    previous_timeout, previous_name = cr.fetchone()
+                    cr.execute(
+                        """
+                        SELECT set_config('statement_timeout', %s, true),
+                               set_config('application_name', %s, true)
+                        """,
+                        [
+                            str(int(timeout * 1000)),
+                            _application_name(kwargs.get("channel_id")),
+                        ],
+                    )
+                    timer = threading.Timer(timeout * WALL_BUDGET_FACTOR, cancel)
+                    timer.start()
+                    try:
+                        result = func(*args, odoo_manager=odoo_manager, **kwargs)
+                    finally:
+                        timer.cancel()
+                    # The tool may have swallowed the cancellation error, the
+                    # transaction state tells whether the savepoint is usable
+                    if (
+                        expired.is_set()
+                        or cr._cnx.info.transaction_status == TRANSACTION_STATUS_INERROR
+                    ):
+                        raise ToolBudgetExceeded()
+                    cr.execute(
+                        """
+                        SELECT set_config('statement_timeout', %s, true),
+                               set_config('application_name', %s, true)
+                        """,
+                        [previous_timeout, previous_name],
+                    )
+                return result
+            except (errors.QueryCanceled, ToolBudgetExceeded) as exc:
+                if expired.is_set():
+                    reason = "budget"
+                elif "user request" in str(exc):
+                    reason = "stopped"
+                else:
+                    reason = "timeout"
+                _logger.warning(f"Herramienta {name} cancelada ({reason})")
+                return too_expensive(name, timeout, reason)
+
+    return wrapper
+
+
+def is_stop_request(text) -> bool:
+    return (text or "").strip().lower().rstrip("!.") in STOP_WORDS
+
+
+def _cancel_backends(cr, channel) -> int:
+    cr.execute(
+        """
+        SELECT pg_cancel_backend(pid)
+        FROM pg_stat_activity
+        WHERE datname = current_database()
+          AND application_name = %s
+          AND pid <> pg_backend_pid()
+        """,
+        [_application_name(channel)],
+    )
+    return sum(1 for (cancelled,) in cr.fetchall() if cancelled)
+
+
+def cancel_channel_tools(cr, channel) -> int:
+    """Cancel the tool queries running for a chat, in any worker process.
+
+    Read-only tools run on the replica with the same application name, their
+    backends are cancelled there as well.
+    """
+    cancelled = _cancel_backends(cr, channel)
+    replica_cr = replica._replica_cursor(cr.dbname)
+    if replica_cr is not None:
+        try:
+            cancelled += _cancel_backends(replica_cr, channel)
+        except Exception as exc:
+            _logger.warning(
+                f"No se pudieron cancelar las consultas en la réplica: {exc}"
+            )
+        finally:
+            replica_cr.close()
+    return cancelled
@@ -1,9 +1,15 @@
 import json
 import logging
+from collections import defaultdict
 from datetime import timedelta
 
 from odoo import fields  # type: ignore
 
+from .calendar_service import DEFAULT_SLOT_COUNT, MAX_SLOT_COUNT
+from .odoogpt_table import DEFAULT_SCHEMA_FIELDS
+from .record_index import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+from .replica import on_replica
+from .tool_budget import with_budget
 from .utils import (
     Domain,
     UserEmail,
@@ -19,6 +25,11 @@ from .utils import (
 
 _logger = logging.getLogger(__name__)
 
+DEFAULT_PAGE_SIZE = 20
+DEFAULT_LOW_STOCK_THRESHOLD = 10
+MAX_REPORT_LINES = 50
+MAX_PAGE_SIZE = 100
+
 
 def send_odoo_msg(channel_id, odoogpt, message):
     channel_id.message_post(
@@ -29,6 +40,35 @@ def send_odoo_msg(channel_id, odoogpt, message):
     )
 
 
+def _page(limit, offset, max_limit=MAX_PAGE_SIZE):
+    """Normalize pagination arguments coming from the model."""
+    limit = min(max(int(limit or DEFAULT_PAGE_SIZE), 1), max_limit)
+    offset = max(int(offset or 0), 0)
+    return limit, offset
+
+
+def _fetch(odoo_manager, query, params):
+    """Run a report query after flushing pending ORM writes."""
+    env = odoo_manager.env
+    env.flush_all()
+    env.cr.execute(query, params)
+    return env.cr.dictfetchall()
+
+
+def _page_footer(rows, total, offset) -> str:
+    if not rows:
+        return f"Sin más resultados a partir de la posición {offset + 1}"
+    end = offset + len(rows)
+    footer = f"Mostrando {offset + 1}-{end} de {total}"
+    if end < total:
+        footer += f". Usa offset={end} para ver más"
+    return footer
+
+
+def _lang(odoo_manager) -> str:
+    return odoo_manager.env.lang or "en_US"
+
+
 def tool_create_sale_order_by_product_id(
     odoo_manager, odoogpt, channel_id, product_id, product_qty, email
 ) -> str:
@@ -48,8 +88,9 @@ def tool_create_sale_order_by_product_id(
     if not odoo_product:
         return f"No existe producto con ID: {product_id}"
 
+    # get_partner devuelve una lista de coincidencias
     return tool_create_sale_order(
-        odoo_manager, odoo_product, product_qty, partner, email
+        odoo_manager, odoo_product, product_qty, partner[0], email
     )
 
 
@@ -65,26 +106,76 @@ def tool_create_sale_order(
     if odoo_product["qty_available"] and odoo_product["qty_available"] < 1:
         return f"No hay stock disponible del producto {odoo_product['name']} en este momento"
 
-    order_line = [
-        {
-            "product_id": odoo_product["id"],
-            "product_uom_qty": product_qty,
-            "price_unit": odoo_product["list_price"] * product_qty,
-        },
-    ]
+    # Sin price_unit: la tarifa del cliente calcula el precio unitario
+    order_line = [{"product_id": odoo_product["id"], "product_uom_qty": product_qty}]
     try:
         sale_order = odoo_manager.create_sale_order(partner["id"], order_line)
         sale_order_data = odoo_manager.get_sale_order_by_id(sale_order)
+        if not sale_order_data:
+            return f"Presupuesto creado! Número de seguimiento: {sale_order}"
+        msg = _order_summary(sale_order_data)
     except Exception as exc:
         _logger.error(f"Error creando sale_order: {exc}")
         return f"Ha ocurrido un error al intentar crear un pedido con el producto {odoo_product['name']}. Error: {exc}"
 
-    msg = f"Nombre del producto: {odoo_product['name']}\nCantidad: {product_qty}\nMonto total: {odoo_product['list_price'] * product_qty}\nID del pedido: {sale_order}\nEnlace al presupuesto: {sale_order_data['link']}"
-
     notify_sale_order(email, msg)
     return f"Presupuesto creado! Número de seguimiento: {sale_order}"
 
 
+def _order_summary(sale_order_data) -> str:
+    products = "\n".join(
+        f"- {line['product_name']}: {line['quantity']} x {line['unit_price']:.2f} = {line['subtotal']:.2f}"
+        for line in sale_order_data["products"]
+    )
+    return (
+        f"Productos:\n{products}\n"
+        f"Monto total: {sale_order_data['amount_total']:.2f}\n"
+        f"ID del pedido: {sale_order_data['id']}\n"
+        f"Enlace al presupuesto: {sale_order_data['link']}"
+    )
+
+
+def tool_create_sale_order_multi(odoo_manager, odoogpt, channel_id, products, email):
+    _logger.info(f"Creando pedido con {len(products)} productos...")
+    send_odoo_msg(
+        channel_id,
+        odoogpt,
+        f"Estoy creando tu pedido con {len(products)} productos 📦",
+    )
+
+    partner = odoo_manager.get_partner_by_email(email)
+    if not partner:
+        return f"No existe el usuario con email: {email}"
+
+    lines = [
+        {
+            "default_code": product.get("sku"),
+            "product_id": product.get("product_id"),
+            "uom_qty": product.get("quantity", 1),
+        }
+        for product in products
+    ]
+    order_lines, issues = odoo_manager.create_order_line(lines)
+    if not order_lines:
+        return "No se pudo crear el pedido:\n" + "\n".join(issues)
+
+    try:
+        sale_order = odoo_manager.create_sale_order(partner[0]["id"], order_lines)
+        sale_order_data = odoo_manager.get_sale_order_by_id(sale_order)
+        if not sale_order_data:
+            return f"Presupuesto creado! Número de seguimiento: {sale_order}"
+        msg = _order_summary(sale_order_data)
+    except Exception as exc:
+        _logger.error(f"Error creando sale_order: {exc}")
+        return f"Ha ocurrido un error al intentar crear el pedido. Error: {exc}"
+
+    notify_sale_order(email, msg)
+    result = f"Presupuesto creado! Número de seguimiento: {sale_order}\n{msg}"
+    if issues:
+        result += "\nLíneas no incluidas:\n" + "\n".join(issues)
+    return result
+
+
 def tool_create_lead(odoo_manager, odoogpt, channel_id, phone, name, email) -> str:
     _logger.info("Creando lead...")
     send_odoo_msg(
@@ -190,7 +281,7 @@ def tool_get_all_products(odoo_manager, odoogpt, channel_id) -> str:
 
 
 def tool_get_products_by_category_id(
-    odoo_manager, category_id: int, odoogpt, channel_id
+    odoo_manager, category_id: int, odoogpt, channel_id, limit=None, offset=0
 ) -> str:
     _logger.info(f"Buscando productos por categoría id {category_id}")
     send_odoo_msg(
@@ -200,10 +291,14 @@ def tool_get_products_by_category_id(
     )
     if isinstance(category_id, str):
         category_id = int(category_id)
-    product = odoo_manager.get_products_by_category_id(category_id)
-    if product:
-        ans = json.dumps(product)
-        return ans
+    limit, offset = _page(limit, offset)
+    result = odoo_manager.get_products_by_category_id(category_id, limit, offset)
+    if result["total"]:
+        products = [
+            p for category in result["categories"] for p in category["products"]
+        ]
+        result["pagination"] = _page_footer(products, result["total"], offset)
+        return json.dumps(result)
 
     return f"No se encontraron productos con category_id {category_id}"
 
@@ -257,7 +352,7 @@ def orders_by_user_name(odoo_manager, odoogpt, channel_id, user_name):
         odoogpt,
         f"Estoy consultando tus pedidos, {user_name} 🧾",
     )
-    domain = UserName(user_name)
+    domain = UserName(user_name, odoo_manager.env)
     return orders_by_partner(odoo_manager, odoogpt, channel_id, domain)
 
 
@@ -294,29 +389,141 @@ def orders_by_user_phone(odoo_manager, odoogpt, channel_id, user_phone):
     return orders_by_partner(odoo_manager, odoogpt, channel_id, domain)
 
 
-def partners_with_pending_invoices_to_pay(odoo_manager, odoogpt, channel_id):
+PAID_INVOICES_WHERE = """
+    am.move_type = 'out_invoice'
+    AND am.state = 'posted'
+    AND am.payment_state = 'paid'
+"""
+PENDING_INVOICES_WHERE = """
+    am.move_type = 'out_invoice'
+    AND am.state = 'posted'
+    AND am.payment_state NOT IN ('paid', 'reversed')
+"""
+
+
+def _invoice_report(odoo_manager, where, params, amount_field, limit):
+    """Aggregate customer invoices server side.
+
+    Returns the totals grouped by currency, company currency and payment state,
+    and the top partners (by commercial partner id) ranked by ``amount_field``
+    converted to the company currency.
+    """
+    summary = _fetch(
+        odoo_manager,
+        f"""
+        SELECT cur.name AS currency,
+               company_cur.name AS company_currency,
+               am.payment_state,
+               COUNT(*) AS count,
+               SUM(am.amount_total) AS amount_total,
+               SUM(am.amount_residual) AS amount_residual,
+               SUM(am.amount_total_signed) AS amount_total_company,
+               SUM(am.amount_residual_signed) AS amount_residual_company
+        FROM account_move am
+        JOIN res_currency cur ON cur.id = am.currency_id
+        JOIN res_company company ON company.id = am.company_id
+        JOIN res_currency company_cur ON company_cur.id = company.currency_id
+        WHERE {where}
+        GROUP BY cur.name, company_cur.name, am.payment_state
+        ORDER BY cur.name, am.payment_state
+        """,
+        params,
+    )
+    if not summary:
+        return [], []
+
+    partners = _fetch(
+        odoo_manager,
+        f"""
+        WITH grouped AS (
+            SELECT partner.id, partner.name,
+                   cur.name AS currency,
+                   COUNT(*) AS count,
+                   SUM(am.amount_total) AS amount_total,
+                   SUM(am.amount_residual) AS amount_residual,
+                   SUM(am.{amount_field}_signed) AS rank_amount
+            FROM account_move am
+            JOIN res_partner partner ON partner.id = am.commercial_partner_id
+            JOIN res_currency cur ON cur.id = am.currency_id
+            WHERE {where}
+            GROUP BY partner.id, partner.name, cur.name
+        )
+        SELECT grouped.*,
+               COUNT(*) OVER () AS total_groups,
+               (SELECT COUNT(DISTINCT id) FROM grouped) AS total_partners
+        FROM grouped
+        ORDER BY rank_amount DESC, id
+        LIMIT %s
+        """,
+        (*params, limit),
+    )
+    return summary, partners
+
+
+def _format_invoice_summary(summary, label, amount_field) -> str:
+    count = sum(row["count"] for row in summary)
+    by_currency = defaultdict(float)
+    by_company_currency = defaultdict(float)
+    by_state = defaultdict(int)
+    for row in summary:
+        by_currency[row["currency"]] += row[amount_field]
+        by_company_currency[row["company_currency"]] += row[f"{amount_field}_company"]
+        by_state[row["payment_state"]] += row["count"]
+
+    lines = [f"Facturas: {count}"]
+    lines.append(
+        f"{label}: "
+        + ", ".join(
+            f"{amount:,.2f} {currency}" for currency, amount in by_currency.items()
+        )
+    )
+    if list(by_company_currency) != list(by_currency):
+        lines.append(
+            f"{label} en moneda de la compañía: "
+            + ", ".join(
+                f"{amount:,.2f} {currency}"
+                for currency, amount in by_company_currency.items()
+            )
+        )
+    if len(by_state) > 1:
+        lines.append(
+            "Por estado de pago: "
+            + ", ".join(f"{state}: {n}" for state, n in by_state.items())
+        )
+    return "\n".join(lines)
+
+
+def _format_invoice_partners(partners, amount_field, label) -> str:
+    lines = [f"Top {len(partners)} clientes:"]
+    lines += [
+        f"- {row['name']} (ID {row['id']}): {row['count']} facturas, "
+        f"{row[amount_field]:,.2f} {row['currency']} {label}"
+        for row in partners
+    ]
+    if partners and partners[0]["total_groups"] > len(partners):
+        lines.append(f"...y {partners[0]['total_groups'] - len(partners)} más")
+    return "\n".join(lines)
+
+
+def partners_with_pending_invoices_to_pay(
+    odoo_manager, odoogpt, channel_id, limit=None
+):
     _logger.info("Consultando clientes con facturas por cobrar")
     send_odoo_msg(
         channel_id, odoogpt, "Estoy consultando clientes con facturas por cobrar 💸"
     )
-    query = """
-        SELECT DISTINCT partner.id, partner.name
-        FROM account_move invoice
-        JOIN res_partner partner ON partner.id = invoice.partner_id
-        WHERE invoice.payment_state != 'paid'
-        AND invoice.state = 'posted'
-    """
-    odoo_manager.env.cr.execute(query)
-    results = odoo_manager.env.cr.fetchall()
-
-    if not results:
+    limit, _offset = _page(limit, 0)
+    summary, partners = _invoice_report(
+        odoo_manager, PENDING_INVOICES_WHERE, (), "amount_residual", limit
+    )
+    if not summary:
         return "No hay clientes con facturas por cobrar"
 
-    count = len(results)
-    names = [name for _, name in results]
-
-    return f"Clientes con facturas por cobrar: {count}\n" + "\n".join(
-        f"- {name}" for name in names
+    return (
+        f"Clientes con facturas por cobrar: {partners[0]['total_partners']}\n"
+        + _format_invoice_summary(summary, "Pendiente de cobro", "amount_residual")
+        + "\n\n"
+        + _format_invoice_partners(partners, "amount_residual", "pendiente")
     )
 
 
@@ -327,102 +534,150 @@ def top_product_by_dates(odoo_manager, odoogpt, channel_id, start_date, end_date
         odoogpt,
         f"Estoy consultando el producto más demandado desde {start_date} hasta {end_date} 🛒",
     )
-    lines = (
-        odoo_manager.env["sale.order.line"]
-        .sudo()
-        .read_group(
-            [
-                ("order_id.date_order", ">=", start_date),
-                ("order_id.date_order", "<=", end_date),
-            ],
-            ["product_id", "product_uom_qty:sum"],
-            ["product_id"],
-        )
-    )
-
-    lines = sorted(lines, key=lambda x: x["product_uom_qty"], reverse=True)
+    demand = odoo_manager.env["odoogpt.sale.demand"].sudo()
+    lines = demand._demand_by_product(start_date, end_date, limit=1)
     if not lines:
         return "No hay pedidos en el periodo"
 
-    product = (
-        odoo_manager.env["product.product"].sudo().browse(lines[0]["product_id"][0])
-    )
-    return f"Producto más demandado: {product.name} ({lines[0]['product_uom_qty']} unidades solicitadas desde {start_date} hasta {end_date})"
+    line = lines[0]
+    return f"Producto más demandado: {line['name']} ({line['product_uom_qty']} unidades solicitadas desde {start_date} hasta {end_date})"
 
 
-def pending_orders_to_send(odoo_manager, odoogpt, channel_id):
+def pending_orders_to_send(odoo_manager, odoogpt, channel_id, limit=None, offset=0):
     _logger.info("Consultando pedidos pendientes de envío")
     send_odoo_msg(
         channel_id, odoogpt, "Estoy consultando pedidos pendientes de envío ⏳"
     )
-    orders = (
-        odoo_manager.env["sale.order"]
-        .sudo()
-        .search(
-            [
-                ("state", "in", ["sale", "done"]),
-                ("picking_ids.state", "not in", ["done", "cancel"]),
-            ]
-        )
+    limit, offset = _page(limit, offset)
+    orders = _fetch(
+        odoo_manager,
+        """
+        SELECT so.id, so.name, so.date_order, so.amount_total,
+               partner.name AS partner_name,
+               ARRAY_AGG(DISTINCT picking.state) AS picking_states,
+               COUNT(*) OVER () AS total
+        FROM sale_order so
+        JOIN res_partner partner ON partner.id = so.partner_id
+        JOIN stock_picking picking ON picking.sale_id = so.id
+        WHERE so.state IN ('sale', 'done')
+        GROUP BY so.id, partner.name
+        HAVING BOOL_OR(picking.state NOT IN ('done', 'cancel'))
+        ORDER BY so.date_order DESC, so.id DESC
+        LIMIT %s OFFSET %s
+        """,
+        (limit, offset),
     )
 
     if not orders:
-        return "Todos los pedidos están enviados"
+        return (
+            "Todos los pedidos están enviados"
+            if not offset
+            else _page_footer([], 0, offset)
+        )
 
-    result_lines = []
-    for order in orders:
-        picking_states = ", ".join(set(p.state for p in order.picking_ids))
-        product_lines = "\n".join(
-            f"   - {line.product_id.name}: {line.product_uom_qty} unidades"
-            for line in order.order_line
+    lines = _fetch(
+        odoo_manager,
+        """
+        SELECT line.order_id,
+               COALESCE(tmpl.name->>%s, tmpl.name->>'en_US') AS product_name,
+               line.product_uom_qty
+        FROM sale_order_line line
+        JOIN product_product product ON product.id = line.product_id
+        JOIN product_template tmpl ON tmpl.id = product.product_tmpl_id
+        WHERE line.order_id IN %s
+        ORDER BY line.order_id, line.sequence, line.id
+        """,
+        (_lang(odoo_manager), tuple(order["id"] for order in orders)),
+    )
+    lines_by_order = defaultdict(list)
+    for line in lines:
+        lines_by_order[line["order_id"]].append(
+            f"   - {line['product_name']}: {line['product_uom_qty']} unidades"
         )
 
+    result_lines = []
+    for order in orders:
+        picking_states = ", ".join(sorted(filter(None, order["picking_states"])))
         info = (
-            f"📦 Pedido: {order.name}\n"
-            f"👤 Cliente: {order.partner_id.name}\n"
-            f"📅 Fecha: {order.date_order.strftime('%Y-%m-%d')}\n"
-            f"💰 Total: ${order.amount_total:.2f}\n"
+            f"📦 Pedido: {order['name']}\n"
+            f"👤 Cliente: {order['partner_name']}\n"
+            f"📅 Fecha: {order['date_order'].strftime('%Y-%m-%d')}\n"
+            f"💰 Total: ${order['amount_total']:.2f}\n"
             f"🚚 Estado de envío: {picking_states or 'No definido'}\n"
-            f"🛒 Productos:\n{product_lines}"
+            f"🛒 Productos:\n" + "\n".join(lines_by_order[order["id"]])
         )
         result_lines.append(info)
 
-    return "\n\n".join(result_lines)
+    total = orders[0]["total"]
+    return (
+        f"Pedidos pendientes de envío: {total}\n\n"
+        + "\n\n".join(result_lines)
+        + (f"\n\n{_page_footer(orders, total, offset)}")
+    )
 
 
-def canceled_orders_by_dates(odoo_manager, odoogpt, channel_id, start_date, end_date):
+def canceled_orders_by_dates(
+    odoo_manager, odoogpt, channel_id, start_date, end_date, limit=None, offset=0
+):
     _logger.info(f"Consultando pedidos cancelados entre {start_date} y {end_date}")
     send_odoo_msg(
         channel_id,
         odoogpt,
         f"Estoy consultando pedidos cancelados desde {start_date} hasta {end_date}...",
     )
-    canceled_orders = (
-        odoo_manager.env["sale.order"]
-        .sudo()
-        .search(
-            [
-                ("state", "=", "cancel"),
-                ("date_order", ">=", start_date),
-                ("date_order", "<=", end_date),
-            ]
-        )
+    limit, offset = _page(limit, offset)
+    orders = _fetch(
+        odoo_manager,
+        """
+        SELECT so.name, so.date_order, so.amount_total,
+               partner.name AS partner_name,
+               COUNT(*) OVER () AS total
+        FROM sale_order so
+        JOIN res_partner partner ON partner.id = so.partner_id
+        WHERE so.state = 'cancel'
+          AND so.date_order >= %s
+          AND so.date_order <= %s
+        ORDER BY so.date_order DESC, so.id DESC
+        LIMIT %s OFFSET %s
+        """,
+        (start_date, end_date, limit, offset),
     )
 
-    if not canceled_orders:
-        return "No hay pedidos cancelados este mes"
+    if not orders:
+        if offset:
+            return _page_footer([], 0, offset)
+        return "No hay pedidos cancelados en el periodo indicado"
+
+    info_lines = [
+        f"📦 {order['name']} | Cliente: {order['partner_name']} | "
+        f"Fecha: {order['date_order'].strftime('%Y-%m-%d')} | Total: ${order['amount_total']:.2f}"
+        for order in orders
+    ]
+    total = orders[0]["total"]
+    return (
+        f"Pedidos cancelados entre {start_date} y {end_date}: {total}\n"
+        + "\n".join(info_lines)
+        + f"\n{_page_footer(orders, total, offset)}"
+    )
 
-    info_lines = []
-    for order in canceled_orders:
-        info = (
-            f"📦 {order.name} | Cliente: {order.partner_id.name} | "
-            f"Fecha: {order.date_order.strftime('%Y-%m-%d')} | Total: ${order.amount_total:.2f}"
-        )
-        info_lines.append(info)
 
-    return f"Pedidos cancelados este mes: {len(canceled_orders)}\n" + "\n".join(
-        info_lines
+def _stock_by_product(odoo_manager, product_ids) -> dict:
+    """On hand quantity in internal locations, aggregated by stock.quant."""
+    if not product_ids:
+        return {}
+    groups = (
+        odoo_manager.env["stock.quant"]
+        .sudo()
+        ._read_group(
+            [
+                ("product_id", "in", list(product_ids)),
+                ("location_id.usage", "=", "internal"),
+            ],
+            ["product_id"],
+            ["quantity:sum"],
+        )
     )
+    return {product.id: quantity for product, quantity in groups}
 
 
 def product_stock(odoo_manager, odoogpt, channel_id, product_name):
@@ -432,58 +687,69 @@ def product_stock(odoo_manager, odoogpt, channel_id, product_name):
         odoogpt,
         f"Estoy consultando el stock del producto {product_name} 📦",
     )
-    product = (
+    ranked_ids = (
+        odoo_manager.env["odoogpt.name.search"]
+        .sudo()
+        ._search_ids("product.product", product_name, limit=5)
+    )
+    products = (
         odoo_manager.env["product.product"]
         .sudo()
-        .search([("name", "ilike", product_name)], limit=1)
+        .search_read([("id", "in", ranked_ids)], ["display_name"])
     )
+    products.sort(key=lambda product: ranked_ids.index(product["id"]))
 
-    if not product:
+    if not products:
         return "Producto no encontrado"
 
-    return f"Stock de {product.name}: {product.qty_available} unidades"
+    stock = _stock_by_product(odoo_manager, [product["id"] for product in products])
+    return "\n".join(
+        f"Stock de {product['display_name']} (ID {product['id']}): "
+        f"{stock.get(product['id'], 0.0)} unidades"
+        for product in products
+    )
 
 
-def paid_invoices_by_dates(odoo_manager, odoogpt, channel_id, start_date, end_date):
+def paid_invoices_by_dates(
+    odoo_manager, odoogpt, channel_id, start_date, end_date, limit=None
+):
     _logger.info(f"Consultando facturas pagadas entre {start_date} y {end_date}")
     send_odoo_msg(
         channel_id,
         odoogpt,
         f"Estoy consultando facturas cobradas desde {start_date} hasta {end_date} 💰",
     )
-    invoices = (
-        odoo_manager.env["account.move"]
-        .sudo()
-        .search(
-            [
-                ("payment_state", "=", "paid"),
-                ("invoice_date", ">=", start_date),
-                ("invoice_date", "<=", end_date),
-                ("move_type", "=", "out_invoice"),
-            ]
-        )
+    limit, _offset = _page(limit, 0)
+    summary, partners = _invoice_report(
+        odoo_manager,
+        PAID_INVOICES_WHERE + " AND am.invoice_date BETWEEN %s AND %s",
+        (start_date, end_date),
+        "amount_total",
+        limit,
     )
 
-    if not invoices:
+    if not summary:
         return "No hay facturas pagadas en el rango indicado"
 
-    info_lines = []
-    for inv in invoices:
-        line = (
-            f"🧾 Factura: {inv.name} | "
-            f"Cliente: {inv.partner_id.name} | "
-            f"Fecha: {inv.invoice_date} | "
-            f"Total: ${inv.amount_total:.2f}"
-        )
-        info_lines.append(line)
-
-    total = sum(inv.amount_total for inv in invoices)
     return (
-        f"Facturas pagadas: {len(invoices)}\n"
-        f"Total recaudado: ${total:.2f}\n\n" + "\n".join(info_lines)
+        _format_invoice_summary(summary, "Total recaudado", "amount_total")
+        + "\n\n"
+        + _format_invoice_partners(partners, "amount_total", "cobrado")
     )
 
 
+def _receivable_amount(row) -> str:
+    """Company currency amount of a ranking row, with its split per currency."""
+    text = f"{row['value']:.2f} {row['currency']}"
+    amounts = row.get("amounts") or []
+    if any(amount["currency"] != row["currency"] for amount in amounts):
+        split = ", ".join(
+            f"{amount['amount']:.2f} {amount['currency']}" for amount in amounts
+        )
+        text += f" [{split}]"
+    return text
+
+
 def partners_paid_invoices_by_dates(
     odoo_manager, odoogpt, channel_id, start_date, end_date
 ):
@@ -495,62 +761,101 @@ def partners_paid_invoices_by_dates(
         odoogpt,
         f"Estoy obteniendo el importe acumulado en facturas pagadas por cada cliente entre {start_date} y {end_date} 💰",
     )
-
-    query = """
-        SELECT partner.name, COUNT(*) AS count
-        FROM account_move
-        JOIN res_partner partner ON partner.id = account_move.partner_id
-        WHERE account_move.payment_state = 'paid'
-          AND account_move.state = 'posted'
-          AND account_move.move_type = 'out_invoice'
-          AND account_move.invoice_date BETWEEN %s AND %s
-        GROUP BY partner.name
-        ORDER BY count DESC
-    """
-    odoo_manager.env.cr.execute(query, (start_date, end_date))
-    results = odoo_manager.env.cr.fetchall()
+    results = (
+        odoo_manager.env["odoogpt.receivable"]
+        .sudo()
+        ._partner_ranking(
+            "paid_amount",
+            start_date,
+            end_date,
+            limit=MAX_REPORT_LINES,
+            by_currency=True,
+        )
+    )
 
     if not results:
         return "No se encontraron facturas pagadas en ese rango de fechas"
 
-    # Mostrar hasta 50 resultados o resumen
-    if len(results) > 50:
-        avg = sum(row[1] for row in results) / len(results)
-        return (
-            f"{len(results)} clientes - Promedio de facturas pagadas: {round(avg, 2)}"
+    info = "\n".join(
+        f"{row['name']}: {_receivable_amount(row)} en {row['paid_count']} facturas pagadas"
+        for row in results
+    )
+    total = results[0]["total"]
+    if total > len(results):
+        avg = results[0]["grand_total"] / total
+        info += (
+            f"\n...y {total - len(results)} clientes más. "
+            f"Promedio por cliente: {avg:.2f} {results[0]['currency']}"
         )
-
-    return "\n".join([f"{name}: {count} facturas pagadas" for name, count in results])
+    return info
 
 
-def products_highest_margin(odoo_manager, odoogpt, channel_id):
+def products_highest_margin(
+    odoo_manager, odoogpt, channel_id, limit=10, sort_by="amount"
+):
     _logger.info("Consultando productos con mayor margen")
     send_odoo_msg(
         channel_id, odoogpt, "Estoy consultando productos con mayor margen-beneficio 📊"
     )
-    products = (
-        odoo_manager.env["product.product"].sudo().search([("standard_price", ">", 0)])
-    )
-
-    products_with_margin = sorted(
-        products, key=lambda p: p.list_price - p.standard_price, reverse=True
+    limit, _offset = _page(limit, 0)
+    env = odoo_manager.env
+    # standard_price is company dependent, its value lives in ir_property: the
+    # product's own row for the company, else the default row of the field
+    order = "margin_percent DESC" if sort_by == "percent" else "margin DESC"
+    products = _fetch(
+        odoo_manager,
+        f"""
+        WITH default_cost AS (
+            SELECT prop.value_float
+            FROM ir_property prop
+            JOIN ir_model_fields field ON field.id = prop.fields_id
+            WHERE field.model = 'product.product'
+              AND field.name = 'standard_price'
+              AND prop.res_id IS NULL
+              AND (prop.company_id = %(company_id)s OR prop.company_id IS NULL)
+            ORDER BY prop.company_id NULLS LAST
+            LIMIT 1
+        )
+        SELECT id, name,
+               list_price - cost AS margin,
+               (list_price - cost) / cost * 100 AS margin_percent
+        FROM (
+            SELECT product.id,
+                   COALESCE(tmpl.name->>%(lang)s, tmpl.name->>'en_US') AS name,
+                   tmpl.list_price,
+                   COALESCE(prop.value_float, default_cost.value_float) AS cost
+            FROM product_product product
+            JOIN product_template tmpl ON tmpl.id = product.product_tmpl_id
+            LEFT JOIN ir_property prop
+              ON prop.res_id = 'product.product,' || product.id
+             AND prop.name = 'standard_price'
+             AND prop.company_id = %(company_id)s
+            LEFT JOIN default_cost ON TRUE
+            WHERE product.active
+              AND tmpl.active
+        ) costs
+        WHERE cost > 0
+        ORDER BY {order}, id
+        LIMIT %(limit)s
+        """,
+        {"lang": _lang(odoo_manager), "company_id": env.company.id, "limit": limit},
     )
 
-    top_products = products_with_margin[:10]
-
     return (
         "\n".join(
             [
-                f"{p.name}: Margen ${round(p.list_price - p.standard_price, 2)} "
-                f"({round((p.list_price - p.standard_price) / p.standard_price * 100, 2)}%)"
-                for p in top_products
+                f"{p['name']} (ID {p['id']}): Margen ${round(p['margin'], 2)} "
+                f"({round(p['margin_percent'], 2)}%)"
+                for p in products
             ]
         )
         or "No hay datos de margen"
     )
 
 
-def orders_by_product_id(odoo_manager, odoogpt, channel_id, product_id: int) -> str:
+def orders_by_product_id(
+    odoo_manager, odoogpt, channel_id, product_id: int, limit=None, offset=0
+) -> str:
     send_odoo_msg(
         channel_id,
         odoogpt,
@@ -559,40 +864,63 @@ def orders_by_product_id(odoo_manager, odoogpt, channel_id, product_id: int) ->
     _logger.info(f"Consultando pedidos del producto con ID {product_id}")
     try:
         product_id = int(product_id)
-        product = odoo_manager.env["product.product"].sudo().browse(product_id)
-        if not product.exists():
+        limit, offset = _page(limit, offset)
+        product = _fetch(
+            odoo_manager,
+            """
+            SELECT COALESCE(tmpl.name->>%s, tmpl.name->>'en_US') AS name
+            FROM product_product product
+            JOIN product_template tmpl ON tmpl.id = product.product_tmpl_id
+            WHERE product.id = %s
+            """,
+            (_lang(odoo_manager), product_id),
+        )
+        if not product:
             return f"No se encontró el producto con ID {product_id}"
-
-        lines = (
-            odoo_manager.env["sale.order.line"]
-            .sudo()
-            .search([("product_id", "=", product_id)])
+        product_name = product[0]["name"]
+
+        lines = _fetch(
+            odoo_manager,
+            """
+            SELECT so.name, so.date_order, so.amount_total, so.state,
+                   partner.name AS partner_name,
+                   line.product_uom_qty, line.price_subtotal,
+                   COUNT(*) OVER () AS total,
+                   SUM(line.product_uom_qty) OVER () AS total_qty,
+                   SUM(line.price_subtotal) OVER () AS total_amount
+            FROM sale_order_line line
+            JOIN sale_order so ON so.id = line.order_id
+            JOIN res_partner partner ON partner.id = so.partner_id
+            WHERE line.product_id = %s
+            ORDER BY so.date_order DESC, line.id DESC
+            LIMIT %s OFFSET %s
+            """,
+            (product_id, limit, offset),
         )
 
         if not lines:
-            return f"No se encontraron pedidos asociados al producto '{product.name}'"
-
-        total_qty = sum(line.product_uom_qty for line in lines)
-        total_orders = sum(line.price_subtotal for line in lines)
-
-        # Agrupar por pedido
-        orders_info = []
-        for line in lines:
-            order = line.order_id
-            orders_info.append(
-                f"📦 Pedido: {order.name}\n"
-                f"👤 Cliente: {order.partner_id.name}\n"
-                f"📅 Fecha: {order.date_order.strftime('%Y-%m-%d')}\n"
-                f"💰 Total del pedido: ${order.amount_total:.2f}\n"
-                f"📌 Estado: {order.state}\n"
-                f"🛒 Producto: {line.product_id.name} - {line.product_uom_qty} unidades - Subtotal: ${line.price_subtotal:.2f}\n"
-                f"{'-' * 40}"
-            )
-
+            if offset:
+                return _page_footer([], 0, offset)
+            return f"No se encontraron pedidos asociados al producto '{product_name}'"
+
+        orders_info = [
+            f"📦 Pedido: {line['name']}\n"
+            f"👤 Cliente: {line['partner_name']}\n"
+            f"📅 Fecha: {line['date_order'].strftime('%Y-%m-%d')}\n"
+            f"💰 Total del pedido: ${line['amount_total']:.2f}\n"
+            f"📌 Estado: {line['state']}\n"
+            f"🛒 Producto: {product_name} - {line['product_uom_qty']} unidades - Subtotal: ${line['price_subtotal']:.2f}\n"
+            f"{'-' * 40}"
+            for line in lines
+        ]
+        first = lines[0]
         return (
-            f"🛒Pedidos del producto '{product.name}':\n"
-            f"- Total de unidades solicitadas: {total_qty}\n"
-            f"- Monto total acumulado: ${total_orders:.2f}\n\n" + "\n".join(orders_info)
+            f"🛒Pedidos del producto '{product_name}':\n"
+            f"- Líneas de pedido: {first['total']}\n"
+            f"- Total de unidades solicitadas: {first['total_qty']}\n"
+            f"- Monto total acumulado: ${first['total_amount']:.2f}\n\n"
+            + "\n".join(orders_info)
+            + f"\n{_page_footer(lines, first['total'], offset)}"
         )
     except Exception as e:
         _logger.error(f"Error consultando pedidos del producto {product_id}: {e}")
@@ -606,23 +934,15 @@ def top_partner_by_invoices_count(odoo_manager, odoogpt, channel_id, start_date)
         odoogpt,
         "Estoy buscando al cliente con mayor cantidad de facturas pagadas 👤",
     )
-    query = """
-        SELECT partner.name, COUNT(*) AS count
-        FROM account_move
-        JOIN res_partner partner ON partner.id = account_move.partner_id
-        WHERE account_move.payment_state = 'paid'
-          AND account_move.state = 'posted'
-          AND account_move.move_type = 'out_invoice'
-          AND account_move.invoice_date >= %s
-        GROUP BY partner.name
-        ORDER BY count DESC
-        LIMIT 1
-    """
-    odoo_manager.env.cr.execute(query, (start_date,))
-    result = odoo_manager.env.cr.dictfetchone()
+    results = (
+        odoo_manager.env["odoogpt.receivable"]
+        .sudo()
+        ._partner_ranking("paid_count", start_date, limit=1)
+    )
 
-    if result:
-        return f"🏆Cliente con más facturas pagadas desde {start_date}: {result['name']} ({result['count']} facturas)"
+    if results:
+        result = results[0]
+        return f"🏆Cliente con más facturas pagadas desde {start_date}: {result['name']} ({result['value']} facturas)"
 
     return f"No se encontraron facturas pagadas a partir de {start_date}"
 
@@ -636,52 +956,60 @@ def top_partner_by_payments_volume(
         odoogpt,
         "Estoy buscando al cliente con mayor volumen de ingresos 👤",
     )
-    query = """
-        SELECT partner.name, SUM(account_move.amount_total) AS total
-        FROM account_move
-        JOIN res_partner partner ON partner.id = account_move.partner_id
-        WHERE account_move.payment_state = 'paid'
-          AND account_move.state = 'posted'
-          AND account_move.move_type = 'out_invoice'
-          AND account_move.invoice_date >= %s
-        GROUP BY partner.name
-        ORDER BY total DESC
-        LIMIT 1
-    """
-    odoo_manager.env.cr.execute(query, (start_date,))
-    result = odoo_manager.env.cr.dictfetchone()
+    results = (
+        odoo_manager.env["odoogpt.receivable"]
+        .sudo()
+        ._partner_ranking("paid_amount", start_date, limit=1, by_currency=True)
+    )
 
-    if result:
-        return f"💰Cliente con mayor facturación desde {start_date}: {result['name']} (${result['total']:.2f})"
+    if results:
+        result = results[0]
+        return f"💰Cliente con mayor facturación desde {start_date}: {result['name']} ({_receivable_amount(result)})"
 
     return f"No se encontraron facturas pagadas a partir de {start_date}"
 
 
-def orders_by_dates(odoo_manager, odoogpt, channel_id, start_date, end_date):
+def orders_by_dates(
+    odoo_manager, odoogpt, channel_id, start_date, end_date, limit=None, offset=0
+):
     _logger.info(f"Buscando pedidos entre {start_date} y {end_date}")
     send_odoo_msg(
         channel_id,
         odoogpt,
         f"Estoy buscando pedidos solicitados desde {start_date} hasta {end_date} 📦",
     )
-    orders = (
-        odoo_manager.env["sale.order"]
-        .sudo()
-        .search([("date_order", ">=", start_date), ("date_order", "<=", end_date)])
+    limit, offset = _page(limit, offset)
+    orders = _fetch(
+        odoo_manager,
+        """
+        SELECT so.name, so.amount_total, partner.name AS partner_name,
+               COUNT(*) OVER () AS total,
+               SUM(so.amount_total) OVER () AS total_amount
+        FROM sale_order so
+        JOIN res_partner partner ON partner.id = so.partner_id
+        WHERE so.date_order >= %s
+          AND so.date_order <= %s
+        ORDER BY so.date_order DESC, so.id DESC
+        LIMIT %s OFFSET %s
+        """,
+        (start_date, end_date, limit, offset),
     )
+    if not orders:
+        return _page_footer([], 0, offset) if offset else "No hay pedidos"
+
+    first = orders[0]
     return (
-        "\n".join(
-            [
-                f"{order.name}: {order.partner_id.name} - ${order.amount_total}"
-                for order in orders
-            ]
+        f"Pedidos: {first['total']} | Importe total: ${first['total_amount']:.2f}\n"
+        + "\n".join(
+            f"{order['name']}: {order['partner_name']} - ${order['amount_total']}"
+            for order in orders
         )
-        or "No hay pedidos"
+        + f"\n{_page_footer(orders, first['total'], offset)}"
     )
 
 
 def pending_invoices_to_pay_by_dates(
-    odoo_manager, odoogpt, channel_id, start_date, end_date
+    odoo_manager, odoogpt, channel_id, start_date, end_date, limit=None
 ):
     _logger.info(f"Consultando facturas por cobrar entre {start_date} y {end_date}")
     send_odoo_msg(
@@ -689,56 +1017,95 @@ def pending_invoices_to_pay_by_dates(
         odoogpt,
         f"Estoy consultando facturas por cobrar desde {start_date} hasta {end_date} 💰",
     )
-    invoices = (
-        odoo_manager.env["account.move"]
-        .sudo()
-        .search(
-            [
-                ("payment_state", "!=", "paid"),
-                ("invoice_date", ">=", start_date),
-                ("invoice_date", "<=", end_date),
-                ("state", "=", "posted"),
-                ("move_type", "=", "out_invoice"),
-            ]
-        )
+    limit, _offset = _page(limit, 0)
+    summary, partners = _invoice_report(
+        odoo_manager,
+        PENDING_INVOICES_WHERE + " AND am.invoice_date BETWEEN %s AND %s",
+        (start_date, end_date),
+        "amount_residual",
+        limit,
     )
 
-    if not invoices:
+    if not summary:
         return "No hay facturas por cobrar"
 
-    lines = []
-    for inv in invoices:
-        lines.append(
-            f"🧾 Factura: {inv.name} | "
-            f"Cliente: {inv.partner_id.name} | "
-            f"Fecha: {inv.invoice_date} | "
-            f"Total: ${inv.amount_total:.2f} | "
-            f"Estado: {inv.payment_state}"
-        )
-
-    total = sum(inv.amount_total for inv in invoices)
     return (
-        f"Facturas pendientes: {len(invoices)}\n"
-        f"Monto total pendiente: ${total:.2f}\n\n" + "\n".join(lines)
+        _format_invoice_summary(summary, "Monto total pendiente", "amount_residual")
+        + "\n\n"
+        + _format_invoice_partners(partners, "amount_residual", "pendiente")
     )
 
 
-def products_low_stock(odoo_manager, odoogpt, channel_id):
+def products_low_stock(odoo_manager, odoogpt, channel_id, limit=None, offset=0):
     _logger.info("Consultando productos con bajo stock")
     send_odoo_msg(channel_id, odoogpt, "Estoy consultando productos con bajo stock 📦")
-    products = (
-        odoo_manager.env["product.product"]
+    limit, offset = _page(limit, offset)
+    default_threshold = float(
+        odoo_manager.env["ir.config_parameter"]
         .sudo()
-        .search([("qty_available", "<", 10), ("type", "=", "product")])
+        .get_param("odoogpt.low_stock_threshold", DEFAULT_LOW_STOCK_THRESHOLD)
     )
+    # The threshold comes from the product, then from the closest category
+    # in its hierarchy, then from the global parameter
+    products = _fetch(
+        odoo_manager,
+        """
+        WITH stock AS (
+            SELECT quant.product_id, SUM(quant.quantity) AS qty
+            FROM stock_quant quant
+            JOIN stock_location location ON location.id = quant.location_id
+            WHERE location.usage = 'internal'
+            GROUP BY quant.product_id
+        ),
+        candidates AS (
+            SELECT product.id,
+                   COALESCE(tmpl.name->>%(lang)s, tmpl.name->>'en_US') AS name,
+                   COALESCE(stock.qty, 0) AS qty,
+                   COALESCE(
+                       NULLIF(tmpl.odoogpt_low_stock_threshold, 0),
+                       (
+                           SELECT parent.odoogpt_low_stock_threshold
+                           FROM product_category parent
+                           WHERE parent.id::text = ANY(string_to_array(categ.parent_path, '/'))
+                             AND parent.odoogpt_low_stock_threshold > 0
+                           ORDER BY length(parent.parent_path) DESC
+                           LIMIT 1
+                       ),
+                       %(default_threshold)s
+                   ) AS threshold
+            FROM product_product product
+            JOIN product_template tmpl ON tmpl.id = product.product_tmpl_id
+            LEFT JOIN product_category categ ON categ.id = tmpl.categ_id
+            LEFT JOIN stock ON stock.product_id = product.id
+            WHERE product.active
+              AND tmpl.active
+              AND tmpl.type = 'product'
+        )
+        SELECT id, name, qty, threshold, COUNT(*) OVER () AS total
+        FROM candidates
+        WHERE qty < threshold
+        ORDER BY qty - threshold, id
+        LIMIT %(limit)s OFFSET %(offset)s
+        """,
+        {
+            "lang": _lang(odoo_manager),
+            "default_threshold": default_threshold,
+            "limit": limit,
+            "offset": offset,
+        },
+    )
+    if not products:
+        return _page_footer([], 0, offset) if offset else "Todo el stock está OK"
+
+    total = products[0]["total"]
     return (
-        "\n".join(
-            [
-                f"{product.name}: {product.qty_available} unidades"
-                for product in products
-            ]
+        f"Productos con bajo stock: {total}\n"
+        + "\n".join(
+            f"{product['name']} (ID {product['id']}): {product['qty']} unidades "
+            f"(mínimo {product['threshold']})"
+            for product in products
         )
-        or "Todo el stock está OK"
+        + f"\n{_page_footer(products, total, offset)}"
     )
 
 
@@ -749,30 +1116,23 @@ def products_qty_by_dates(odoo_manager, odoogpt, channel_id, start_date, end_dat
         odoogpt,
         f"Estoy consultando la demanda por producto desde {start_date} hasta {end_date} 🛒",
     )
-    lines = (
-        odoo_manager.env["sale.order.line"]
-        .sudo()
-        .read_group(
-            [
-                ("order_id.date_order", ">=", start_date),
-                ("order_id.date_order", "<=", end_date),
-            ],
-            ["product_id", "price_subtotal", "product_uom_qty:sum"],
-            ["product_id"],
-        )
-    )
-
-    if len(lines) > 50:
-        avg = sum(line["price_subtotal"] for line in lines) / len(lines)
-        return f"Promedio por producto: ${round(avg, 2)}"
+    demand = odoo_manager.env["odoogpt.sale.demand"].sudo()
+    lines = demand._demand_by_product(start_date, end_date, limit=MAX_REPORT_LINES)
+    if not lines:
+        return "No hay pedidos en el periodo"
 
-    return "\n".join(
-        [
-            f"{odoo_manager.env['product.product'].sudo().browse(line['product_id'][0]).name}: "
-            f"{line['product_uom_qty']} unidades, ${line['price_subtotal']}"
-            for line in lines
-        ]
+    result = "\n".join(
+        f"{line['name']}: {line['product_uom_qty']} unidades, ${round(line['price_subtotal'], 2)}"
+        for line in lines
     )
+    total = lines[0]["total"]
+    if total > len(lines):
+        avg = lines[0]["grand_subtotal"] / total
+        result += (
+            f"\n...y {total - len(lines)} productos más. "
+            f"Promedio por producto: ${round(avg, 2)}"
+        )
+    return result
 
 
 def recent_leads(odoo_manager, odoogpt, channel_id):
@@ -797,6 +1157,388 @@ def recent_leads(odoo_manager, odoogpt, channel_id):
     )
 
 
+# ======= AGGREGATE FUNCTIONS =======
+
+
+# Models and fields the aggregate tool may touch, each model behind the
+# odoogpt.tools.* parameter that enables its family of tools
+AGGREGATE_MODELS = {
+    "sale.order": (
+        "odoogpt.tools.orders",
+        {
+            "name",
+            "partner_id",
+            "user_id",
+            "team_id",
+            "company_id",
+            "state",
+            "date_order",
+            "amount_untaxed",
+            "amount_total",
+            "currency_id",
+        },
+    ),
+    "sale.order.line": (
+        "odoogpt.tools.orders",
+        {
+            "order_id",
+            "product_id",
+            "order_partner_id",
+            "salesman_id",
+            "state",
+            "product_uom_qty",
+            "qty_delivered",
+            "qty_invoiced",
+            "price_unit",
+            "price_subtotal",
+            "price_total",
+            "discount",
+            "company_id",
+        },
+    ),
+    "account.move": (
+        "odoogpt.tools.invoices",
+        {
+            "name",
+            "partner_id",
+            "commercial_partner_id",
+            "move_type",
+            "state",
+            "payment_state",
+            "invoice_date",
+            "invoice_date_due",
+            "amount_untaxed",
+            "amount_total",
+            "amount_residual",
+            "amount_total_signed",
+            "amount_residual_signed",
+            "currency_id",
+            "company_id",
+            "invoice_user_id",
+        },
+    ),
+    "res.partner": (
+        "odoogpt.tools.partners",
+        {
+            "name",
+            "is_company",
+            "country_id",
+            "state_id",
+            "city",
+            "user_id",
+            "company_id",
+            "customer_rank",
+            "supplier_rank",
+            "parent_id",
+        },
+    ),
+    "product.product": (
+        "odoogpt.tools.products",
+        {
+            "name",
+            "default_code",
+            "categ_id",
+            "detailed_type",
+            "list_price",
+            "sale_ok",
+            "purchase_ok",
+            "active",
+            "company_id",
+        },
+    ),
+    "stock.quant": (
+        "odoogpt.tools.products",
+        {
+            "product_id",
+            "location_id",
+            "warehouse_id",
+            "quantity",
+            "reserved_quantity",
+            "company_id",
+        },
+    ),
+    "crm.lead": (
+        "odoogpt.tools.leads",
+        {
+            "name",
+            "partner_id",
+            "user_id",
+            "team_id",
+            "stage_id",
+            "type",
+            "expected_revenue",
+            "probability",
+            "create_date",
+            "date_deadline",
+            "company_id",
+        },
+    ),
+}
+AGGREGATE_FUNCTIONS = {"sum", "avg", "min", "max", "count", "count_distinct"}
+AGGREGATE_DATE_GRANULARITY = {"day", "week", "month", "quarter", "year"}
+AGGREGATE_OPERATORS = {
+    "=",
+    "!=",
+    ">",
+    ">=",
+    "<",
+    "<=",
+    "in",
+    "not in",
+    "ilike",
+    "not ilike",
+    "child_of",
+    "=?",
+}
+MAX_AGGREGATE_GROUPS = 200
+
+
+class AggregateError(ValueError):
+    def __init__(self, message, field=None):
+        super().__init__(message)
+        self.field = field
+
+
+def _aggregate_field(model, allowed, path):
+    fname = path.split(".")[0]
+    if fname not in allowed or fname not in model._fields:
+        raise AggregateError(f"Campo no permitido en {model._name}: {fname}", fname)
+    return model._fields[fname]
+
+
+def _aggregate_domain(model, allowed, domain):
+    domain = domain or []
+    if not isinstance(domain, list):
+        raise AggregateError("El dominio debe ser una lista")
+    for leaf in domain:
+        if leaf in ("&", "|", "!"):
+            continue
+        if not isinstance(leaf, (list, tuple)) or len(leaf) != 3:
+            raise AggregateError(f"Condición inválida: {leaf}")
+        if leaf[1] not in AGGREGATE_OPERATORS:
+            raise AggregateError(f"Operador no permitido: {leaf[1]}")
+        # Only the first hop is checked, relational paths stay in the ORM rules
+        if "." in leaf[0]:
+            raise AggregateError(f"No se permiten rutas relacionales: {leaf[0]}")
+        _aggregate_field(model, allowed, leaf[0])
+    return [tuple(leaf) if isinstance(leaf, list) else leaf for leaf in domain]
+
+
+def _aggregate_groupby(model, allowed, groupby):
+    spec = []
+    for group in groupby or []:
+        fname, _sep, granularity = group.partition(":")
+        field = _aggregate_field(model, allowed, fname)
+        if granularity and (
+            field.type not in ("date", "datetime")
+            or granularity not in AGGREGATE_DATE_GRANULARITY
+        ):
+            raise AggregateError(f"Agrupación inválida: {group}")
+        if field.type in ("one2many", "many2many", "text", "binary", "html"):
+            raise AggregateError(f"No se puede agrupar por {fname}")
+        spec.append(group)
+    return spec
+
+
+def _aggregate_measures(model, allowed, measures):
+    spec = []
+    for measure in measures or []:
+        fname, _sep, function = measure.partition(":")
+        function = function or "sum"
+        field = _aggregate_field(model, allowed, fname)
+        if function not in AGGREGATE_FUNCTIONS:
+            raise AggregateError(f"Función no permitida: {function}")
+        if function in ("sum", "avg") and field.type not in (
+            "integer",
+            "float",
+            "monetary",
+        ):
+            raise AggregateError(f"{fname} no es numérico")
+        spec.append(f"{fname}:{function}")
+    return spec
+
+
+def _aggregate_order(order, groupby, measures):
+    if not order:
+        return None
+    allowed = {"__count"} | {g for g in groupby} | {m.split(":")[0] for m in measures}
+    terms = []
+    for term in order.split(","):
+        fname, *direction = term.split()
+        direction = (direction or ["asc"])[0].lower()
+        if fname not in allowed or direction not in ("asc", "desc"):
+            raise AggregateError(f"Orden no permitido: {term.strip()}")
+        terms.append(f"{fname} {direction}")
+    return ", ".join(terms)
+
+
+def _aggregate_cell(value) -> str:
+    if isinstance(value, tuple):
+        return str(value[1])
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    if value is False or value is None:
+        return "-"
+    return str(value)
+
+
+def _schema_suggestions(odoo_manager, model, text, allowed=None) -> list:
+    try:
+        return (
+            odoo_manager.env["odoogpt.table"]
+            .sudo()
+            ._suggest_fields(model, text, allowed)
+        )
+    except Exception as exc:
+        _logger.warning(f"Sin sugerencias de campos para {model}: {exc}")
+        return []
+
+
+def get_schema(odoo_manager, odoogpt, channel_id, question, models=None, limit=None):
+    _logger.info(f"Buscando esquema para: {question}")
+    limit, _offset = _page(limit or DEFAULT_SCHEMA_FIELDS, 0, max_limit=50)
+    schema = (
+        odoo_manager.env["odoogpt.table"]
+        .sudo()
+        ._schema_slice(question, limit=limit, models=set(models or []))
+    )
+    if not schema:
+        return "No hay información de esquema indexada"
+    return json.dumps(schema, ensure_ascii=False)
+
+
+SEMANTIC_SEARCH_MODELS = {
+    "product": ("product.product", "odoogpt.tools.products"),
+    "partner": ("res.partner", "odoogpt.tools.partners"),
+}
+
+
+def semantic_search(odoo_manager, odoogpt, channel_id, model, query, limit=None):
+    _logger.info(f"Búsqueda semántica de {model}: {query}")
+    if model not in SEMANTIC_SEARCH_MODELS:
+        return f"Búsqueda no disponible para {model}"
+    res_model, param = SEMANTIC_SEARCH_MODELS[model]
+    enabled = odoo_manager.env["ir.config_parameter"].sudo().get_param(param, "True")
+    if enabled in ("False", "0", ""):
+        return f"Las herramientas de {model} están deshabilitadas en la configuración"
+
+    send_odoo_msg(channel_id, odoogpt, f"Estoy buscando '{query}' 🔎")
+    limit, _offset = _page(limit or DEFAULT_SEARCH_LIMIT, 0, max_limit=MAX_SEARCH_LIMIT)
+    hits = odoo_manager.env["odoogpt.record.embedding"]._semantic_search(
+        res_model, query, limit
+    )
+    if not hits:
+        return "Sin resultados"
+    return json.dumps(hits, ensure_ascii=False, default=str)
+
+
+# Fields shown with the records of the view the chat was opened from
+VIEW_CONTEXT_FIELDS = [
+    "display_name",
+    "state",
+    "partner_id",
+    "email",
+    "phone",
+    "date_order",
+    "invoice_date",
+    "amount_total",
+    "list_price",
+]
+
+
+def get_view_context(odoo_manager, odoogpt, channel_id, limit=None, offset=0):
+    """Leer los registros de la vista desde la que se abrió el chat"""
+    context = channel_id.view_data or {}
+    model = context.get("model")
+    _logger.info(f"Leyendo el contexto de la vista: {model}")
+    if not model or model not in odoo_manager.env:
+        return "El chat no se abrió desde ninguna vista"
+
+    send_odoo_msg(channel_id, odoogpt, "Estoy leyendo los registros de la vista 👀")
+    limit, offset = _page(limit, offset)
+    Model = odoo_manager.env[model]
+    fnames = [fname for fname in VIEW_CONTEXT_FIELDS if fname in Model._fields]
+    if context.get("active_ids"):
+        ids = context["active_ids"]
+        total = len(ids)
+        rows = Model.search_read([("id", "in", ids[offset : offset + limit])], fnames)
+        header = f"{context['active_count']} registros seleccionados de {model}"
+        if context["active_count"] > total:
+            header += f", se muestran los primeros {total}"
+    elif context.get("domain") is not None:
+        domain = context["domain"]
+        total = Model.search_count(domain)
+        rows = Model.search_read(domain, fnames, limit=limit, offset=offset)
+        header = f"Registros de la vista de {model} con sus filtros"
+    else:
+        return f"Vista de {model} con filtros demasiado largos para leerlos"
+
+    lines = [header + ":"]
+    lines += [json.dumps(row, ensure_ascii=False, default=str) for row in rows]
+    lines.append(_page_footer(rows, total, offset))
+    return "\n".join(lines)
+
+
+def aggregate(
+    odoo_manager,
+    odoogpt,
+    channel_id,
+    model,
+    measures=None,
+    groupby=None,
+    domain=None,
+    order=None,
+    limit=50,
+):
+    _logger.info(f"Agregando {model}: {measures} por {groupby} con {domain}")
+    send_odoo_msg(
+        channel_id, odoogpt, f"Estoy calculando estadísticas sobre {model} 📊"
+    )
+    if model not in AGGREGATE_MODELS or model not in odoo_manager.env:
+        return f"Modelo no disponible para análisis: {model}"
+
+    param, allowed = AGGREGATE_MODELS[model]
+    enabled = odoo_manager.env["ir.config_parameter"].sudo().get_param(param, "True")
+    if enabled in ("False", "0", ""):
+        return f"Las herramientas de {model} están deshabilitadas en la configuración"
+
+    Model = odoo_manager.env[model].sudo()
+    limit, _offset = _page(limit, 0, max_limit=MAX_AGGREGATE_GROUPS)
+    try:
+        domain = _aggregate_domain(Model, allowed, domain)
+        groupby = _aggregate_groupby(Model, allowed, groupby)
+        measures = _aggregate_measures(Model, allowed, measures)
+        orderby = _aggregate_order(order, groupby, measures)
+    except AggregateError as exc:
+        message = f"Consulta no válida: {exc}"
+        if exc.field:
+            suggestions = _schema_suggestions(odoo_manager, model, exc.field, allowed)
+            if suggestions:
+                message += f". Campos parecidos: {', '.join(suggestions)}"
+        return message
+
+    if not groupby:
+        # read_group needs at least one group, use the model count instead
+        groups = Model.read_group(domain, measures, [], lazy=False)
+    else:
+        groups = Model.read_group(
+            domain, measures, groupby, orderby=orderby, limit=limit, lazy=False
+        )
+    if not groups:
+        return "Sin resultados"
+
+    columns = groupby + [m.split(":")[0] for m in measures] + ["__count"]
+    header = " | ".join(groupby + measures + ["registros"])
+    lines = [
+        " | ".join(_aggregate_cell(group.get(column)) for column in columns)
+        for group in groups
+    ]
+    result = header + "\n" + "\n".join(lines)
+    if groupby and len(groups) == limit:
+        result += f"\n...[mostrando los primeros {limit} grupos]"
+    return result
+
+
 # ======= CALENDAR EVENT FUNCTIONS =======
 
 
@@ -812,6 +1554,7 @@ def tool_create_calendar_event(
     location=None,
     allday=False,
     duration=1.0,
+    allow_conflicts=False,
 ):
     """Crear un evento de calendario"""
     _logger.info(f"Creando evento de calendario: {name}")
@@ -827,8 +1570,21 @@ def tool_create_calendar_event(
             location=location,
             allday=allday,
             duration=duration,
+            check_conflicts=not allow_conflicts,
         )
 
+        if result.get("status") == "conflict":
+            lines = [f"⚠️ {result['message']}:"]
+            for event in result["conflicts"]:
+                lines.append(
+                    f"• {event['name']} (ID: {event['id']}) 🕐 {event['start']} - {event['stop']}"
+                )
+            lines.append(
+                "Usa find_free_slots para proponer otro horario "
+                "o allow_conflicts=true para crearlo igualmente"
+            )
+            return "\n".join(lines)
+
         if result.get("status") == "created":
             # Respuesta más concisa para evitar truncamiento
             start_date = result.get("start", "").split(" ")[0]  # Solo la fecha
@@ -856,6 +1612,7 @@ def tool_get_calendar_events(
     partner_id=None,
     search_term=None,
     limit=20,
+    offset=0,
 ):
     """Consultar eventos de calendario"""
     _logger.info("Consultando eventos de calendario")
@@ -864,31 +1621,36 @@ def tool_get_calendar_events(
     try:
         # Si partner_id es 0, no filtrar por partner
         filter_partner_id = partner_id if partner_id and partner_id > 0 else None
+        limit, offset = _page(limit, offset)
 
-        events = odoo_manager.get_calendar_events(
+        page = odoo_manager.env["odoogpt.calendar"]._search_events(
             start_date=start_date,
             end_date=end_date,
             partner_id=filter_partner_id,
             search_term=search_term,
             limit=limit,
+            offset=offset,
+            compact=True,
         )
+        events = page["events"]
 
-        if not events:
+        if not events and not offset:
             return "📅 No se encontraron eventos con los criterios especificados"
 
-        result_lines = [f"📅 Encontrados {len(events)} eventos:"]
+        result_lines = [f"📅 Encontrados {page['total']} eventos:"]
         for event in events:
             attendees_info = (
-                f" (👥 {len(event['attendees'])} asistentes)"
-                if event["attendees"]
+                f" (👥 {event['attendees_count']} asistentes)"
+                if event["attendees_count"]
                 else ""
             )
-            location_info = f" 📍 {event['location']}" if event["location"] else ""
+            location_info = f" 📍 {event['location']}" if event.get("location") else ""
 
             result_lines.append(
-                f"• {event['name']}\n"
+                f"• {event['name']} (ID: {event['id']})\n"
                 f"  🕐 {event['start']} - {event['stop']}{attendees_info}{location_info}"
             )
+        result_lines.append(_page_footer(events, page["total"], offset))
 
         return "\n".join(result_lines)
 
@@ -903,7 +1665,10 @@ def tool_get_upcoming_events(odoo_manager, odoogpt, channel_id, days_ahead=7, li
     send_odoo_msg(channel_id, odoogpt, "Estoy consultando tus eventos próximos 🔮")
 
     try:
-        events = odoo_manager.get_upcoming_events(days_ahead=days_ahead, limit=limit)
+        limit, _offset = _page(limit, 0)
+        events = odoo_manager.env["odoogpt.calendar"]._upcoming_events(
+            days_ahead=days_ahead, limit=limit
+        )
 
         if not events:
             return f"📅 No tienes eventos programados en los próximos {days_ahead} días"
@@ -911,8 +1676,8 @@ def tool_get_upcoming_events(odoo_manager, odoogpt, channel_id, days_ahead=7, li
         result_lines = [f"🔮 Próximos eventos ({len(events)}):"]
         for event in events:
             attendees_str = ", ".join(event["attendees"][:2])
-            if len(event["attendees"]) > 2:
-                attendees_str += f" y {len(event['attendees']) - 2} más"
+            if event["attendees_count"] > 2:
+                attendees_str += f" y {event['attendees_count'] - 2} más"
             attendees_info = f" 👥 {attendees_str}" if attendees_str else ""
 
             result_lines.append(
@@ -927,6 +1692,45 @@ def tool_get_upcoming_events(odoo_manager, odoogpt, channel_id, days_ahead=7, li
         return f"❌ Error al consultar eventos próximos: {str(e)}"
 
 
+def find_free_slots(
+    odoo_manager,
+    odoogpt,
+    channel_id,
+    partner_ids=None,
+    duration=1.0,
+    start_date=None,
+    end_date=None,
+    count=DEFAULT_SLOT_COUNT,
+    working_hours=True,
+):
+    """Buscar huecos libres comunes para una reunión"""
+    _logger.info(f"Buscando huecos de {duration}h para {partner_ids}")
+    send_odoo_msg(channel_id, odoogpt, "Estoy buscando huecos libres en la agenda 🗓️")
+
+    try:
+        attendee_ids = set(partner_ids or []) | {odoo_manager.env.user.partner_id.id}
+        count, _offset = _page(count, 0, max_limit=MAX_SLOT_COUNT)
+        result = odoo_manager.env["odoogpt.calendar"]._find_slots(
+            attendee_ids,
+            duration=float(duration or 1.0),
+            start_date=start_date,
+            end_date=end_date,
+            count=count,
+            working_hours=working_hours,
+        )
+        if not result["slots"]:
+            return "🗓️ No hay huecos libres para todos los asistentes en ese rango"
+
+        lines = [f"🗓️ Huecos libres de {duration}h ({result['tz']}):"]
+        for start, stop in result["slots"]:
+            lines.append(f"• {start:%Y-%m-%d %H:%M} - {stop:%H:%M}")
+        return "\n".join(lines)
+
+    except Exception as e:
+        _logger.error(f"Error en find_free_slots: {str(e)}")
+        return f"❌ Error al buscar huecos libres: {str(e)}"
+
+
 def tool_update_calendar_event(odoo_manager, odoogpt, channel_id, event_id, **kwargs):
     """Actualizar un evento de calendario"""
     _logger.info(f"Actualizando evento de calendario ID: {event_id}")
@@ -1013,8 +1817,56 @@ def tool_get_all_surveys(odoo_manager, odoogpt, channel_id, limit=100, state=Non
         return f"❌ Error al consultar encuestas: {str(e)}"
 
 
+def _format_question_stats(question) -> str:
+    lines = [f"❓ {question['title']} ({question['answered']} respuestas)"]
+    for value, count in question.get("choices", [])[:MAX_REPORT_LINES]:
+        share = count / question["answered"] * 100 if question["answered"] else 0
+        lines.append(f"   • {value}: {count} ({share:.1f}%)")
+    if "numeric" in question:
+        numeric = question["numeric"]
+        lines.append(
+            f"   📊 Media: {numeric['mean']:.2f} | Mediana: {numeric['median']:.2f} | "
+            f"Mín: {numeric['min']:.2f} | Máx: {numeric['max']:.2f}"
+        )
+        for start, end, count in numeric["histogram"]:
+            lines.append(f"   [{start:.2f} - {end:.2f}]: {count}")
+    if "dates" in question:
+        first, last = question["dates"]
+        lines.append(f"   📅 Desde {first} hasta {last}")
+    if "samples" in question:
+        lines.append(
+            f"   📝 {question['text_count']} respuestas de texto, por ejemplo:"
+        )
+        lines.extend(f"     - {sample}" for sample in question["samples"])
+    return "\n".join(lines)
+
+
+def _format_respondent(respondent) -> str:
+    name = (
+        (respondent["partner_id"] and respondent["partner_id"][1])
+        or respondent["email"]
+        or "Usuario Anónimo"
+    )
+    end = respondent["end_datetime"]
+    lines = [
+        f"👤 {name}",
+        f"   📅 Completado: {end.strftime('%Y-%m-%d %H:%M') if end else 'N/A'}",
+    ]
+    for title, value in respondent["answers"]:
+        lines.append(f"     ❓ {title}\n     ✅ {value}")
+    if not respondent["answers"]:
+        lines.append("   📝 Sin respuestas registradas")
+    return "\n".join(lines)
+
+
 def tool_get_survey_results(
-    odoo_manager, odoogpt, channel_id, survey_id, include_answers=False
+    odoo_manager,
+    odoogpt,
+    channel_id,
+    survey_id,
+    include_answers=False,
+    limit=None,
+    offset=0,
 ):
     """Obtener estadísticas y resultados completos de una encuesta específica"""
     _logger.info(f"Consultando resultados de encuesta ID: {survey_id}")
@@ -1027,19 +1879,11 @@ def tool_get_survey_results(
         if not survey.exists():
             return f"❌ No se encontró la encuesta con ID {survey_id}"
 
-        # Obtener todas las respuestas para estadísticas
-        all_user_inputs = (
-            odoo_manager.env["survey.user_input"]
-            .sudo()
-            .search([("survey_id", "=", survey_id)])
-        )
-
-        # Calcular estadísticas generales
-        total_responses = len(all_user_inputs)
-        completed_responses = len(all_user_inputs.filtered(lambda x: x.state == "done"))
-        in_progress_responses = len(
-            all_user_inputs.filtered(lambda x: x.state == "in_progress")
-        )
+        analytics = odoo_manager.env["odoogpt.survey.analytics"]
+        states = analytics._summary(survey_id)
+        total_responses = sum(states.values())
+        completed_responses = states.get("done", 0)
+        in_progress_responses = states.get("in_progress", 0)
         completion_rate = (
             (completed_responses / total_responses * 100) if total_responses > 0 else 0
         )
@@ -1057,87 +1901,23 @@ def tool_get_survey_results(
         result += f"⏱️ Duración promedio: {survey.answer_duration_avg:.1f}h\n\n"
 
         # Si no hay respuestas completadas, terminar aquí
-        completed_user_inputs = all_user_inputs.filtered(lambda x: x.state == "done")
-        if not completed_user_inputs:
+        if not completed_responses:
             result += "📊 No hay respuestas completadas para mostrar detalles."
             return result
 
+        questions = analytics._question_stats(survey_id)
+        result += f"📋 RESULTADOS POR PREGUNTA ({len(questions)}):\n\n"
+        result += "\n\n".join(_format_question_stats(q) for q in questions)
+
         # Si se solicitan respuestas detalladas
         if include_answers:
-            result += "📋 RESPUESTAS DETALLADAS POR USUARIO:\n\n"
-
-            # Obtener preguntas de la encuesta para referencia
-            questions = (
-                odoo_manager.env["survey.question"]
-                .sudo()
-                .search([("survey_id", "=", survey_id)], order="sequence")
+            limit, offset = _page(limit, offset)
+            page = analytics._respondents(survey_id, limit, offset)
+            result += "\n\n📋 RESPUESTAS DETALLADAS POR USUARIO:\n\n"
+            result += ("\n\n" + "=" * 50 + "\n\n").join(
+                _format_respondent(respondent) for respondent in page["respondents"]
             )
-
-            result += f"❓ Total de preguntas: {len(questions)}\n"
-            result += f"👥 Usuarios que completaron: {len(completed_user_inputs)}\n\n"
-
-            # Iterar por cada usuario que completó la encuesta
-            for user_input in completed_user_inputs:
-                # Nombre del usuario
-                user_name = (
-                    user_input.partner_id.name
-                    if user_input.partner_id
-                    else user_input.email or "Usuario Anónimo"
-                )
-
-                result += f"👤 {user_name}\n"
-                result += f"   📅 Completado: {user_input.end_datetime.strftime('%Y-%m-%d %H:%M') if user_input.end_datetime else 'N/A'}\n"
-
-                # Obtener todas las respuestas de este usuario
-                user_answers = (
-                    odoo_manager.env["survey.user_input.line"]
-                    .sudo()
-                    .search(
-                        [("user_input_id", "=", user_input.id)],
-                        order="question_sequence",
-                    )
-                )
-
-                if user_answers:
-                    result += f"   📝 Respuestas ({len(user_answers)}):\n"
-
-                    for answer in user_answers:
-                        # Obtener el título de la pregunta
-                        question_title = (
-                            answer.question_id.title or "Pregunta sin título"
-                        )
-
-                        # Obtener el valor de la respuesta según su tipo
-                        answer_value = ""
-                        if answer.answer_type == "char_box" and answer.value_char_box:
-                            answer_value = answer.value_char_box
-                        elif answer.answer_type == "text_box" and answer.value_text_box:
-                            answer_value = answer.value_text_box
-                        elif (
-                            answer.answer_type == "numerical_box"
-                            and answer.value_numerical_box
-                        ):
-                            answer_value = str(answer.value_numerical_box)
-                        elif answer.answer_type == "date" and answer.value_date:
-                            answer_value = str(answer.value_date)
-                        elif answer.answer_type == "datetime" and answer.value_datetime:
-                            answer_value = str(answer.value_datetime)
-                        elif (
-                            answer.answer_type == "suggestion"
-                            and answer.suggested_answer_id
-                        ):
-                            answer_value = answer.suggested_answer_id.value
-
-                        if answer_value:
-                            result += f"     ❓ {question_title}\n"
-                            result += f"     ✅ {answer_value}\n\n"
-                        else:
-                            result += f"     ❓ {question_title}\n"
-                            result += "     ❌ [Sin respuesta]\n\n"
-                else:
-                    result += "   📝 Sin respuestas registradas\n"
-
-                result += "\n" + "=" * 50 + "\n\n"
+            result += "\n\n" + _page_footer(page["respondents"], page["total"], offset)
 
         return result
 
@@ -1154,6 +1934,7 @@ tools_func = {
     "create_calendar_event": tool_create_calendar_event,
     "get_calendar_events": tool_get_calendar_events,
     "get_upcoming_events": tool_get_upcoming_events,
+    "find_free_slots": find_free_slots,
     "update_calendar_event": tool_update_calendar_event,
     "delete_calendar_event": tool_delete_calendar_event,
     # survey tools
@@ -1169,6 +1950,11 @@ tools_func = {
     "partners_paid_invoices_by_dates": partners_paid_invoices_by_dates,
     # sale orders
     "create_sale_order_by_product_id": tool_create_sale_order_by_product_id,
+    "create_sale_order_multi": tool_create_sale_order_multi,
+    "aggregate": aggregate,
+    "get_schema": get_schema,
+    "semantic_search": semantic_search,
+    "get_view_context": get_view_context,
     "get_sale_order_by_name": tool_get_sale_order_by_name,
     "get_sale_order_by_id": tool_get_sale_order_by_id,
     "orders_by_dates": orders_by_dates,
@@ -1187,7 +1973,55 @@ tools_func = {
     "top_product_by_dates": top_product_by_dates,
     "products_qty_by_dates": products_qty_by_dates,
     "products_highest_margin": products_highest_margin,
+    "product_stock": product_stock,
     # invoices
     "paid_invoices_by_dates": paid_invoices_by_dates,
     "pending_invoices_to_pay_by_dates": pending_invoices_to_pay_by_dates,
 }
+
+# Tools that never write through odoo_manager, they may run on the read replica
+READ_ONLY_TOOLS = {
+    "recent_leads",
+    "get_calendar_events",
+    "get_upcoming_events",
+    "find_free_slots",
+    "get_all_surveys",
+    "get_survey_results",
+    "tool_get_partner_by_id",
+    "get_all_partners",
+    "partners_with_pending_invoices_to_pay",
+    "top_partner_by_invoices_count",
+    "top_partner_by_payments_volume",
+    "partners_paid_invoices_by_dates",
+    "aggregate",
+    "get_schema",
+    "get_view_context",
+    "get_sale_order_by_name",
+    "get_sale_order_by_id",
+    "orders_by_dates",
+    "canceled_orders_by_dates",
+    "orders_by_user_name",
+    "orders_by_user_id",
+    "orders_by_user_email",
+    "orders_by_user_phone",
+    "orders_by_product_id",
+    "pending_orders_to_send",
+    "get_all_products",
+    "get_products_by_category_id",
+    "get_all_categories",
+    "products_low_stock",
+    "top_product_by_dates",
+    "products_qty_by_dates",
+    "products_highest_margin",
+    "product_stock",
+    "paid_invoices_by_dates",
+    "pending_invoices_to_pay_by_dates",
+}
+tools_func = {
+    name: (
+        on_replica(with_budget(name, func))
+        if name in READ_ONLY_TOOLS
+        else with_budget(name, func)
+    )
+    for name, func in tools_func.items()
+}
@@ -1,6 +1,5 @@
 import logging
 import os
-import re
 import smtplib
 from abc import ABC, abstractmethod
 from datetime import datetime
@@ -47,6 +46,24 @@ def format_phone_number(phone_number: str) -> str | None:
     return None
 
 
+def normalize_phone(phone_number: str | None) -> str | None:
+    """Return the E.164 form of a phone number ("+34612345678") or None."""
+    if not phone_number:
+        return None
+    phone_number = phone_number.strip()
+    if not phone_number.startswith("+"):
+        phone_number = f"+34 {phone_number}"
+
+    try:
+        parsed_phone = phonenumbers.parse(phone_number, None)
+    except Exception:
+        return None
+
+    if not phonenumbers.is_valid_number(parsed_phone):
+        return None
+    return phonenumbers.format_number(parsed_phone, phonenumbers.PhoneNumberFormat.E164)
+
+
 def resume_chat(chat: list[dict], html_format: bool = True):
     _logger.debug("Resumiendo chat...")
     msg_base = """A continuación te paso una conversación entre un cliente y un asistente virtual. Necesito que resumas la conversación para que quede bien definida la intencion del cliente y se destaquen: el servicio que desea el cliente, los precios ofrecidos por el asistente, nombre del cliente y empresa a la que pertenece (si aparece)"""
@@ -147,11 +164,18 @@ class Domain(ABC):
 
 
 class UserName(Domain):
-    def __init__(self, name):
+    def __init__(self, name, env=None):
         self.name = name
+        self.env = env
 
     def get_domain(self):
-        return [("name", "ilike", self.name)]
+        if self.env is None:
+            return [("name", "ilike", self.name)]
+        # Búsqueda tolerante a erratas, se queda con el contacto más parecido
+        ranked_ids = (
+            self.env["odoogpt.name.search"].sudo()._search_ids("res.partner", self.name, limit=1)
+        )
+        return [("id", "in", ranked_ids)]
 
 
 class UserEmail(Domain):
@@ -165,76 +189,17 @@ class UserEmail(Domain):
 class UserPhone(Domain):
     def __init__(self, phone: str):
         self.original_phone = phone
-        if phone.startswith("+"):
-            self.parsed_phone = self._parse_phone(phone)
-        else:
-            self.parsed_phone = self._parse_phone(f"+34 {phone}")
-
-    def _parse_phone(self, phone):
-        try:
-            return phonenumbers.parse(phone, None)
-        except Exception:
-            return None
-
-    def _is_valid_phone(self):
-        return self.parsed_phone and phonenumbers.is_valid_number(self.parsed_phone)
+        self.e164 = normalize_phone(phone)
 
     def get_domain(self):
-        formats = []
-
-        # Agregar el formato original
-        formats.append(self.original_phone)
-
-        if self._is_valid_phone():
-            # Formato internacional completo con prefijo y sin espacios
-            intl_format = phonenumbers.format_number(
-                self.parsed_phone,  # type: ignore
-                phonenumbers.PhoneNumberFormat.E164,  # type: ignore
-            )
-            formats.append(intl_format)
-
-            # Formato internacional con espacios
-            intl_spaced = phonenumbers.format_number(
-                self.parsed_phone,  # type: ignore
-                phonenumbers.PhoneNumberFormat.INTERNATIONAL,  # type: ignore
-            )
-            formats.append(intl_spaced)
-
-            # Solo el número nacional (sin prefijo)
-            national_format = phonenumbers.format_number(
-                self.parsed_phone,  # type: ignore
-                phonenumbers.PhoneNumberFormat.NATIONAL,  # type: ignore
-            )
-            formats.append(national_format)
-
-            # Número nacional sin espacios ni caracteres especiales
-            national_clean = re.sub(r"\D", "", national_format)
-            formats.append(national_clean)
-
-            # Variaciones con diferentes separadores
-            formats.append(national_format.replace(" ", "-"))
-            formats.append(national_format.replace(" ", "."))
-            formats.append(national_format.replace(" ", ""))
-        else:
+        if not self.e164:
             _logger.warning(
-                f"El número de teléfono {self.original_phone} no es válido. No se generarán formatos adicionales."
+                f"El número de teléfono {self.original_phone} no es válido. Se buscará tal cual."
             )
+            return ["|", ("phone", "=", self.original_phone), ("mobile", "=", self.original_phone)]
 
-        # Eliminar duplicados y valores None/empty
-        unique_formats = list(set([f for f in formats if f]))
-        _logger.info(f"Phone formats: {unique_formats}")
-        if not unique_formats:
-            return []
-
-        # Construir dominio con ORs: ['|', '|', ('phone','=','val1'), ('phone','=','val2'), ...]
-        domain = []
-        for i, phone_format in enumerate(unique_formats):
-            if i > 0:
-                domain.insert(0, "|")
-            domain.append(("phone", "=", phone_format))
-            domain.insert(0, "|")
-            domain.append(("mobile", "=", phone_format))
-
+        # phone_e164 y mobile_e164 están indexados en res.partner
+        domain = ["|", ("phone_e164", "=", self.e164), ("mobile_e164", "=", self.e164)]
         _logger.info(f"Domain: {domain}")
         return domain
 
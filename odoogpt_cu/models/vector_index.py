@@ -0,0 +1,118 @@
+"""In-process vector index for the assistant retrievers.
+
+A few hundred to a few thousand vectors fit in one contiguous float32 matrix,
+rows normalized once so cosine similarity is a plain matrix product and the
+top-k of a batch of queries comes from ``argpartition``. Vectors can be
+quantized to int8 (one scale per row) to cut memory by four, and an index is
+persisted in the filestore as ``.npy`` files that are memory-mapped on load,
+so every worker shares the same pages instead of holding its own copy.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from odoo.tools import config  # type: ignore
+
+INDEX_DIR = "odoogpt_vectors"
+
+
+def normalize(matrix):
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def index_path(dbname, name) -> str:
+    return os.path.join(config.filestore(dbname), INDEX_DIR, name)
+
+
+class VectorIndex:
+    """Exact cosine top-k over a normalized matrix, optionally int8 quantized."""
+
+    def __init__(self, keys, matrix, quantize=False, stamp=None, _normalized=False):
+        self.keys = list(keys)
+        self.stamp = stamp
+        if not _normalized:
+            matrix = normalize(matrix)
+        self.scales = None
+        if quantize and len(self.keys):
+            scales = np.abs(matrix).max(axis=1) / 127
+            scales[scales == 0] = 1
+            self.scales = scales.astype(np.float32)
+            matrix = np.round(matrix / self.scales[:, None]).astype(np.int8)
+        self.matrix = matrix
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def dimension(self):
+        return self.matrix.shape[1] if len(self.keys) else 0
+
+    def scores(self, queries):
+        """Cosine similarity of each query (rows) against every vector."""
+        queries = normalize(queries)
+        if self.scales is None:
+            return queries @ self.matrix.T
+        return (queries @ self.matrix.T.astype(np.float32)) * self.scales
+
+    def search(self, queries, k=5):
+        """Return, per query, the ``[(key, score)]`` of its ``k`` nearest vectors."""
+        queries = np.asarray(queries, dtype=np.float32)
+        single = queries.ndim == 1
+        if not len(self.keys):
+            return [] if single else [[] for __ in range(len(queries))]
+        scores = self.scores(queries)
+        k = min(k, len(self.keys))
+        # Partial selection of the k best per row, then sort only those
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        results = [
+            [(self.keys[i], float(score)) for i, score in zip(row, row_scores)]
+            for row, row_scores in zip(top, top_scores)
+        ]
+        return results[0] if single else results
+
+    def save(self, path):
+        """Write the index to the ``path`` directory, replacing it atomically."""
+        parent = os.path.dirname(path)
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+        np.save(os.path.join(tmp, "matrix.npy"), self.matrix)
+        if self.scales is not None:
+            np.save(os.path.join(tmp, "scales.npy"), self.scales)
+        with open(os.path.join(tmp, "meta.json"), "w") as meta:
+            json.dump({"keys": self.keys, "stamp": self.stamp}, meta)
+        old = None
+        if os.path.isdir(path):
+            old = tempfile.mkdtemp(dir=parent, prefix=".old-")
+            os.rename(path, os.path.join(old, "index"))
+        os.rename(tmp, path)
+        if old:
+            shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, stamp=None):
+        """Memory-map the index saved in ``path``, None when missing or stale."""
+        try:
+            with open(os.path.join(path, "meta.json")) as meta:
+                meta = json.load(meta)
+            if stamp is not None and meta["stamp"] != stamp:
+                return None
+            matrix = np.load(os.path.join(path, "matrix.npy"), mmap_mode="r")
+            scales_path = os.path.join(path, "scales.npy")
+            scales = np.load(scales_path) if os.path.exists(scales_path) else None
+        except (OSError, ValueError, KeyError):
+            return None
+        index = cls(meta["keys"], matrix, stamp=meta["stamp"], _normalized=True)
+        index.scales = scales
+        return index
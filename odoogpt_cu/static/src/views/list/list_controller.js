@@ -4,17 +4,28 @@ import { ListController } from "@web/views/list/list_controller";
 import { patch } from "@web/core/utils/patch";
 const { Component } = owl;
 
+const MAX_CONTEXT_IDS = 50;
+
 patch(ListController.prototype, {
     onSelectDesoftBot(ev) {
         ev.preventDefault();
         ev.stopPropagation();
 
         const rpc = this.env.services.rpc;
+        const root = this.model.root;
+        // Compact descriptor, the bot reads the records only when it needs them
+        const context = {
+            model: this.props.resModel,
+            view_type: 'list',
+            active_ids: root.selection.slice(0, MAX_CONTEXT_IDS).map((record) => record.resId),
+            active_count: root.isDomainSelected ? root.count : root.selection.length,
+            domain: root.domain,
+        };
 
         rpc('/web/dataset/call_kw', {
             model: 'res.partner',
-            method: 'open_desoft_bot',
-            args: [[], this.model.rootParams],
+            method: 'open_odoogpt',
+            args: [[], context],
             kwargs: {},
         }).then(async (res) => {
             await this._openChat({ userId: res });  // ✅ Usar _openChat
@@ -0,0 +1,9 @@
+from . import test_tools
+from . import test_res_partner
+from . import test_odoogpt_table
+from . import test_ir_ui_view
+from . import test_receivable_snapshot
+from . import test_replica
+from . import test_tool_budget
+from . import test_sale_demand
+from . import test_spreadsheet_profile
@@ -0,0 +1,91 @@
+import logging
+import time
+
+from odoo.addons.odoogpt.models import ir_ui_view
+from odoo.tests import TransactionCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+BENCH_LOADS = 200
+
+
+class ViewModelCase(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.env["res.users"].create(
+            {"name": "Usuario vistas", "login": "odoogpt_views"}
+        )
+        cls.views = [
+            cls.env["ir.ui.view"].search([("model", "=", model)], limit=1)
+            for model in ("res.partner", "product.template", "sale.order")
+        ]
+
+    def _stored_model(self):
+        self.env.flush_all()
+        self.env.cr.execute(
+            "SELECT last_view_model FROM res_users WHERE id = %s", [self.user.id]
+        )
+        return self.env.cr.fetchone()[0]
+
+
+@tagged("post_install", "-at_install")
+class TestViewModelTracking(ViewModelCase):
+    def test_view_load_does_not_write(self):
+        for view in self.views:
+            view.with_user(self.user)._get_combined_arch()
+        self.assertIsNone(self._stored_model())
+        key = (self.env.cr.dbname, self.user.id)
+        self.assertEqual(ir_ui_view._seen[key], "sale.order")
+
+    def test_flush_on_open_chat(self):
+        self.views[0].with_user(self.user)._get_combined_arch()
+        ir_ui_view.flush_view_models(self.env)
+        self.assertEqual(self._stored_model(), "res.partner")
+        self.assertEqual(self.user.last_view_model, "res.partner")
+
+    def test_flushed_models_are_kept_until_commit(self):
+        key = (self.env.cr.dbname, self.user.id)
+        self.views[0].with_user(self.user)._get_combined_arch()
+        ir_ui_view.flush_view_models(self.env)
+        # A rollback of the chat transaction must not lose the model
+        self.assertEqual(ir_ui_view._pending[key], "res.partner")
+
+        self.views[1].with_user(self.user)._get_combined_arch()
+        self.env.cr.postcommit.run()
+        # Seen after the flush, still to persist
+        self.assertEqual(ir_ui_view._pending[key], "product.template")
+
+        ir_ui_view.flush_view_models(self.env)
+        self.env.cr.postcommit.run()
+        self.assertNotIn(key, ir_ui_view._pending)
+        self.assertEqual(self._stored_model(), "product.template")
+
+
+@tagged("-standard", "odoogpt_bench")
+class BenchViewModelTracking(ViewModelCase):
+    """View-load latency with the former per-load write and the in-memory map.
+
+    Run with ``--test-tags odoogpt_bench``.
+    """
+
+    def _bench(self, load):
+        start = time.perf_counter()
+        for i in range(BENCH_LOADS):
+            load(self.views[i % len(self.views)].with_user(self.user))
+        return (time.perf_counter() - start) / BENCH_LOADS * 1000
+
+    def test_bench_view_load(self):
+        def load_with_write(view):
+            view._get_combined_arch()
+            if view.env.user.last_view_model != view.model:
+                view.env.user.sudo().last_view_model = view.model
+                view.env.flush_all()
+
+        # Warm the view caches so both runs only differ by the tracking
+        self._bench(lambda view: view._get_combined_arch())
+        before = self._bench(load_with_write)
+        after = self._bench(lambda view: view._get_combined_arch())
+        _logger.info(
+            f"Carga de vista: {before:.3f} ms con escritura, {after:.3f} ms en memoria"
+        )
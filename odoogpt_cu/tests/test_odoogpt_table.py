@@ -0,0 +1,166 @@
+from unittest.mock import patch
+
+import numpy as np
+from odoo.tests import BaseCase, TransactionCase, tagged
+
+from ..models.embeddings import HashingEmbedder
+from ..models.vector_index import VectorIndex
+
+
+class RecordingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__(dimension=32)
+        self.name = "test"
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+        return super().embed(texts)
+
+
+@tagged("post_install", "-at_install")
+class TestTableEmbeddings(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.store = self.env["odoogpt.table.embedding"]
+        self.embedder = RecordingEmbedder()
+
+    def test_only_changed_descriptions_are_embedded(self):
+        documents = {"sale_order": "pedidos", "res_partner": "contactos"}
+        self.assertEqual(self.store._sync(documents, embedder=self.embedder), 2)
+        self.assertEqual(self.store._sync(documents, embedder=self.embedder), 0)
+
+        documents["sale_order"] = "pedidos de venta"
+        self.assertEqual(self.store._sync(documents, embedder=self.embedder), 1)
+        self.assertEqual(self.embedder.embedded[-1], "pedidos de venta")
+
+        del documents["res_partner"]
+        self.store._sync(documents, embedder=self.embedder)
+        keys, __, matrix = self.store._load("field", "test")
+        self.assertEqual(keys, ["sale_order"])
+        self.assertEqual(matrix.shape, (1, 32))
+
+    def test_edits_trigger_the_cron_without_embedding(self):
+        cron = self.env.ref("odoogpt.cron_sync_table_embeddings")
+        Table = self.env["odoogpt.table"]
+        with patch.object(
+            type(Table), "_sync_embeddings", side_effect=AssertionError("inline")
+        ), patch.object(type(cron), "_trigger") as trigger:
+            if hasattr(Table, "with_delay"):
+                self.skipTest("queue_job embeds in a job")
+            Table.create({"name": "sale_order", "description": "Pedidos"})
+        trigger.assert_called()
+
+    def test_registry_load_skips_unchanged_schema(self):
+        Table = self.env["odoogpt.table"]
+        self.env["ir.config_parameter"].set_param(
+            "odoogpt.schema_embeddings_stamp", Table._schema_stamp()
+        )
+        with patch.object(
+            type(Table), "_schema_documents", side_effect=AssertionError("rebuilt")
+        ):
+            Table._register_hook()
+
+        self.env["ir.config_parameter"].set_param(
+            "odoogpt.schema_embeddings_stamp", "before the upgrade"
+        )
+        with patch.object(
+            type(Table), "_schema_documents", return_value={"field": {}}
+        ) as documents:
+            Table._register_hook()
+        documents.assert_called_once()
+
+    def test_table_override_describes_its_fields(self):
+        self.env["odoogpt.table"].create(
+            {"name": "sale_order", "description": "Pedidos de venta confirmados"}
+        )
+        documents = self.env["odoogpt.table"]._field_documents()
+        self.assertIn(
+            '"model_description": "Pedidos de venta confirmados"',
+            documents["sale.order:amount_total"],
+        )
+
+    def test_field_documents(self):
+        documents = self.env["odoogpt.table"]._field_documents()
+        self.assertIn("sale.order:amount_total", documents)
+        self.assertNotIn("sale.order:message_ids", documents)
+        self.assertNotIn("sale.order:write_date", documents)
+        self.assertIn('"type": "monetary"', documents["sale.order:amount_total"])
+
+        self.store._sync(documents, "field", self.embedder)
+        keys = self.store._load("field", self.embedder.name)[0]
+        self.assertEqual(set(keys), set(documents))
+
+    def test_cache_dedupes_texts(self):
+        cache = self.env["odoogpt.embedding.cache"]
+        vectors = cache._embed(["silla", "mesa", "silla"], self.embedder)
+        self.assertEqual(self.embedder.embedded, ["silla", "mesa"])
+        self.assertEqual(vectors.tolist()[0], vectors.tolist()[2])
+
+        again = cache._embed(["mesa", "silla  "], self.embedder)
+        self.assertEqual(len(self.embedder.embedded), 2)
+        self.assertEqual(again.tolist(), vectors[[1, 0]].tolist())
+
+
+@tagged("post_install", "-at_install")
+class TestVectorIndex(BaseCase):
+    def setUp(self):
+        super().setUp()
+        self.matrix = np.random.default_rng(0).normal(size=(200, 16))
+        self.keys = [f"tabla_{i}" for i in range(200)]
+
+    def test_nearest_vectors_are_ranked(self):
+        index = VectorIndex(self.keys, self.matrix)
+        hits = index.search(self.matrix[[4, 9]] * 3, k=3)
+        self.assertEqual([row[0][0] for row in hits], ["tabla_4", "tabla_9"])
+        self.assertAlmostEqual(hits[0][0][1], 1.0, places=5)
+        self.assertGreaterEqual(hits[0][1][1], hits[0][2][1])
+
+    def test_quantized_index_keeps_ranking(self):
+        exact = VectorIndex(self.keys, self.matrix)
+        quantized = VectorIndex(self.keys, self.matrix, quantize=True)
+        self.assertEqual(quantized.matrix.dtype, np.int8)
+        for row in (1, 50, 199):
+            self.assertEqual(
+                quantized.search(self.matrix[row], k=1)[0][0],
+                exact.search(self.matrix[row], k=1)[0][0],
+            )
+
+
+@tagged("post_install", "-at_install")
+class TestSemanticSearch(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.chair = cls.env["product.product"].create(
+            {"name": "Silla ergonómica azul", "default_code": "SIL-AZ"}
+        )
+        cls.table = cls.env["product.product"].create({"name": "Mesa de roble"})
+        cls.bakery = cls.env["res.partner"].create(
+            {"name": "Panadería La Espiga", "city": "Valencia"}
+        )
+
+    def setUp(self):
+        super().setUp()
+        embedder = HashingEmbedder()
+        patcher = patch(
+            "odoo.addons.odoogpt.models.record_index.get_embedder",
+            return_value=embedder,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.index = self.env["odoogpt.record.embedding"]
+        # Demo data may leave more rows pending than a search embeds inline
+        self.index._embed_pending(limit=100000)
+
+    def test_search_ranks_described_record_first(self):
+        hits = self.index._semantic_search("product.product", "silla ergonomica", 3)
+        self.assertEqual(hits[0]["id"], self.chair.id)
+        hits = self.index._semantic_search("res.partner", "panaderia de valencia", 3)
+        self.assertEqual(hits[0]["id"], self.bakery.id)
+
+    def test_write_reembeds_record(self):
+        self.index._semantic_search("product.product", "silla", 1)
+        self.table.name = "Silla plegable verde"
+        hits = self.index._semantic_search("product.product", "silla plegable", 1)
+        self.assertEqual(hits[0]["id"], self.table.id)
@@ -0,0 +1,85 @@
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.addons.odoogpt.models.snapshot_mixin import OdooGPTSnapshotMixin
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestSnapshotContract(TransactionCase):
+    def test_snapshots_implement_the_hooks(self):
+        snapshots = self.env["odoogpt.snapshot.mixin"]._inherit_children
+        self.assertIn("odoogpt.receivable", snapshots)
+        self.assertIn("odoogpt.sale.demand", snapshots)
+        for name in snapshots:
+            model_class = type(self.env[name])
+            for hook in ("_refresh_buckets", "_backfill"):
+                self.assertIsNot(
+                    getattr(model_class, hook),
+                    getattr(OdooGPTSnapshotMixin, hook),
+                    f"{name} does not implement {hook}",
+                )
+
+
+@tagged("post_install", "-at_install")
+class TestReceivableSnapshot(AccountTestInvoicingCommon):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.snapshot = cls.env["odoogpt.receivable"]
+        cls.foreign = cls.currency_data["currency"]
+
+    def _pay(self, invoice):
+        self.env["account.payment.register"].with_context(
+            active_model="account.move", active_ids=invoice.ids
+        ).create({"payment_date": invoice.invoice_date})._create_payments()
+
+    def _bucket(self, partner):
+        self.snapshot._refresh_dirty()
+        return self.snapshot.search([("partner_id", "=", partner.id)])
+
+    def test_hooks_refresh_the_bucket(self):
+        invoice = self.init_invoice(
+            "out_invoice", self.partner_a, "2017-01-01", amounts=[100], post=True
+        )
+        bucket = self._bucket(self.partner_a)
+        self.assertEqual(bucket.invoice_count, 1)
+        self.assertEqual(bucket.paid_count, 0)
+        self.assertAlmostEqual(bucket.amount_residual, invoice.amount_residual)
+
+        self._pay(invoice)
+        bucket = self._bucket(self.partner_a)
+        self.assertEqual(bucket.paid_count, 1)
+        self.assertAlmostEqual(bucket.paid_amount, invoice.amount_total)
+        self.assertAlmostEqual(bucket.paid_amount_company, invoice.amount_total_signed)
+        self.assertAlmostEqual(bucket.amount_residual, 0)
+
+        invoice.button_draft()
+        self.assertFalse(self._bucket(self.partner_a))
+
+    def test_ranking_uses_company_currency(self):
+        # 1000 in the foreign currency are worth 500 in company currency
+        local = self.init_invoice(
+            "out_invoice", self.partner_a, "2017-01-01", amounts=[600], post=True
+        )
+        foreign = self.init_invoice(
+            "out_invoice",
+            self.partner_b,
+            "2017-01-01",
+            amounts=[1000],
+            currency=self.foreign,
+            post=True,
+        )
+        self._pay(local)
+        self._pay(foreign)
+
+        rows = self.snapshot._partner_ranking(
+            "paid_amount", "2017-01-01", "2017-01-01", by_currency=True
+        )
+        self.assertEqual(
+            [row["partner_id"] for row in rows], [self.partner_a.id, self.partner_b.id]
+        )
+        self.assertAlmostEqual(rows[1]["value"], foreign.amount_total_signed)
+        self.assertEqual(rows[1]["amounts"][0]["currency"], self.foreign.name)
+        self.assertAlmostEqual(
+            rows[0]["grand_total"],
+            local.amount_total_signed + foreign.amount_total_signed,
+        )
@@ -0,0 +1,104 @@
+from unittest.mock import patch
+
+from odoo.addons.odoogpt.models import tools
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestPartnerPhoneLookup(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.manager = cls.env["mail.message"]
+        cls.partner = cls.env["res.partner"].create(
+            {"name": "Cliente móvil", "mobile": "612 34 56 78"}
+        )
+
+    def test_phone_is_normalized(self):
+        self.assertEqual(self.partner.mobile_e164, "+34612345678")
+        self.partner.phone = "+34 912-34-56-78"
+        self.assertEqual(self.partner.phone_e164, "+34912345678")
+
+    def test_lookup_matches_any_format(self):
+        for phone in ("612345678", "+34 612 34 56 78", "+34612345678", "612-34-56-78"):
+            partners = self.manager.get_partner_by_phone(phone)
+            self.assertEqual([p["id"] for p in partners], [self.partner.id], phone)
+
+    def test_name_with_other_criteria(self):
+        partners = self.manager.get_partner(
+            partner_id=self.partner.id, name="Cliente móvil"
+        )
+        self.assertEqual([p["id"] for p in partners], [self.partner.id])
+
+    def test_name_lookup_tolerates_typos(self):
+        partner = self.env["res.partner"].create({"name": "Talleres Gonzalo Rodriguez"})
+        partners = self.manager.get_partner_by_name("talleres gonzalo rodrigez")
+        self.assertEqual(partners[0]["id"], partner.id)
+
+    def test_backfill_runs_in_cron_batches(self):
+        if hasattr(self.env["res.partner"], "with_delay"):
+            self.skipTest("queue_job normalizes in jobs")
+        partners = self.env["res.partner"].create(
+            [{"name": f"Backfill {i}", "mobile": f"61234567{i}"} for i in range(3)]
+        )
+        self.env.flush_all()
+        self.env.cr.execute(
+            "UPDATE res_partner SET mobile_e164 = NULL WHERE id IN %s",
+            [tuple(partners.ids)],
+        )
+        partners.invalidate_recordset()
+        Partner = type(self.env["res.partner"])
+        cron = self.env.ref("odoogpt.cron_normalize_phones")
+        with patch.object(
+            Partner, "_normalize_phones", side_effect=AssertionError("inline")
+        ), patch.object(type(cron), "_trigger") as trigger:
+            self.env["res.partner"]._backfill_phone_e164()
+        trigger.assert_called_once()
+
+        with patch.object(type(cron), "_trigger") as trigger:
+            runs = 0
+            while self.env["res.partner"]._normalize_pending_phones(limit=2):
+                runs += 1
+        # Three partners at two per run: the first run reschedules the cron
+        self.assertGreaterEqual(runs, 2)
+        trigger.assert_called()
+        self.assertEqual(
+            partners.mapped("mobile_e164"),
+            ["+34612345670", "+34612345671", "+34612345672"],
+        )
+        self.assertEqual(self.env["res.partner"]._normalize_pending_phones(), 0)
+
+
+@tagged("post_install", "-at_install")
+class TestOpenOdooGPT(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partners = cls.env["res.partner"].create(
+            [{"name": "Contexto Uno"}, {"name": "Contexto Dos"}]
+        )
+        cls.params = {
+            "model": "res.partner",
+            "view_type": "list",
+            "active_ids": cls.partners.ids,
+            "domain": [("name", "ilike", "Contexto")],
+        }
+
+    def test_descriptor_is_written_once(self):
+        self.env["res.partner"].open_odoogpt(self.params)
+        channel = self.env.user.partner_id.odoogpt_channel_id
+        self.assertEqual(channel.view_data["active_ids"], self.partners.ids)
+        self.assertEqual(channel.view_data["active_count"], 2)
+        with patch.object(
+            type(channel), "write", side_effect=AssertionError("unexpected write")
+        ):
+            self.env["res.partner"].open_odoogpt(dict(self.params))
+
+    def test_bot_fetches_the_selection(self):
+        self.env["res.partner"].open_odoogpt(self.params)
+        channel = self.env.user.partner_id.odoogpt_channel_id
+        self.assertIn("res.partner", channel._view_context_hint())
+        with patch.object(tools, "send_odoo_msg"):
+            result = tools.get_view_context(self.env["mail.message"], None, channel)
+        self.assertIn("Contexto Uno", result)
+        self.assertIn("Contexto Dos", result)
@@ -0,0 +1,93 @@
+from odoo import SUPERUSER_ID, api, sql_db
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import mute_logger
+from psycopg2 import errors
+
+
+@tagged("post_install", "-at_install")
+class TestSaleDemandConcurrency(TransactionCase):
+    """Buckets refreshed by two transactions at once, on their own cursors."""
+
+    def _cursor(self):
+        cr = sql_db.db_connect(self.env.cr.dbname).cursor()
+        self.addCleanup(cr.close)
+        # A lock wait would block the test forever, fail fast instead
+        cr.execute("SET lock_timeout = '5s'")
+        return cr
+
+    def _demand(self, cr):
+        return api.Environment(cr, SUPERUSER_ID, {})["odoogpt.sale.demand"]
+
+    def _create_order(self):
+        with sql_db.db_connect(self.env.cr.dbname).cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            partner = env["res.partner"].create({"name": "Cliente concurrente"})
+            product = env["product.product"].create({"name": "Mesa concurrente"})
+            order = env["sale.order"].create(
+                {
+                    "partner_id": partner.id,
+                    "order_line": [
+                        (0, 0, {"product_id": product.id, "product_uom_qty": 3})
+                    ],
+                }
+            )
+            order.action_confirm()
+            key = (product.id, order.company_id.id, order.date_order.date())
+            cr.commit()
+            # Start from a bucket that does not exist yet, as for a first order
+            cr.execute(
+                "DELETE FROM odoogpt_sale_demand WHERE product_id = %s", [product.id]
+            )
+            cr.commit()
+        self.addCleanup(self._delete_order, order.id)
+        return key
+
+    def _delete_order(self, order_id):
+        with sql_db.db_connect(self.env.cr.dbname).cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            order = env["sale.order"].browse(order_id)
+            partner, product = order.partner_id, order.order_line.product_id
+            order._action_cancel()
+            order.unlink()
+            product.product_tmpl_id.unlink()
+            partner.unlink()
+
+    def test_concurrent_new_bucket_is_retryable(self):
+        key = self._create_order()
+        first, second = self._cursor(), self._cursor()
+        for cr in (first, second):
+            # Take both snapshots before either transaction commits
+            cr.execute("SELECT COUNT(*) FROM odoogpt_sale_demand")
+
+        self._demand(first)._refresh_buckets({key})
+        first.commit()
+        # Odoo retries serialization failures, a unique violation would fail
+        # the sale confirmation
+        with self.assertRaises(errors.SerializationFailure), mute_logger("odoo.sql_db"):
+            self._demand(second)._refresh_buckets({key})
+        second.rollback()
+
+        first.execute(
+            """
+            SELECT product_uom_qty, order_count FROM odoogpt_sale_demand
+            WHERE product_id = %s AND company_id = %s AND day = %s
+            """,
+            list(key),
+        )
+        self.assertEqual(first.fetchall(), [(3.0, 1)])
+
+    def test_emptied_bucket_is_deleted(self):
+        key = self._create_order()
+        cr = self._cursor()
+        demand = self._demand(cr)
+        demand._refresh_buckets({key})
+        self.assertEqual(demand.search_count([("product_id", "=", key[0])]), 1)
+
+        cr.execute(
+            "UPDATE sale_order SET state = 'cancel' WHERE id IN "
+            "(SELECT order_id FROM sale_order_line WHERE product_id = %s)",
+            [key[0]],
+        )
+        demand._refresh_buckets({key})
+        self.assertEqual(demand.search_count([("product_id", "=", key[0])]), 0)
+        cr.rollback()
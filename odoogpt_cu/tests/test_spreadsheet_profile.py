@@ -0,0 +1,29 @@
+from io import BytesIO
+
+from odoo.tests import BaseCase, tagged
+
+from ..models.attachment_extractors import extract_csv
+from ..models.spreadsheet_profile import profile_rows
+
+
+@tagged("post_install", "-at_install")
+class TestSpreadsheetProfile(BaseCase):
+    def test_sample_rows_are_sheet_rows(self):
+        rows = [("Producto", "Cantidad"), ("Silla", 2), (None, None), ("Mesa", 1)]
+        rendered = profile_rows("Hoja1", rows).render()
+        self.assertIn("fila 2: Silla | 2", rendered)
+        self.assertIn("fila 4: Mesa | 1", rendered)
+
+    def test_rows_without_header(self):
+        rendered = profile_rows("Hoja1", [(1, 2), (3, 4)]).render()
+        self.assertIn("sin cabecera", rendered)
+        self.assertIn("fila 1: 1 | 2", rendered)
+
+    def test_csv_stops_at_the_character_budget(self):
+        data = "producto;cantidad\n" + "".join(
+            f"Producto {i};{i}\n" for i in range(10000)
+        )
+        rendered = extract_csv(BytesIO(data.encode()), max_chars=3000)
+        profiled = int(rendered.split(": ", 1)[1].split(" filas")[0])
+        self.assertLess(profiled, 300)
+        self.assertIn(f"perfil calculado sobre las primeras {profiled} filas", rendered)
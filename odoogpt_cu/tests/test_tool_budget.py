@@ -0,0 +1,172 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from odoo import sql_db
+from odoo.addons.odoogpt.models import mail_message, replica, tool_budget
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestToolBudget(TransactionCase):
+    def _rename_and_sleep(self, odoo_manager, odoogpt, channel_id, partner, seconds):
+        odoo_manager.env.cr.execute(
+            "UPDATE res_partner SET name = 'Renombrado' WHERE id = %s", [partner.id]
+        )
+        odoo_manager.env.cr.execute("SELECT pg_sleep(%s)", [seconds])
+        return "ok"
+
+    def _call(self, tool, partner, seconds):
+        return tool(
+            odoo_manager=self.env["mail.message"],
+            odoogpt=None,
+            channel_id=None,
+            partner=partner,
+            seconds=seconds,
+        )
+
+    def _current_timeout(self):
+        self.env.cr.execute("SELECT current_setting('statement_timeout')")
+        return self.env.cr.fetchone()[0]
+
+    def test_timeout_rolls_back_the_savepoint(self):
+        partner = self.env["res.partner"].create({"name": "Original"})
+        self.env.flush_all()
+        with patch.dict(tool_budget.TOOL_TIMEOUTS, {"slow_tool": 0.1}):
+            tool = tool_budget.with_budget("slow_tool", self._rename_and_sleep)
+        result = self._call(tool, partner, 1)
+
+        self.assertEqual(result, tool_budget.too_expensive("slow_tool", 0.1, "timeout"))
+        self.assertEqual(json.loads(result)["error"], "too_expensive")
+        self.env.cr.execute("SELECT name FROM res_partner WHERE id = %s", [partner.id])
+        self.assertEqual(self.env.cr.fetchone()[0], "Original")
+
+    def test_fast_tool_restores_the_session(self):
+        partner = self.env["res.partner"].create({"name": "Original"})
+        self.env.flush_all()
+        previous = self._current_timeout()
+        tool = tool_budget.with_budget("fast_tool", self._rename_and_sleep)
+
+        result = self._call(tool, partner, 0)
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(self._current_timeout(), previous)
+        self.env.cr.execute("SELECT name FROM res_partner WHERE id = %s", [partner.id])
+        self.assertEqual(self.env.cr.fetchone()[0], "Renombrado")
+
+    def test_is_stop_request(self):
+        for text in ("stop", " Para! ", "/stop", "Cancela."):
+            self.assertTrue(tool_budget.is_stop_request(text), text)
+        for text in ("", None, "para el cliente Deco Addict", "stop now"):
+            self.assertFalse(tool_budget.is_stop_request(text), text)
+
+
+@tagged("post_install", "-at_install")
+class TestStopRequest(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        odoogpt = cls.env.ref("odoogpt.partner_odoogpt")
+        cls.channel = cls.env["discuss.channel"].create(
+            {
+                "name": odoogpt.name,
+                "channel_type": "chat",
+                "channel_partner_ids": [
+                    (4, odoogpt.id),
+                    (4, cls.env.user.partner_id.id),
+                ],
+            }
+        )
+
+    def _post(self, body):
+        MailMessage = type(self.env["mail.message"])
+        with patch.object(mail_message, "ENV", "dev"), patch.object(
+            mail_message, "cancel_channel_tools", return_value=1
+        ) as cancel, patch.object(MailMessage, "_send_message_to_odoogpt") as send:
+            self.channel.message_post(
+                body=body,
+                message_type="comment",
+                author_id=self.env.user.partner_id.id,
+            )
+        return cancel, send
+
+    def test_stop_does_not_reach_the_bot(self):
+        self.assertTrue(self.channel.is_odoogpt_chat)
+        cancel, send = self._post("Stop")
+
+        send.assert_not_called()
+        cancel.assert_called_once()
+        self.assertEqual(cancel.call_args.args[1], self.channel)
+
+    def test_other_messages_reach_the_bot(self):
+        cancel, send = self._post("¿Cuántos pedidos hay hoy?")
+
+        send.assert_called_once()
+        cancel.assert_not_called()
+
+
+@tagged("post_install", "-at_install")
+class TestStopOnReplica(TransactionCase):
+    """A stop request cancels the read-only tools running on the replica.
+
+    The "replica" is a second connection to the test database, and the
+    primary cursor given to ``cancel_channel_tools`` sees no backend, so only
+    the replica lookup can stop the tool.
+    """
+
+    def _replica_cursor(self, dbname):
+        cr = sql_db.db_connect(dbname).cursor()
+        self.addCleanup(cr.close)
+        cr.execute("SET TRANSACTION READ ONLY")
+        return cr
+
+    def _sleep(self, odoo_manager, odoogpt, channel_id, seconds):
+        odoo_manager.env.cr.execute("SELECT pg_sleep(%s)", [seconds])
+        return "ok"
+
+    def _wait_for_tool(self, channel):
+        with sql_db.db_connect(self.env.cr.dbname).cursor() as cr:
+            for __ in range(100):
+                cr.execute(
+                    """
+                    SELECT 1 FROM pg_stat_activity
+                    WHERE application_name = %s
+                      AND state = 'active'
+                      AND query LIKE '%%pg_sleep%%'
+                    """,
+                    [tool_budget._application_name(channel)],
+                )
+                found = cr.fetchone()
+                # The activity view is a snapshot of the transaction
+                cr.rollback()
+                if found:
+                    return
+                time.sleep(0.05)
+        self.fail("the tool never started on the replica")
+
+    def test_stop_cancels_the_replica_query(self):
+        channel = self.env["discuss.channel"].create({"name": "Réplica"})
+        tool = replica.on_replica(tool_budget.with_budget("slow_tool", self._sleep))
+        results = []
+        with patch.object(replica, "_replica_cursor", self._replica_cursor):
+            thread = threading.Thread(
+                target=lambda: results.append(
+                    tool(
+                        odoo_manager=self.env["mail.message"],
+                        odoogpt=None,
+                        channel_id=channel,
+                        seconds=10,
+                    )
+                )
+            )
+            thread.start()
+            self._wait_for_tool(channel)
+
+            primary = MagicMock(dbname=self.env.cr.dbname)
+            primary.fetchall.return_value = []
+            cancelled = tool_budget.cancel_channel_tools(primary, channel)
+            thread.join(20)
+
+        self.assertEqual(cancelled, 1)
+        self.assertEqual(json.loads(results[0])["reason"], "stopped")
@@ -0,0 +1,449 @@
+import re
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from odoo.addons.odoogpt.models import calendar_service, tools
+from odoo.tests import TransactionCase, tagged
+
+
+class SalesToolsCase(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.manager = cls.env["mail.message"]
+        cls.product = cls.env["product.product"].create(
+            {"name": "Silla ergonómica", "list_price": 100.0}
+        )
+        cls.partners = cls.env["res.partner"].create(
+            [{"name": f"Cliente {i}"} for i in range(6)]
+        )
+
+    def _create_orders(self, partners, state=None):
+        orders = self.env["sale.order"].create(
+            [
+                {
+                    "partner_id": partner.id,
+                    "date_order": "2024-05-10 10:00:00",
+                    "order_line": [
+                        (0, 0, {"product_id": self.product.id, "product_uom_qty": 2})
+                    ],
+                }
+                for partner in partners
+            ]
+        )
+        if state == "cancel":
+            orders._action_cancel()
+        return orders
+
+
+@tagged("post_install", "-at_install")
+class TestSalesReportingTools(SalesToolsCase):
+    def _count_queries(self, func, *args):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        with patch.object(tools, "send_odoo_msg"):
+            before = self.cr.sql_log_count
+            result = func(self.manager, None, None, *args)
+            return self.cr.sql_log_count - before, result
+
+    def _assert_constant_queries(self, func, *args, state=None):
+        self._create_orders(self.partners[:1], state=state)
+        # Warm up the caches so both measures run in the same conditions
+        self._count_queries(func, *args)
+        few, _result = self._count_queries(func, *args)
+
+        self._create_orders(self.partners[1:], state=state)
+        many, result = self._count_queries(func, *args)
+
+        self.assertEqual(few, many, "The report must not issue one query per order")
+        return result
+
+    def test_orders_by_dates_constant_queries(self):
+        result = self._assert_constant_queries(
+            tools.orders_by_dates, "2024-05-01", "2024-05-31"
+        )
+        self.assertIn("Pedidos: 6", result)
+
+    def test_canceled_orders_by_dates_constant_queries(self):
+        result = self._assert_constant_queries(
+            tools.canceled_orders_by_dates, "2024-05-01", "2024-05-31", state="cancel"
+        )
+        self.assertIn("Cliente 5", result)
+
+    def test_orders_by_product_id_constant_queries(self):
+        result = self._assert_constant_queries(
+            tools.orders_by_product_id, self.product.id
+        )
+        self.assertIn("Total de unidades solicitadas: 12.0", result)
+
+    def test_orders_by_dates_pagination(self):
+        self._create_orders(self.partners)
+        with patch.object(tools, "send_odoo_msg"):
+            result = tools.orders_by_dates(
+                self.manager, None, None, "2024-05-01", "2024-05-31", limit=4, offset=4
+            )
+        self.assertIn("Mostrando 5-6 de 6", result)
+
+    def test_pending_orders_to_send_pagination(self):
+        orders = self._create_orders(self.partners)
+        orders.action_confirm()
+        self.assertTrue(orders.picking_ids)
+
+        def page(offset):
+            with patch.object(tools, "send_odoo_msg"):
+                return tools.pending_orders_to_send(
+                    self.manager, None, None, limit=2, offset=offset
+                )
+
+        first = page(0)
+        total = int(re.search(r"Mostrando 1-2 de (\d+)", first).group(1))
+        self.assertGreaterEqual(total, 6)
+        self.assertIn(f"Pedidos pendientes de envío: {total}", first)
+        self.assertIn("Usa offset=2 para ver más", first)
+
+        second = page(2)
+        self.assertIn(f"Mostrando 3-4 de {total}", second)
+        self.assertFalse(
+            set(re.findall(r"Pedido: (\S+)", first))
+            & set(re.findall(r"Pedido: (\S+)", second))
+        )
+        self.assertEqual(
+            page(total), f"Sin más resultados a partir de la posición {total + 1}"
+        )
+
+    def test_highest_margin_falls_back_to_default_cost(self):
+        own, default = self.env["product.product"].create(
+            [
+                {
+                    "name": "Coste propio",
+                    "list_price": 50000.0,
+                    "standard_price": 40000.0,
+                },
+                {"name": "Coste por defecto", "list_price": 60000.0},
+            ]
+        )
+        self.env["ir.property"].search(
+            [("res_id", "=", f"product.product,{default.id}")]
+        ).unlink()
+        self.env["ir.property"]._set_default(
+            "standard_price", "product.product", 30000.0, self.env.company
+        )
+        with patch.object(tools, "send_odoo_msg"):
+            result = tools.products_highest_margin(self.manager, None, None, limit=2)
+        self.assertEqual(
+            result.splitlines(),
+            [
+                f"Coste por defecto (ID {default.id}): Margen $30000.0 (100.0%)",
+                f"Coste propio (ID {own.id}): Margen $10000.0 (25.0%)",
+            ],
+        )
+
+
+@tagged("post_install", "-at_install")
+class TestSaleDemand(SalesToolsCase):
+    def _confirm(self, orders):
+        orders.action_confirm()
+        # Confirmation stamps the current date, move the orders back in the period
+        orders.write({"date_order": "2024-05-10 10:00:00"})
+
+    def _demand(self):
+        return self.env["odoogpt.sale.demand"]._demand_by_product(
+            "2024-05-01", "2024-05-31"
+        )
+
+    def test_demand_follows_confirmation_and_cancel(self):
+        orders = self._create_orders(self.partners[:3])
+        self.assertFalse(self._demand(), "Quotations are not demand")
+
+        self._confirm(orders)
+        [line] = self._demand()
+        self.assertEqual(line["product_uom_qty"], 6.0)
+        self.assertEqual(line["order_count"], 3)
+
+        orders[0]._action_cancel()
+        [line] = self._demand()
+        self.assertEqual(line["product_uom_qty"], 4.0)
+
+    def test_backfill_matches_incremental(self):
+        self._confirm(self._create_orders(self.partners))
+        incremental = self._demand()
+        self.env["odoogpt.sale.demand"]._backfill()
+        self.assertEqual(self._demand(), incremental)
+
+
+@tagged("post_install", "-at_install")
+class TestCreateSaleOrderMulti(SalesToolsCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.buyer = cls.env["res.partner"].create(
+            {"name": "Comprador", "email": "comprador@example.com"}
+        )
+        cls.sample = cls.env["product.product"].create(
+            {"name": "Muestra gratis", "default_code": "MUESTRA", "list_price": 0.0}
+        )
+
+    def _create(self, products):
+        with patch.object(tools, "send_odoo_msg"), patch.object(
+            tools, "notify_sale_order"
+        ) as notify:
+            result = tools.tool_create_sale_order_multi(
+                self.manager, None, None, products, "comprador@example.com"
+            )
+        return result, notify
+
+    def test_order_with_skipped_lines(self):
+        result, notify = self._create(
+            [
+                {"product_id": self.product.id, "quantity": 2},
+                {"sku": "NOEXISTE", "quantity": 1},
+            ]
+        )
+        self.assertIn("Presupuesto creado", result)
+        self.assertIn("No existe el producto NOEXISTE", result)
+        order = self.env["sale.order"].search([("partner_id", "=", self.buyer.id)])
+        self.assertEqual(order.order_line.product_id, self.product)
+        self.assertEqual(order.order_line.product_uom_qty, 2)
+        notify.assert_called_once()
+
+    def test_free_order_is_summarized(self):
+        result, __ = self._create([{"sku": "MUESTRA", "quantity": 3}])
+        self.assertIn("Monto total: 0.00", result)
+        self.assertIn("Muestra gratis", result)
+
+
+@tagged("post_install", "-at_install")
+class TestCategoryTree(TransactionCase):
+    def test_products_of_whole_subtree(self):
+        Category = self.env["product.category"]
+        root = Category.create({"name": "Mobiliario"})
+        child = Category.create({"name": "Sillas", "parent_id": root.id})
+        grandchild = Category.create(
+            {"name": "Sillas de oficina", "parent_id": child.id}
+        )
+        self.env["product.product"].create(
+            [
+                {"name": "Mesa", "categ_id": root.id},
+                {"name": "Silla plegable", "categ_id": child.id},
+                {"name": "Silla ergonómica", "categ_id": grandchild.id},
+            ]
+        )
+
+        result = self.env["mail.message"].get_products_by_category_id(root.id, limit=2)
+        self.assertEqual(result["total"], 3)
+        self.assertEqual(
+            [category["product_count"] for category in result["categories"]], [1, 1, 1]
+        )
+        self.assertEqual(
+            sum(len(category["products"]) for category in result["categories"]), 2
+        )
+
+        # Moving a category must be visible right away despite the cached tree
+        grandchild.parent_id = False
+        result = self.env["mail.message"].get_products_by_category_id(root.id)
+        self.assertEqual(result["total"], 2)
+
+    def test_edits_keep_the_registry_cache(self):
+        category = self.env["product.category"].create({"name": "Iluminación"})
+        Tree = self.env["odoogpt.category.tree"]
+        self.assertEqual(Tree._category_tree()[0][category.id][0], "Iluminación")
+        with patch.object(
+            type(self.env.registry),
+            "clear_cache",
+            side_effect=AssertionError("registry cache cleared"),
+        ):
+            category.name = "Lámparas"
+            self.assertEqual(Tree._category_tree()[0][category.id][0], "Lámparas")
+
+
+@tagged("post_install", "-at_install")
+class TestAggregateTool(SalesToolsCase):
+    def _aggregate(self, **kwargs):
+        with patch.object(tools, "send_odoo_msg"):
+            return tools.aggregate(self.manager, None, None, **kwargs)
+
+    def test_aggregate_groups_in_database(self):
+        self._create_orders(self.partners[:3])
+        result = self._aggregate(
+            model="sale.order.line",
+            measures=["product_uom_qty:sum"],
+            groupby=["product_id"],
+            domain=[["product_id", "=", self.product.id]],
+        )
+        self.assertIn("Silla ergonómica | 6.00 | 3", result)
+
+    def test_aggregate_rejects_unlisted_models_and_fields(self):
+        self.assertIn("no disponible", self._aggregate(model="res.users"))
+        result = self._aggregate(model="res.partner", groupby=["password"])
+        self.assertIn("Consulta no válida", result)
+
+
+@tagged("post_install", "-at_install")
+class TestSurveyAnalytics(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.survey = cls.env["survey.survey"].create({"title": "Satisfacción"})
+        cls.choice = cls.env["survey.question"].create(
+            {
+                "survey_id": cls.survey.id,
+                "title": "¿Nos recomendaría?",
+                "question_type": "simple_choice",
+                "suggested_answer_ids": [
+                    (0, 0, {"value": "Sí"}),
+                    (0, 0, {"value": "No"}),
+                ],
+            }
+        )
+        cls.score = cls.env["survey.question"].create(
+            {
+                "survey_id": cls.survey.id,
+                "title": "Puntuación",
+                "question_type": "numerical_box",
+            }
+        )
+        cls.analytics = cls.env["odoogpt.survey.analytics"]
+
+    def _answer(self, choice, score, state="done"):
+        user_input = self.env["survey.user_input"].create(
+            {"survey_id": self.survey.id, "state": state}
+        )
+        self.env["survey.user_input.line"].create(
+            [
+                {
+                    "user_input_id": user_input.id,
+                    "question_id": self.choice.id,
+                    "answer_type": "suggestion",
+                    "suggested_answer_id": self.choice.suggested_answer_ids.filtered(
+                        lambda answer: answer.value == choice
+                    ).id,
+                },
+                {
+                    "user_input_id": user_input.id,
+                    "question_id": self.score.id,
+                    "answer_type": "numerical_box",
+                    "value_numerical_box": score,
+                },
+            ]
+        )
+        return user_input
+
+    def test_question_distributions(self):
+        self._answer("Sí", 8)
+        self._answer("Sí", 10)
+        self._answer("No", 3)
+        self._answer("No", 1, state="in_progress")
+
+        choice, score = self.analytics._question_stats(self.survey.id)
+        self.assertEqual(choice["answered"], 3)
+        self.assertEqual(choice["choices"], [("Sí", 2), ("No", 1)])
+        self.assertEqual(score["numeric"]["median"], 8)
+        self.assertAlmostEqual(score["numeric"]["mean"], 7)
+        self.assertEqual(self.analytics._summary(self.survey.id)["done"], 3)
+
+        # New answers invalidate the cached statistics
+        self._answer("No", 4)
+        choice, __ = self.analytics._question_stats(self.survey.id)
+        self.assertEqual(choice["choices"], [("Sí", 2), ("No", 2)])
+
+        # A zero is an answer, not an empty value
+        self._answer("No", 0)
+        __, score = self.analytics._question_stats(self.survey.id)
+        self.assertEqual(score["answered"], 5)
+        self.assertEqual(score["numeric"]["count"], 5)
+        self.assertEqual(score["numeric"]["min"], 0)
+        self.assertAlmostEqual(score["numeric"]["mean"], 5)
+
+    def test_respondents_are_paged(self):
+        for score in range(5):
+            self._answer("Sí", score)
+        page = self.analytics._respondents(self.survey.id, limit=2, offset=2)
+        self.assertEqual(page["total"], 5)
+        self.assertEqual(len(page["respondents"]), 2)
+        self.assertEqual(len(page["respondents"][0]["answers"]), 2)
+
+
+@tagged("post_install", "-at_install")
+class TestCalendarService(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partner = cls.env["res.partner"].create({"name": "Asistente Agenda"})
+        Event = cls.env["calendar.event"]
+        cls.long_event = Event.create(
+            {
+                "name": "Congreso anual",
+                "start": "2031-03-01 09:00:00",
+                "stop": "2031-03-05 18:00:00",
+                "partner_ids": [(6, 0, cls.partner.ids)],
+            }
+        )
+        cls.events = Event.create(
+            [
+                {
+                    "name": f"Reunión agenda {day}",
+                    "start": f"2031-03-{day:02d} 10:00:00",
+                    "stop": f"2031-03-{day:02d} 11:00:00",
+                }
+                for day in range(10, 15)
+            ]
+        )
+        cls.calendar = cls.env["odoogpt.calendar"]
+
+    def test_overlapping_events_are_found(self):
+        page = self.calendar._search_events("2031-03-03", "2031-03-03")
+        self.assertEqual([event["id"] for event in page["events"]], self.long_event.ids)
+        self.assertEqual(page["events"][0]["attendees"][0]["name"], "Asistente Agenda")
+
+    def test_pagination_and_compact(self):
+        page = self.calendar._search_events(
+            "2031-03-10", "2031-03-14", search_term="agenda", limit=2, compact=True
+        )
+        self.assertEqual(page["total"], 5)
+        self.assertEqual(len(page["events"]), 2)
+        self.assertNotIn("description", page["events"][0])
+        last = self.calendar._search_events(
+            "2031-03-10", "2031-03-14", search_term="agenda", limit=2, offset=4
+        )
+        self.assertEqual(last["total"], 5)
+        self.assertEqual(len(last["events"]), 1)
+
+    def test_free_slots_sweep(self):
+        day = datetime(2031, 3, 3)
+        busy = calendar_service.merge_intervals(
+            [
+                (day.replace(hour=10), day.replace(hour=11)),
+                (day.replace(hour=10, minute=30), day.replace(hour=12)),
+                (day.replace(hour=13), day.replace(hour=13, minute=30)),
+            ]
+        )
+        self.assertEqual(len(busy), 2)
+        slots = calendar_service.free_slots(
+            [(day.replace(hour=9), day.replace(hour=17))], busy, timedelta(hours=1), 3
+        )
+        self.assertEqual(
+            [start.strftime("%H:%M") for start, __ in slots],
+            ["09:00", "12:00", "13:30"],
+        )
+
+    def test_find_slots_and_conflicts(self):
+        self.env.user.tz = "UTC"
+        result = self.calendar._find_slots(
+            self.partner.ids,
+            duration=2,
+            start_date="2031-03-04",
+            end_date="2031-03-06",
+            count=2,
+            working_hours=False,
+        )
+        self.assertEqual(
+            result["slots"],
+            [
+                (datetime(2031, 3, 5, 18), datetime(2031, 3, 5, 20)),
+                (datetime(2031, 3, 5, 20), datetime(2031, 3, 5, 22)),
+            ],
+        )
+        conflicts = self.calendar._conflicts(
+            self.partner.ids, datetime(2031, 3, 2, 10), datetime(2031, 3, 2, 11)
+        )
+        self.assertEqual([event["id"] for event in conflicts], self.long_event.ids)